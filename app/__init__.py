@@ -40,6 +40,41 @@ def create_app(config_path: str | None = None):
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # orjson-backed app.json + gzip/brotli for large bodies. Compression is
+    # registered first so its after_request hook runs last, on the final body.
+    from app.utils.json_provider import init_json
+    from app.utils.compression import init_compression
+    init_json(app)
+    init_compression(app)
+
+    # per-request time budget for outbound calls (see app.utils.deadline)
+    from app.utils.deadline import init_deadlines
+    init_deadlines(app)
+
+    # Server-Timing header with per-branch durations (see app.utils.server_timing)
+    from app.utils.server_timing import init_server_timing
+    init_server_timing(app)
+
+    # malformed ?cursor= → 400 (see app.utils.pagination)
+    from app.utils.pagination import register_pagination_errors
+    register_pagination_errors(app)
+
+    # full-text search documents follow ticket/comment writes (see app.utils.ticket_search)
+    from app.utils.ticket_search import init_ticket_search
+    init_ticket_search(app)
+
+    # per-worker typeahead index for /tickets/suggest (see app.utils.ticket_suggest)
+    from app.utils.ticket_suggest import init_ticket_suggest
+    init_ticket_suggest(app)
+
+    # Ticket.version follows child-row writes; drives ETags (see app.utils.ticket_versions)
+    from app.utils.ticket_versions import init_ticket_versions
+    init_ticket_versions(app)
+
+    # list-view read model (see app.utils.ticket_summaries)
+    from app.utils.ticket_summaries import init_ticket_summaries
+    init_ticket_summaries(app)
+
     # 4) blueprints
     from app.ticket_routes import ticket_bp
     from app.category_routes import category_bp
@@ -66,7 +101,14 @@ def create_app(config_path: str | None = None):
     def health():
         return jsonify(status="ok"), 200
 
-    # 6) Setup scheduled tasks (cron jobs)
+    # 6) CLI commands + users_cache background sync (off unless USER_SYNC_INTERVAL > 0)
+    from app.commands import register_commands
+    from app.utils.user_sync import start_user_sync_thread
+
+    register_commands(app)
+    start_user_sync_thread(app)
+
+    # 7) Setup scheduled tasks (cron jobs)
     # def setup_scheduler(app):
     #     """Setup background scheduler for periodic tasks"""
     #     try:
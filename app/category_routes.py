@@ -1,9 +1,13 @@
 from flask import Blueprint, request, jsonify, g
 from app import db
-from app.model import Category, ContactFormSubmission, Ticket, ContactFormTicketLink, TicketAssignment, TicketAssignmentLog,TicketFile,TicketComment,TicketStatusLog,TicketTag, TicketFollowUp
+from app.model import Category, ContactFormSubmission, Ticket, ContactFormTicketLink
 from app.utils.helper_function import get_user_info_by_id
 from app.utils.email_templete import send_email
 from app.dashboard_routes import require_api_key, validate_token
+from app.utils.http_client import http_client
+from app.utils.location_directory import find_location_by_postal_code
+from app.utils.ticket_serializer import serialize_tickets, serializer_options, CONTACT_FORM_INCLUDE
+from app.utils.pagination import paginate, next_cursor, PaginationError
 from datetime import datetime, timedelta
 from app import llm_client
 import threading
@@ -281,24 +285,12 @@ def analyze_message_category(app, form_id, message_text, location_id=None, posta
             final_location_id = form.location_id or location_id
             if not final_location_id and postal_code:
                 # Analyze by postal code
-                try:
-                    url = f"{AUTH_SYSTEM_URL}/clinic_locations/get_all/{form.clinic_id}"
-                    resp = requests.get(url, timeout=10)
-                    if resp.status_code == 200:
-                        locations_data = resp.json()
-                        locations = locations_data.get("locations", [])
-                        # Match by postal code
-                        for loc in locations:
-                            if loc.get("postal_code") == postal_code:
-                                final_location_id = loc.get("id")
-                                print(f":location: Matched location_id={final_location_id} by postal_code={postal_code}")
-                                break
-                        if not final_location_id:
-                            print(f":warning: No location found matching postal_code={postal_code}")
-                    else:
-                        print(f":warning: Failed to fetch locations: {resp.status_code}")
-                except Exception as e:
-                    print(f":warning: Error analyzing location by postal code: {e}")
+                loc = find_location_by_postal_code(form.clinic_id, postal_code)
+                if loc:
+                    final_location_id = loc.get("id")
+                    print(f":location: Matched location_id={final_location_id} by postal_code={postal_code}")
+                else:
+                    print(f":warning: No location found matching postal_code={postal_code}")
             
             # Update location_id in ContactFormSubmission if determined from postal code
             if final_location_id and final_location_id != form.location_id:
@@ -358,7 +350,7 @@ def analyze_message_category(app, form_id, message_text, location_id=None, posta
             print(f":x: Error in analyze_message_category: {e}")
 
 
-import threading, requests
+import threading
 from flask import current_app
 @category_bp.route("/contact/submit", methods=["POST"])
 def submit_contact_form():
@@ -466,7 +458,7 @@ def submit_contact_form():
 
                     url = f"{AUTH_SYSTEM_URL}/patient"
                     print(f"🌐 Sending patient creation payload: {payload}")
-                    resp = requests.post(url, json=payload, headers=headers, timeout=10)
+                    resp = http_client.post(url, json=payload, headers=headers, timeout=10, service="auth-patients")
 
                     if resp.status_code in (200, 201):
                         print(f"✅ Patient created successfully in Auth API → {form_data.name}")
@@ -522,9 +514,9 @@ def get_all_contact_forms():
         if search:
             query = query.filter(ContactFormSubmission.name.ilike(f"%{search}%"))
 
-        # 🔹 Paginate results
-        pagination = query.order_by(ContactFormSubmission.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        # 🔹 Paginate results (?cursor= switches to keyset mode)
+        pagination = paginate(
+            query.order_by(ContactFormSubmission.created_at.desc()), ContactFormSubmission, page, per_page
         )
 
         # 🔹 Serialize results with name split and category extraction
@@ -574,9 +566,15 @@ def get_all_contact_forms():
             "total": pagination.total,
             "has_next": pagination.has_next,
             "has_prev": pagination.has_prev,
+            "next_cursor": next_cursor(pagination),
             "forms": forms_data
         }), 200
 
+    except PaginationError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
     except Exception as e:
         print("❌ Error fetching contact forms:", e)
         return jsonify({
@@ -584,106 +582,6 @@ def get_all_contact_forms():
             "message": str(e)
         }), 500
 
-def _serialize_ticket(ticket):
-    created_by = get_user_info_by_id(ticket.user_id) if ticket.user_id else None
-
-    # Assignments (current)
-    assignments = TicketAssignment.query.filter_by(ticket_id=ticket.id).all()
-    assignees = []
-    for a in assignments:
-        assign_by_info = get_user_info_by_id(a.assign_by) if a.assign_by else None
-        assign_to_info = get_user_info_by_id(a.assign_to) if a.assign_to else None
-        assignees.append({
-            "assign_by": a.assign_by,
-            "assign_by_username": assign_by_info["username"] if assign_by_info else None,
-            "assign_to": a.assign_to,
-            "assign_to_username": assign_to_info["username"] if assign_to_info else None,
-            "assigned_at": a.assigned_at
-        })
-
-    # Assignment logs (history)
-    assignment_logs = []
-    for log in TicketAssignmentLog.query.filter_by(ticket_id=ticket.id).order_by(TicketAssignmentLog.changed_at.desc()).all():
-        old_user_info = get_user_info_by_id(log.old_assign_to) if log.old_assign_to else None
-        new_user_info = get_user_info_by_id(log.new_assign_to) if log.new_assign_to else None
-        changed_by_info = get_user_info_by_id(log.changed_by) if log.changed_by else None
-        assignment_logs.append({
-            "old_assign_to": log.old_assign_to,
-            "old_assign_to_username": old_user_info["username"] if old_user_info else None,
-            "new_assign_to": log.new_assign_to,
-            "new_assign_to_username": new_user_info["username"] if new_user_info else None,
-            "changed_by": log.changed_by,
-            "changed_by_username": changed_by_info["username"] if changed_by_info else None,
-            "changed_at": log.changed_at
-        })
-
-    # Files, Tags, Comments, Followups
-    files = [{"name": f.file_name, "url": f.file_url}
-             for f in TicketFile.query.filter_by(ticket_id=ticket.id).all()]
-
-    tags = [tag.tag_name for tag in TicketTag.query.filter_by(ticket_id=ticket.id).all()]
-
-    comments = []
-    for c in TicketComment.query.filter_by(ticket_id=ticket.id).order_by(TicketComment.created_at.desc()).all():
-        u_info = get_user_info_by_id(c.user_id) if c.user_id else None
-        comments.append({
-            "user_id": c.user_id,
-            "username": u_info["username"] if u_info else None,
-            "comment": c.comment,
-            "created_at": c.created_at
-        })
-
-    followups = []
-    for f in TicketFollowUp.query.filter_by(ticket_id=ticket.id).all():
-        u_info = get_user_info_by_id(f.user_id)
-        followups.append({
-            "id": f.id,
-            "note": f.note,
-            "user_id": f.user_id,
-            "username": u_info["username"] if u_info else None,
-            "followup_date": f.followup_date,
-            "created_at": f.created_at
-        })
-
-    # Category
-    category = None
-    if getattr(ticket, "category_id", None):
-        cat = Category.query.get(ticket.category_id)
-        if cat:
-            category = {"id": cat.id, "name": cat.name, "is_active": cat.is_active}
-
-    # Status logs
-    status_logs = []
-    for log in TicketStatusLog.query.filter_by(ticket_id=ticket.id).order_by(TicketStatusLog.changed_at.desc()).all():
-        u_info = get_user_info_by_id(log.changed_by) if log.changed_by else None
-        status_logs.append({
-            "old_status": log.old_status,
-            "new_status": log.new_status,
-            "changed_by": log.changed_by,
-            "changed_by_username": u_info["username"] if u_info else None,
-            "changed_at": log.changed_at
-        })
-
-    return {
-        "id": ticket.id,
-        "title": ticket.title,
-        "details": ticket.details,
-        "priority": ticket.priority,
-        "status": ticket.status,
-        "due_date": ticket.due_date,
-        "created_at": ticket.created_at,
-        "completed_at": ticket.completed_at,
-        "created_by": created_by,
-        "assignees": assignees,
-        "assignment_logs": assignment_logs,
-        "files": files,
-        "tags": tags,
-        "comments": comments,
-        "followups": followups,
-        "category": category,
-        "status_logs": status_logs
-    }
-
 @category_bp.route("/contact/get_by_id/<int:id>", methods=["GET"])
 def get_contact_form_by_id(id):
     try:
@@ -718,8 +616,9 @@ def get_contact_form_by_id(id):
         # --- load tickets & serialize
         tickets = []
         if ticket_ids:
-            for t in Ticket.query.filter(Ticket.id.in_(ticket_ids)).all():
-                tickets.append(_serialize_ticket(t))
+            linked = Ticket.query.filter(Ticket.id.in_(ticket_ids)).all()
+            include, fields = serializer_options(CONTACT_FORM_INCLUDE)
+            tickets = serialize_tickets(linked, include, fields)
 
         form_data = {
             "id": form.id,
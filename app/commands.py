@@ -0,0 +1,100 @@
+import json
+
+import click
+
+
+def register_commands(app):
+    """Attach maintenance commands to `flask <command>`."""
+
+    @app.cli.command("sync-users")
+    @click.option("--limit", type=int, default=None, help="Max users to refresh in this run.")
+    @click.option("--user-id", "user_ids", type=int, multiple=True, help="Refresh only these ids.")
+    def sync_users_command(limit, user_ids):
+        """Refresh the users_cache mirror from the Auth System."""
+        from app.utils.user_sync import sync_users, USER_SYNC_BATCH
+
+        summary = sync_users(limit=limit or USER_SYNC_BATCH, user_ids=user_ids or None)
+        click.echo(json.dumps(summary))
+
+    @app.cli.command("backfill-ticket-keys")
+    @click.option("--batch", type=int, default=1000, show_default=True, help="Tickets per UPDATE batch.")
+    def backfill_ticket_keys_command(batch):
+        """Fill tickets.status_key / priority_key for rows written before those columns existed."""
+        from app import db
+        from app.model import Ticket
+        from app.utils.ticket_status import normalize_priority, normalize_status
+
+        last_id, scanned, updated = 0, 0, 0
+        while True:
+            rows = (
+                db.session.query(Ticket.id, Ticket.status, Ticket.priority, Ticket.status_key, Ticket.priority_key)
+                .filter(Ticket.id > last_id)
+                .order_by(Ticket.id)
+                .limit(batch)
+                .all()
+            )
+            if not rows:
+                break
+            changes = []
+            for ticket_id, status, priority, status_key, priority_key in rows:
+                new_status_key, new_priority_key = normalize_status(status), normalize_priority(priority)
+                if (new_status_key, new_priority_key) != (status_key, priority_key):
+                    changes.append({"id": ticket_id, "status_key": new_status_key, "priority_key": new_priority_key})
+            if changes:
+                # bulk UPDATE bypasses the ORM listeners, which would compute the same values
+                db.session.bulk_update_mappings(Ticket, changes)
+                db.session.commit()
+            scanned += len(rows)
+            updated += len(changes)
+            last_id = rows[-1][0]
+
+        click.echo(json.dumps({"scanned": scanned, "updated": updated}))
+
+    @app.cli.command("search-reindex")
+    @click.option("--batch", type=int, default=500, show_default=True, help="Tickets per batch.")
+    def search_reindex_command(batch):
+        """
+        Create the full-text index if needed and rebuild every ticket's search document.
+        Required whenever SEARCH_FTS_ENABLED is switched on: writes aren't indexed while it's off.
+        """
+        from app.utils.ticket_search import reindex_all
+
+        click.echo(json.dumps(reindex_all(batch=batch)))
+
+    @app.cli.command("ticket-summaries-rebuild")
+    @click.option("--batch", type=int, default=500, show_default=True, help="Tickets per batch.")
+    def ticket_summaries_rebuild_command(batch):
+        """Recompute every row of ticket_summaries from the source tables."""
+        from app.utils.ticket_summaries import rebuild_all
+
+        click.echo(json.dumps(rebuild_all(batch=batch)))
+
+    @app.cli.command("ticket-summaries-check")
+    @click.option("--batch", type=int, default=500, show_default=True, help="Tickets per batch.")
+    @click.option("--fix", is_flag=True, help="Rewrite missing/stale rows and drop orphans.")
+    def ticket_summaries_check_command(batch, fix):
+        """Compare ticket_summaries with the source tables; exit 1 on drift (unless --fix)."""
+        from app.utils.ticket_summaries import check_consistency
+
+        report = check_consistency(batch=batch, fix=fix)
+        click.echo(json.dumps(report))
+        if not fix and (report["missing"] or report["stale"] or report["orphans"]):
+            raise SystemExit(1)
+
+    @app.cli.command("explain-hot-queries")
+    @click.option("--verbose", is_flag=True, help="Print every plan, not just the failures.")
+    def explain_hot_queries_command(verbose):
+        """EXPLAIN the hot list/detail queries; exit 1 if any would scan a whole table."""
+        from app.utils.query_plans import explain_hot_queries
+
+        failures = 0
+        for result in explain_hot_queries():
+            ok = not result["full_scans"]
+            failures += not ok
+            click.echo(f"{'✅' if ok else '❌'} {result['name']}"
+                       + ("" if ok else f" — full scan of {', '.join(result['full_scans'])}"))
+            if verbose or not ok:
+                for line in result["plan"]:
+                    click.echo(f"      {line}")
+        if failures:
+            raise SystemExit(1)
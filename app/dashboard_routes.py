@@ -1,8 +1,14 @@
 import os
+import time
+import hashlib
 from functools import wraps
 from datetime import datetime
+import jwt
 import requests
 from flask import Blueprint, request, jsonify, session, g
+from app.utils.cache import all_cache_stats, get_cache, MISSING
+from app.utils.http_client import http_client, CircuitOpenError
+from app.utils.user_sync import invalidate_users
 
 
 dashboard_bp = Blueprint('dashboard', __name__) 
@@ -11,6 +17,7 @@ dashboard_bp = Blueprint('dashboard', __name__)
 # Load API Key from Environment
 # -------------------------------------------------------------------
 X_API_KEY = os.getenv("X_API_KEY", None)
+AUTH_VALIDATE_TIMEOUT = float(os.getenv("AUTH_VALIDATE_TIMEOUT", 5))
 
 # -------------------------------------------------------------------
 # Decorator to validate API key
@@ -37,6 +44,61 @@ from functools import wraps
 from flask import request, jsonify, g
 import requests
 
+AUTH_VALIDATE_URL = "https://api.dental360grp.com/validate_token"
+
+# remote → ask the Auth system (cached), local → verify signed JWTs in-process
+AUTH_TOKEN_MODE = os.getenv("AUTH_TOKEN_MODE", "remote").lower()
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", 60))
+AUTH_TOKEN_CACHE_MAXSIZE = int(os.getenv("AUTH_TOKEN_CACHE_MAXSIZE", 10000))
+AUTH_JWT_SECRET = os.getenv("AUTH_JWT_SECRET")
+AUTH_JWKS_URL = os.getenv("AUTH_JWKS_URL")
+AUTH_JWT_ALGORITHMS = [a.strip() for a in os.getenv("AUTH_JWT_ALGORITHMS", "HS256").split(",") if a.strip()]
+AUTH_JWT_AUDIENCE = os.getenv("AUTH_JWT_AUDIENCE")
+
+# token hash -> g.user payload (never the raw token)
+token_cache = get_cache(
+    "auth_tokens",
+    maxsize=AUTH_TOKEN_CACHE_MAXSIZE,
+    ttl=AUTH_TOKEN_CACHE_TTL,
+    negative_ttl=0,
+)
+_jwks_client = jwt.PyJWKClient(AUTH_JWKS_URL, cache_keys=True) if AUTH_JWKS_URL else None
+
+
+def _token_cache_key(bearer_token):
+    return hashlib.sha256(bearer_token.encode("utf-8")).hexdigest()
+
+
+def _token_cache_ttl(bearer_token):
+    """
+    Cache TTL for a token: AUTH_TOKEN_CACHE_TTL, but never past the token's
+    own `exp` claim. Opaque (non-JWT) tokens just get the default TTL.
+    """
+    try:
+        claims = jwt.decode(bearer_token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return AUTH_TOKEN_CACHE_TTL
+    exp = claims.get("exp")
+    if not exp:
+        return AUTH_TOKEN_CACHE_TTL
+    return min(AUTH_TOKEN_CACHE_TTL, int(exp - time.time()))
+
+
+def _verify_token_locally(bearer_token):
+    """Verify a signed JWT with the shared key or the (cached) JWKS. Returns the claims."""
+    if _jwks_client:
+        key = _jwks_client.get_signing_key_from_jwt(bearer_token).key
+    else:
+        key = AUTH_JWT_SECRET
+    return jwt.decode(
+        bearer_token,
+        key,
+        algorithms=AUTH_JWT_ALGORITHMS,
+        audience=AUTH_JWT_AUDIENCE,
+        options={"require": ["exp"], "verify_aud": bool(AUTH_JWT_AUDIENCE)},
+    )
+
+
 def validate_token(func):
     @wraps(func)
     def decorated_function(*args, **kwargs):
@@ -46,20 +108,46 @@ def validate_token(func):
 
         bearer_token = auth_header.split('Bearer ')[1]
 
-        auth_system_url = "https://api.dental360grp.com/validate_token"
+        # ✅ Already validated recently → skip the round-trip
+        cache_key = _token_cache_key(bearer_token)
+        cached_user = token_cache.get(cache_key, MISSING)
+        if cached_user is not MISSING:
+            g.user = dict(cached_user) if isinstance(cached_user, dict) else cached_user
+            return func(*args, **kwargs)
+
+        # 🔐 Local mode: verify the JWT signature ourselves
+        if AUTH_TOKEN_MODE == "local" and (AUTH_JWT_SECRET or _jwks_client):
+            try:
+                claims = _verify_token_locally(bearer_token)
+            except jwt.PyJWTError as e:
+                return jsonify({"error": f"Invalid token: {str(e)}"}), 401
+            user = claims.get("user", claims)
+            ttl = _token_cache_ttl(bearer_token)
+            if ttl > 0:
+                token_cache.set(cache_key, user, ttl=ttl)
+            g.user = user
+            return func(*args, **kwargs)
 
         try:
-            response = requests.get(
-                auth_system_url,
-                headers={"Authorization": f"Bearer {bearer_token}"}
+            response = http_client.get(
+                AUTH_VALIDATE_URL,
+                headers={"Authorization": f"Bearer {bearer_token}"},
+                timeout=AUTH_VALIDATE_TIMEOUT,
+                service="auth-validate"
             )
 
             if response.status_code == 200:
-                g.user = response.json().get("user")
+                user = response.json().get("user")
+                ttl = _token_cache_ttl(bearer_token)
+                if ttl > 0:
+                    token_cache.set(cache_key, user, ttl=ttl)
+                g.user = user
                 return func(*args, **kwargs)  # ✅ call original function
             else:
                 return jsonify(response.json()), response.status_code
 
+        except CircuitOpenError as e:
+            return jsonify({"error": f"Auth system unavailable: {str(e)}"}), 503
         except requests.exceptions.RequestException as e:
             return jsonify({"error": f"Error connecting to Auth system: {str(e)}"}), 500
 
@@ -119,3 +207,41 @@ def check_dashboard():
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+# -------------------------------------------------------------------
+# Cache Stats Endpoint (hit / miss counters for in-process caches)
+# -------------------------------------------------------------------
+@dashboard_bp.route('/cache/stats', methods=['GET'])
+@require_api_key
+def get_cache_stats():
+    """Return hit/miss counters for every process-wide cache in this worker."""
+    return jsonify({
+        'pid': os.getpid(),
+        'caches': all_cache_stats(),
+        'circuit_breakers': http_client.stats()
+    }), 200
+
+
+@dashboard_bp.route('/users_cache/invalidate', methods=['POST'])
+@require_api_key
+def invalidate_users_cache():
+    """
+    Drop users from the local users_cache mirror (and this worker's user cache).
+    Body: {"user_ids": [1, 2], "refresh": true}  – omit user_ids to drop everyone.
+    Other workers pick the change up once their in-process TTL expires.
+    """
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get('user_ids')
+    if user_ids is not None and not isinstance(user_ids, list):
+        return jsonify({'error': 'user_ids must be a list'}), 400
+
+    try:
+        result = invalidate_users(user_ids, refresh=bool(data.get('refresh')))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'user_ids must be integers'}), 400
+    except Exception as e:
+        print(f"❌ users_cache invalidation failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({'message': 'users_cache invalidated', **result}), 200
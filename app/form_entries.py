@@ -1,7 +1,6 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 import os
-import requests
 
 from app import db
 from app.model import (
@@ -11,6 +10,7 @@ from app.model import (
 )
 from app.utils.email_templete import send_email, get_user_info_by_id, generate_email_template
 from app.dashboard_routes import require_api_key, validate_token
+from app.utils.form_types import get_form_type, invalidate_form_type
 
 
 # 🔹 Blueprint
@@ -19,7 +19,6 @@ form_entries_blueprint = Blueprint("form_entries", __name__)
 
 MAILGUN_API_URL = os.getenv("MAILGUN_API_URL")
 MAILGUN_API_KEY = os.getenv("MAILGUN_API_KEY")
-AUTH_API_BASE = "https://api.dental360grp.com/api/form_types"
 
 # ================================================================
 # 🟢 CREATE FORM ENTRY + AUTO EMAIL TO MAPPED USERS
@@ -46,20 +45,12 @@ def create_form_entry_with_field_values():
             return jsonify({"error": "No field values provided"}), 400
 
         # ===========================================================
-        # ✅ Validate FormType — only via external API
+        # ✅ Validate FormType + assigned users (cached Auth API lookup)
         # ===========================================================
-        ft = None
-        try:
-            resp = requests.get(AUTH_API_BASE, timeout=8)
-            if resp.status_code == 200:
-                ft = resp.json()
-            else:
-                print(f"⚠️ External API form_type fetch failed: {resp.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error fetching form_type from API: {e}")
-
+        ft = get_form_type(form_type_id)
         if not ft:
             return jsonify({"error": "Invalid form_type_id"}), 404
+        assigned_users = ft.get("users", [])
 
         # ✅ Create FormEntry
         new_entry = FormEntry(
@@ -81,17 +72,6 @@ def create_form_entry_with_field_values():
                 ))
         db.session.commit()
 
-        # ✅ Fetch assigned users from Auth backend API
-        assigned_users = []
-        try:
-            url = f"{AUTH_API_BASE}/{form_type_id}"
-            resp = requests.get(url, timeout=8)
-            if resp.status_code == 200:
-                data = resp.json()
-                assigned_users = data.get("users", [])
-        except Exception as api_err:
-            print(f"❌ Error fetching assigned users: {api_err}")
-
         # ✅ If no users found
         if not assigned_users:
             return jsonify({
@@ -172,19 +152,10 @@ def patch_form_entry_field_values(form_entry_id):
             return jsonify({"error": "Form entry not found"}), 404
 
         # ===========================================================
-        # ✅ Single external API call — fetch form type + assigned users
+        # ✅ Form type + assigned users (cached Auth API lookup)
         # ===========================================================
-        ft = None
-        assigned_users = []
-        try:
-            resp = requests.get(f"{AUTH_API_BASE}/{form_type_id or form_entry.form_type_id}", timeout=8)
-            if resp.status_code == 200:
-                ft = resp.json()
-                assigned_users = ft.get("users", [])  # ✅ use same response for both
-            else:
-                print(f"⚠️ External API form_type fetch failed: {resp.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error fetching form_type from API: {e}")
+        ft = get_form_type(form_type_id or form_entry.form_type_id)
+        assigned_users = ft.get("users", []) if ft else []
 
         if not ft:
             return jsonify({"error": "Invalid form_type_id"}), 404
@@ -289,18 +260,8 @@ def get_form_entries_by_form_type(form_type_id):
         search = request.args.get("search", type=str)
 
         # ✅ Fetch form type details & assigned users from Auth API
-        ft = None
-        assigned_users = []
-        try:
-            resp = requests.get(f"{AUTH_API_BASE}/{form_type_id}", timeout=8)
-            if resp.status_code == 200:
-                api_data = resp.json()
-                ft = api_data
-                assigned_users = api_data.get("users", [])
-            else:
-                print(f"⚠️ External API form_type fetch failed: {resp.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error fetching form_type from API: {e}")
+        ft = get_form_type(form_type_id)
+        assigned_users = ft.get("users", []) if ft else []
 
         if not ft:
             return jsonify({"error": "Invalid form_type_id"}), 404
@@ -401,18 +362,8 @@ def get_form_entry_details(form_entry_id):
         form_type_id = form_entry.form_type_id
 
         # ✅ Fetch form type details & assigned users from Auth backend
-        ft = None
-        assigned_users = []
-        try:
-            resp = requests.get(f"{AUTH_API_BASE}/{form_type_id}", timeout=8)
-            if resp.status_code == 200:
-                api_data = resp.json()
-                ft = api_data
-                assigned_users = api_data.get("users", [])
-            else:
-                print(f"⚠️ Failed to fetch form type from Auth API: {resp.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error fetching form type from API: {e}")
+        ft = get_form_type(form_type_id)
+        assigned_users = ft.get("users", []) if ft else []
 
         if not ft:
             return jsonify({"error": "Invalid form_type_id"}), 404
@@ -466,27 +417,17 @@ def get_form_type_details(form_type_id):
 
     try:
         # ✅ Fetch form type details + assigned users from Auth API
-        ft = None
-        assigned_users = []
-        try:
-            resp = requests.get(f"{AUTH_API_BASE}/{form_type_id}", timeout=8)
-            if resp.status_code == 200:
-                api_data = resp.json()
-                ft = api_data
-
-                # include name + email of assigned users
-                assigned_users = [
-                    {
-                        "id": user.get("id"),
-                        "name": user.get("username"),
-                        "email": user.get("email")
-                    }
-                    for user in api_data.get("users", [])
-                ]
-            else:
-                print(f"⚠️ External API form_type fetch failed: {resp.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error fetching form_type from API: {e}")
+        ft = get_form_type(form_type_id)
+
+        # include name + email of assigned users
+        assigned_users = [
+            {
+                "id": user.get("id"),
+                "name": user.get("username"),
+                "email": user.get("email")
+            }
+            for user in (ft.get("users", []) if ft else [])
+        ]
 
         if not ft:
             return jsonify({"error": "Invalid form_type_id"}), 404
@@ -558,4 +499,27 @@ def get_form_entries_count():
 
     except Exception as e:
         print(f"❌ Error in get_form_entries_count: {e}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+# ================================================================
+# POST /form_types/invalidate
+# ================================================================
+@form_entries_blueprint.route("/form_types/invalidate", methods=["POST"])
+@require_api_key
+def invalidate_form_type_cache():
+    """
+    Drop cached form type metadata after it changes in the Auth backend.
+    Body: {"form_type_id": 3}  – omit form_type_id to drop every form type.
+    """
+    data = request.get_json(silent=True) or {}
+    form_type_id = data.get("form_type_id")
+    try:
+        invalidate_form_type(form_type_id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "form_type_id must be an integer"}), 400
+
+    return jsonify({
+        "message": "Form type cache invalidated",
+        "form_type_id": form_type_id
+    }), 200
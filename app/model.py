@@ -1,11 +1,18 @@
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 from app import db
+from app.utils.ticket_status import fill_ticket_keys
 
 class Ticket(db.Model):
     """
     Base Ticket information
     """
     __tablename__ = "tickets"
+    __table_args__ = (
+        # keyset pagination: ORDER BY created_at DESC, id DESC
+        db.Index("ix_tickets_created_at_id", "created_at", "id"),
+    )
 
     id           = db.Column(db.Integer, primary_key=True)
     clinic_id    = db.Column(db.Integer)
@@ -18,22 +25,47 @@ class Ticket(db.Model):
 
     status       = db.Column(db.String(255), default="Pending")  # Pending | In Progress | Completed
     priority     = db.Column(db.String(255))
+    # normalized copies of status / priority (see app.utils.ticket_status), set on every write
+    status_key   = db.Column(db.String(50), index=True)    # pending | in_progress | completed | ...
+    priority_key = db.Column(db.String(50), index=True)    # low | medium | high | urgent | ...
     due_date     = db.Column(db.Date)
 
     created_at   = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)    
     updated_at   = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # bumped on every change to the ticket or its child rows (see app.utils.ticket_versions); feeds ETags
+    version      = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     def __repr__(self):
         return f"<Ticket {self.id} - {self.title} ({self.status})>"
 
 
+@event.listens_for(Ticket, "before_insert")
+def _ticket_keys_on_insert(mapper, connection, ticket):
+    if ticket.status is None:
+        ticket.status = Ticket.__table__.c.status.default.arg  # column default isn't applied yet
+    fill_ticket_keys(ticket)
+
+
+@event.listens_for(Ticket, "before_update")
+def _ticket_keys_on_update(mapper, connection, ticket):
+    # before_update also fires for objects without net changes; only real edits bump the version
+    if object_session(ticket).is_modified(ticket, include_collections=False):
+        ticket.version = (ticket.version or 0) + 1
+    fill_ticket_keys(ticket)
+
+
 
 class TicketAssignment(db.Model):
     __tablename__ = "ticket_assignments"
+    __table_args__ = (
+        # EXISTS semi-joins in TicketQuery (assigned_to / assigned_by / visibility)
+        db.Index("ix_ticket_assignments_assign_to_ticket_id", "assign_to", "ticket_id"),
+        db.Index("ix_ticket_assignments_assign_by_ticket_id", "assign_by", "ticket_id"),
+    )
 
     id        = db.Column(db.Integer, primary_key=True)
-    ticket_id = db.Column(db.Integer)
+    ticket_id = db.Column(db.Integer, index=True)
     assign_by = db.Column(db.Integer)
     assign_to = db.Column(db.Integer)
     assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -45,7 +77,7 @@ class TicketAssignmentLog(db.Model):
     __tablename__ = "ticket_assignment_log"
 
     id = db.Column(db.Integer, primary_key=True)
-    ticket_id = db.Column(db.Integer, nullable=False)
+    ticket_id = db.Column(db.Integer, nullable=False, index=True)
     old_assign_to = db.Column(db.Integer, nullable=True)
     new_assign_to = db.Column(db.Integer, nullable=False)
     changed_by = db.Column(db.Integer, nullable=False)
@@ -56,8 +88,8 @@ class TicketFile(db.Model):
     __tablename__ = "ticket_files"
 
     id         = db.Column(db.Integer, primary_key=True)
-    ticket_id  = db.Column(db.Integer)
-    comment_id = db.Column(db.Integer, nullable=True)  # Link file to a comment if uploaded with comment
+    ticket_id  = db.Column(db.Integer, index=True)
+    comment_id = db.Column(db.Integer, nullable=True, index=True)  # Link file to a comment if uploaded with comment
     file_url   = db.Column(db.Text)
     file_name  = db.Column(db.String(255))
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -65,6 +97,10 @@ class TicketFile(db.Model):
 
 class TicketComment(db.Model):
     __tablename__ = "ticket_comments"
+    __table_args__ = (
+        # comments of a ticket, oldest first
+        db.Index("ix_ticket_comments_ticket_id_created_at", "ticket_id", "created_at"),
+    )
 
     id        = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.Integer)
@@ -74,9 +110,12 @@ class TicketComment(db.Model):
 
 class TicketTag(db.Model):
     __tablename__ = "ticket_tags"
+    __table_args__ = (
+        db.Index("ix_ticket_tags_tag_name_ticket_id", "tag_name", "ticket_id"),
+    )
 
     id        = db.Column(db.Integer, primary_key=True)
-    ticket_id = db.Column(db.Integer)
+    ticket_id = db.Column(db.Integer, index=True)
     tag_name  = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -99,9 +138,12 @@ class Category(db.Model):
 
 class TicketFollowUp(db.Model):
     __tablename__ = "ticket_followups"
+    __table_args__ = (
+        db.Index("ix_ticket_followups_user_id_ticket_id", "user_id", "ticket_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    ticket_id = db.Column(db.Integer)
+    ticket_id = db.Column(db.Integer, index=True)
     user_id = db.Column(db.Integer)   # jisne followup add kiya
     note = db.Column(db.Text, nullable=True)          # followup note
     followup_date = db.Column(db.DateTime, default=db.func.now())
@@ -112,6 +154,10 @@ class TicketFollowUp(db.Model):
         return f"<TicketFollowUp {self.id} - {self.ticket_id}>"
 class TicketNotification(db.Model):
     __tablename__ = "ticket_notifications"
+    __table_args__ = (
+        db.Index("ix_ticket_notifications_receiver_created_at_id", "receiver_id", "created_at", "id"),
+        db.Index("ix_ticket_notifications_ticket_created_at_id", "ticket_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.Integer)
@@ -127,6 +173,9 @@ class TicketNotification(db.Model):
 
 class TicketStatusLog(db.Model):
     __tablename__ = "ticket_status_logs"
+    __table_args__ = (
+        db.Index("ix_ticket_status_logs_ticket_id_changed_at", "ticket_id", "changed_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.Integer, nullable=False)
@@ -147,6 +196,9 @@ class FormEntry(db.Model):
     Represents a type/entries of form (linked to form_types table)
     """
     __tablename__ = "form_entries"
+    __table_args__ = (
+        db.Index("ix_form_entries_form_type_id_created_at", "form_type_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     form_type_id = db.Column(db.Integer, nullable=False)
@@ -166,6 +218,10 @@ class FormFieldValue(db.Model):
     Stores individual field data (like field_name and value) for each form.
     """
     __tablename__ = "form_field_values"
+    __table_args__ = (
+        # all fields of an entry, and the upsert lookup by (entry, field_name)
+        db.Index("ix_form_field_values_entry_field", "form_entry_id", "field_name"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     form_entry_id = db.Column(db.Integer)
@@ -183,6 +239,9 @@ class FormEmailLog(db.Model):
     Logs every email sent for form notifications.
     """
     __tablename__ = "form_email_logs"
+    __table_args__ = (
+        db.Index("ix_form_email_logs_receiver_created_at_id", "receiver_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     form_entry_id = db.Column(db.Integer)
@@ -202,6 +261,9 @@ class FormEmailLog(db.Model):
 
 class ContactFormSubmission(db.Model):
     __tablename__ = 'contact_form_submissions'
+    __table_args__ = (
+        db.Index("ix_contact_form_submissions_clinic_created_at_id", "clinic_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     clinic_id = db.Column(db.Integer, nullable=False)
@@ -224,8 +286,8 @@ class ContactFormTicketLink(db.Model):
     __tablename__ = "contact_form_ticket_links"
 
     id = db.Column(db.Integer, primary_key=True)
-    contact_form_id = db.Column(db.Integer, db.ForeignKey("contact_form_submissions.id"), nullable=False)
-    ticket_id = db.Column(db.Integer, db.ForeignKey("tickets.id"), nullable=False)
+    contact_form_id = db.Column(db.Integer, db.ForeignKey("contact_form_submissions.id"), nullable=False, index=True)
+    ticket_id = db.Column(db.Integer, db.ForeignKey("tickets.id"), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # optional relationships
@@ -237,6 +299,10 @@ class ContactFormTicketLink(db.Model):
 
 class EmailLog(db.Model):
     __tablename__ = "email_logs"
+    __table_args__ = (
+        # latest log for a recipient (mailgun webhooks)
+        db.Index("ix_email_logs_to_created_at", "to", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     to = db.Column(db.String(255), nullable=False)
@@ -246,7 +312,7 @@ class EmailLog(db.Model):
     mailgun_response = db.Column(db.Text, nullable=True)
     status_code = db.Column(db.Integer, nullable=True)
     success = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
 
 class EmailProcessedLog(db.Model):
@@ -259,11 +325,11 @@ class EmailProcessedLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email_id = db.Column(db.String(500), unique=True, nullable=False)  # Microsoft Graph email ID
     conversation_id = db.Column(db.String(500), nullable=True, index=True)  # For grouping email threads
-    ticket_id = db.Column(db.Integer, nullable=True)  # Which ticket this email belongs to
+    ticket_id = db.Column(db.Integer, nullable=True, index=True)  # Which ticket this email belongs to
     sender_email = db.Column(db.String(255), nullable=True)
     user_id = db.Column(db.Integer, nullable=True)  # User ID from Auth System
     email_subject = db.Column(db.String(500), nullable=True)
-    processed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     is_followup = db.Column(db.Boolean, default=False)  # True if added as comment to existing ticket
 
     def __repr__(self):
@@ -292,6 +358,9 @@ class Project(db.Model):
     Project model for managing projects
     """
     __tablename__ = "projects"
+    __table_args__ = (
+        db.Index("ix_projects_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -346,7 +415,7 @@ class ProjectAssignment(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False, index=True)
-    user_id = db.Column(db.Integer, nullable=False)  # Assigned team member
+    user_id = db.Column(db.Integer, nullable=False, index=True)  # Assigned team member
     assigned_by = db.Column(db.Integer, nullable=True)  # User who assigned
     assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -359,3 +428,82 @@ class EmailConversationLock(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     conversation_id = db.Column(db.String(255), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class UserCache(db.Model):
+    """
+    Local mirror of Auth System users so read endpoints can resolve
+    usernames with one IN query instead of remote calls.
+    Kept fresh by app.utils.user_sync.
+    """
+    __tablename__ = "users_cache"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Auth System user id
+    username = db.Column(db.String(255))
+    email = db.Column(db.String(255), index=True)
+    phone = db.Column(db.String(255))
+    role = db.Column(db.String(100))
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def to_user_info(self):
+        """Same shape as helper_function.get_user_info_by_id()"""
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "phone": self.phone,
+            "role": self.role
+        }
+
+    def __repr__(self):
+        return f"<UserCache {self.id} - {self.username}>"
+
+
+class TicketSearchDocument(db.Model):
+    """
+    One searchable document per ticket: title + details + all comment text.
+    Maintained by app.utils.ticket_search; the full-text structures on top of
+    it (Postgres tsvector + GIN, SQLite FTS5) are dialect-specific DDL there.
+    """
+    __tablename__ = "ticket_search_documents"
+
+    ticket_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(255))
+    body = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TicketSearchDocument ticket={self.ticket_id}>"
+
+
+class TicketSummary(db.Model):
+    """
+    Denormalized list-view row per ticket: creator and assignee ids, counts,
+    category and project badge, last activity (usernames are resolved when read). Rewritten in the same transaction as
+    any change to the ticket or its child rows by app.utils.ticket_summaries.
+    """
+    __tablename__ = "ticket_summaries"
+    __table_args__ = (
+        db.Index("ix_ticket_summaries_created_at_ticket_id", "created_at", "ticket_id"),
+    )
+
+    ticket_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(255))
+    status = db.Column(db.String(255))
+    priority = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime)
+    created_by = db.Column(db.Integer)
+    assignees = db.Column(db.Text)          # JSON: [user id, ...]
+    category_id = db.Column(db.Integer)
+    category_name = db.Column(db.String(255))
+    project_id = db.Column(db.Integer)
+    project_name = db.Column(db.String(255))
+    project_color = db.Column(db.String(50))
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    file_count = db.Column(db.Integer, nullable=False, default=0)
+    follower_count = db.Column(db.Integer, nullable=False, default=0)
+    last_activity_at = db.Column(db.DateTime)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TicketSummary ticket={self.ticket_id}>"
@@ -1,11 +1,12 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from app.model import Ticket, TicketNotification, FormEmailLog, EmailLog
-from app.utils.helper_function import get_user_info_by_id
+from app.utils.helper_function import get_user_info_by_id, get_users_info_by_ids
 from app.dashboard_routes import require_api_key, validate_token
+from app.utils.form_types import get_form_types
+from app.utils.pagination import cursor_requested, keyset_merge
 from datetime import datetime
 import os
-import requests
 
 
 
@@ -14,10 +15,8 @@ notification_bp = Blueprint("notifications", __name__, url_prefix="notifications
 # ───────────────────────────────
 # Create Notification function
 # ───────────────────────────────
-AUTH_API_BASE = "https://api.dental360grp.com/api/form_types"
-
-def create_notification(ticket_id, receiver_id, sender_id, notification_type, message=None):
-    """Create a new ticket notification"""
+def create_notification(ticket_id, receiver_id, sender_id, notification_type, message=None, commit=True):
+    """Create a new ticket notification (commit=False leaves it in the caller's transaction)"""
     notif = TicketNotification(
         ticket_id=ticket_id,
         receiver_id=receiver_id,
@@ -26,7 +25,8 @@ def create_notification(ticket_id, receiver_id, sender_id, notification_type, me
         message=message
     )
     db.session.add(notif)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return notif
 
 # ───────────────────────────────
@@ -47,21 +47,50 @@ def get_notifications():
 
     # ────────────── Ticket Notifications ──────────────
     if ticket_id:
-        tickets = TicketNotification.query.filter_by(ticket_id=ticket_id).all()
+        ticket_query = TicketNotification.query.filter_by(ticket_id=ticket_id)
     else:
         if not receiver_id:
             return jsonify({"error": "user_id is required"}), 400
-        tickets = TicketNotification.query.filter_by(receiver_id=receiver_id).all()
+        ticket_query = TicketNotification.query.filter_by(receiver_id=receiver_id)
+
+    form_query = None
+    if not ticket_id and receiver_id:
+        form_query = FormEmailLog.query.filter_by(receiver_id=receiver_id)
+
+    pagination = None
+    if cursor_requested():
+        # Keyset mode: only per_page + 1 rows per source instead of everything
+        sources = {"ticket": (ticket_query, TicketNotification)}
+        if form_query is not None:
+            sources["form"] = (form_query, FormEmailLog)
+        pagination = keyset_merge(sources, request.args.get("cursor"), per_page)
+        tickets = [row for source, row in pagination.items if source == "ticket"]
+        forms = [row for source, row in pagination.items if source == "form"]
+    else:
+        tickets = ticket_query.all()
+        forms = form_query.all() if form_query is not None else []
 
+    # Resolve every sender/receiver in one concurrent step
+    user_ids = set()
     for n in tickets:
-        ticket = Ticket.query.get(n.ticket_id)
-        sender_info = get_user_info_by_id(n.sender_id) if n.sender_id else None
-        receiver_info = get_user_info_by_id(n.receiver_id) if n.receiver_id else None
+        user_ids.update([n.sender_id, n.receiver_id])
+    for f in forms:
+        user_ids.update([f.sender_id, f.receiver_id])
+    users = get_users_info_by_ids(user_ids)
+
+    ticket_ids = {n.ticket_id for n in tickets if n.ticket_id}
+    titles = {}
+    if ticket_ids:
+        titles = dict(db.session.query(Ticket.id, Ticket.title).filter(Ticket.id.in_(ticket_ids)).all())
+
+    for n in tickets:
+        sender_info = users.get(n.sender_id)
+        receiver_info = users.get(n.receiver_id)
         combined.append({
             "id": n.id,
             "source": "ticket",
             "ticket_id": n.ticket_id,
-            "title": ticket.title if ticket else None,
+            "title": titles.get(n.ticket_id),
             "message": n.message,
             "notification_type": n.notification_type,
             "created_at": n.created_at,
@@ -74,25 +103,13 @@ def get_notifications():
         if not receiver_id:
             return jsonify({"error": "user_id is required"}), 400
 
-        forms = FormEmailLog.query.filter_by(receiver_id=receiver_id).all()
+        # one cached lookup per distinct form type, not per row
+        form_types = get_form_types(f.form_type_id for f in forms)
+
         for f in forms:
-            sender_info = get_user_info_by_id(f.sender_id) if f.sender_id else None
-            form_type_data = None
-
-            try:
-                resp = requests.get(f"{AUTH_API_BASE}/{f.form_type_id}", timeout=8)
-                if resp.status_code == 200:
-                    api_data = resp.json()
-                    form_type_name = api_data.get("name")
-                    form_type_data = {
-                        "id": api_data.get("id"),
-                        "name": api_data.get("name"),
-                        "display_name": api_data.get("display_name"),
-                        "description": api_data.get("description"),
-                        "assigned_users": api_data.get("users", [])
-                    }
-            except Exception as e:
-                print(f"⚠️ Error fetching form_type from AUTH API: {e}")
+            sender_info = users.get(f.sender_id)
+            form_type = form_types.get(f.form_type_id)
+            form_type_name = form_type.get("name") if form_type else None
 
             combined.append({
                 "id": f.id,
@@ -104,11 +121,27 @@ def get_notifications():
                 "status": f.status,
                 "created_at": f.created_at,
                 "sender_info": sender_info,
-                "receiver_info": get_user_info_by_id(f.receiver_id)
+                "receiver_info": users.get(f.receiver_id)
             })
 
     # ────────────── Sort & Paginate ──────────────
-    combined.sort(key=lambda x: x["created_at"], reverse=True)
+    if pagination is not None:
+        # keep keyset_merge's (created_at, id) order so it matches next_cursor
+        by_row = {(item["source"], item["id"]): item for item in combined}
+        return jsonify({
+            "notifications": [by_row[(source, row.id)] for source, row in pagination.items],
+            "pagination": {
+                "page": None,
+                "per_page": per_page,
+                "total": None,
+                "pages": None,
+                "has_next": pagination.has_next,
+                "next_cursor": pagination.next_cursor
+            }
+        }), 200
+
+    # undated rows last, as in keyset mode
+    combined.sort(key=lambda x: (x["created_at"] is not None, x["created_at"] or datetime.min, x["id"]), reverse=True)
     total = len(combined)
     start = (page - 1) * per_page
     end = start + per_page
@@ -120,7 +153,9 @@ def get_notifications():
             "page": page,
             "per_page": per_page,
             "total": total,
-            "pages": (total + per_page - 1) // per_page
+            "pages": (total + per_page - 1) // per_page,
+            "has_next": end < total,
+            "next_cursor": None
         }
     }), 200
 
@@ -9,7 +9,10 @@ from app.model import (
     Ticket, TicketAssignment, TicketFile, TicketTag, TicketComment,
     Category, TicketFollowUp, TicketStatusLog
 )
-from app.utils.helper_function import upload_to_s3, get_user_info_by_id
+from app.utils.helper_function import upload_to_s3, get_user_info_by_id, get_users_info_by_ids
+from app.utils.ticket_serializer import serialize_tickets, serializer_options, PROJECT_INCLUDE
+from app.utils.pagination import paginate, next_cursor
+from app.utils.ticket_query import TicketQuery
 from app.utils.email_templete import send_project_assignment_email, send_project_update_email, send_project_ticket_created_email
 from app.notification_route import create_notification
 from app.dashboard_routes import require_api_key, validate_token
@@ -156,21 +159,32 @@ def get_projects():
         query = query.filter(Project.id.in_(project_ids))
     
     query = query.order_by(Project.created_at.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = paginate(query, Project, page, per_page)
     projects = pagination.items
     
+    # Resolve creators + team members of the whole page in one concurrent step
+    project_ids = [p.id for p in projects]
+    assignments_by_project = {}
+    if project_ids:
+        for a in ProjectAssignment.query.filter(ProjectAssignment.project_id.in_(project_ids)).all():
+            assignments_by_project.setdefault(a.project_id, []).append(a)
+    user_ids = {p.created_by for p in projects}
+    for project_assignments in assignments_by_project.values():
+        user_ids.update(a.user_id for a in project_assignments)
+    users = get_users_info_by_ids(user_ids)
+    
     result = []
     for p in projects:
-        created_by_info = get_user_info_by_id(p.created_by) if p.created_by else None
+        created_by_info = users.get(p.created_by)
         
         # Get tags
         tags = [tag.tag_name for tag in ProjectTag.query.filter_by(project_id=p.id).all()]
         
         # Get team members
-        assignments = ProjectAssignment.query.filter_by(project_id=p.id).all()
+        assignments = assignments_by_project.get(p.id, [])
         team_members = []
         for a in assignments:
-            user_info = get_user_info_by_id(a.user_id) if a.user_id else None
+            user_info = users.get(a.user_id)
             team_members.append({
                 "user_id": a.user_id,
                 "username": user_info.get("username") if user_info else None,
@@ -213,7 +227,9 @@ def get_projects():
             "page": pagination.page,
             "per_page": pagination.per_page,
             "total": pagination.total,
-            "pages": pagination.pages
+            "pages": pagination.pages,
+            "has_next": pagination.has_next,
+            "next_cursor": next_cursor(pagination)
         }
     })
 
@@ -401,7 +417,9 @@ def delete_project(project_id):
     # Delete related records
     ProjectTag.query.filter_by(project_id=project.id).delete()
     ProjectAssignment.query.filter_by(project_id=project.id).delete()
-    ProjectTicket.query.filter_by(project_id=project.id).delete()
+    # row by row so the linked tickets' versions and summaries follow (bulk delete skips session hooks)
+    for link in ProjectTicket.query.filter_by(project_id=project.id).all():
+        db.session.delete(link)
     
     db.session.delete(project)
     db.session.commit()
@@ -542,79 +560,22 @@ def get_project_tickets(project_id):
     priority = request.args.get("priority")
     search = request.args.get("search", "").strip()
     
-    # Get ticket IDs for this project
-    project_ticket_ids = [pt.ticket_id for pt in ProjectTicket.query.filter_by(project_id=project_id).all()]
-    
-    if not project_ticket_ids:
-        return jsonify({
-            "tickets": [],
-            "pagination": {
-                "page": page,
-                "per_page": per_page,
-                "total": 0,
-                "pages": 0
-            }
-        })
-    
-    query = Ticket.query.filter(Ticket.id.in_(project_ticket_ids))
-    
-    if status:
-        query = query.filter(Ticket.status.ilike(f"%{status}%"))
-    if category_id:
-        query = query.filter(Ticket.category_id == category_id)
-    if priority:
-        query = query.filter(Ticket.priority.ilike(f"%{priority}%"))
-    if search:
-        query = query.filter(or_(
-            Ticket.title.ilike(f"%{search}%"),
-            Ticket.details.ilike(f"%{search}%")
-        ))
-    
-    query = query.order_by(Ticket.created_at.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Project membership is a semi-join; no ticket id list is loaded first
+    query = (
+        TicketQuery()
+        .in_project(project_id)
+        .status(status)
+        .category(category_id)
+        .priority(priority)
+        .search(search)
+        .newest_first()
+        .query
+    )
+    pagination = paginate(query, Ticket, page, per_page)
     tickets = pagination.items
     
-    result = []
-    for t in tickets:
-        created_by_info = get_user_info_by_id(t.user_id) if t.user_id else None
-        
-        assignments = TicketAssignment.query.filter_by(ticket_id=t.id).all()
-        assignees = []
-        for a in assignments:
-            assign_by_info = get_user_info_by_id(a.assign_by) if a.assign_by else None
-            assign_to_info = get_user_info_by_id(a.assign_to) if a.assign_to else None
-            assignees.append({
-                "assign_by": a.assign_by,
-                "assign_by_username": assign_by_info.get("username") if assign_by_info else None,
-                "assign_to": a.assign_to,
-                "assign_to_username": assign_to_info.get("username") if assign_to_info else None,
-                "assigned_at": a.assigned_at.isoformat() if a.assigned_at else None
-            })
-        
-        files = [{"name": f.file_name, "url": f.file_url}
-                 for f in TicketFile.query.filter_by(ticket_id=t.id).all()]
-        tags = [tag.tag_name for tag in TicketTag.query.filter_by(ticket_id=t.id).all()]
-        
-        category = None
-        if t.category_id:
-            cat = Category.query.get(t.category_id)
-            if cat:
-                category = {"id": cat.id, "name": cat.name, "is_active": cat.is_active}
-        
-        result.append({
-            "id": t.id,
-            "title": t.title,
-            "details": t.details,
-            "priority": t.priority,
-            "status": t.status,
-            "due_date": t.due_date.isoformat() if t.due_date else None,
-            "created_at": t.created_at.isoformat(),
-            "created_by": created_by_info,
-            "assignees": assignees,
-            "files": files,
-            "tags": tags,
-            "category": category
-        })
+    include, fields = serializer_options(PROJECT_INCLUDE)
+    result = serialize_tickets(tickets, include, fields, iso_dates=True)
     
     return jsonify({
         "project_id": project_id,
@@ -623,7 +584,9 @@ def get_project_tickets(project_id):
             "page": pagination.page,
             "per_page": pagination.per_page,
             "total": pagination.total,
-            "pages": pagination.pages
+            "pages": pagination.pages,
+            "has_next": pagination.has_next,
+            "next_cursor": next_cursor(pagination)
         }
     })
 
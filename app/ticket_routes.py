@@ -1,11 +1,9 @@
 import os
-import requests
 import os
 import uuid
 import mimetypes
 import botocore
 import boto3
-import requests
 from datetime import datetime
 from flask import Blueprint, request, jsonify
 from app import db
@@ -14,19 +12,28 @@ from aiohttp import BasicAuth
 import asyncio
 import sys
 import threading
-from sqlalchemy import or_, and_, func
+from sqlalchemy import and_
 import re
 import html
 import io
 from PIL import Image
 
 from app.model import Ticket, TicketAssignment, TicketFile, TicketTag, TicketComment, Category, TicketFollowUp, \
-    TicketStatusLog, TicketAssignmentLog, ContactFormTicketLink, EmailProcessedLog, TicketAssignLocation, \
-    ProjectTicket, Project, ProjectTag, ProjectAssignment
-from app.utils.helper_function import upload_to_s3, send_email, get_user_info_by_id, update_ticket_status, update_ticket_assignment_log, get_user_id_by_email, get_graph_token, GRAPH_BASE_URL
+    EmailProcessedLog, TicketAssignLocation, ProjectAssignment
+from app.utils.helper_function import upload_to_s3, send_email, get_user_info_by_id, get_users_info_by_ids, update_ticket_status, update_ticket_assignment_log, get_user_id_by_email, prime_user_email_directory, get_graph_token, GRAPH_BASE_URL
 from app.utils.email_templete import send_tag_email, send_assign_email, send_follow_email, send_update_ticket_email
 from app.notification_route import create_notification
 from app.dashboard_routes import require_api_key, validate_token
+from app.utils.http_client import http_client
+from app.utils.ticket_serializer import serialize_tickets, serializer_options, LIST_INCLUDE, FILTER_INCLUDE, DETAIL_INCLUDE
+from app.utils.location_directory import get_locations, get_clinic_locations_map
+from app.utils.pagination import paginate, next_cursor
+from app.utils.ticket_query import TicketQuery
+from app.utils.ticket_search import ranked_search
+from app.utils.ticket_suggest import suggest_visible_tickets, SUGGEST_LIMIT, SUGGEST_MAX_LIMIT
+from app.utils.etag import ticket_etag, list_etag, not_modified, with_etag
+from app.utils.ticket_summaries import serialize_summaries
+from app.utils.ticket_timeline import timeline_page, timeline_requested, TIMELINE_LIMIT, TIMELINE_PREVIEW
 from app import llm_client
 # ─── Windows Fix for asyncio ─────────────────────────────────────────────
 # if sys.platform.startswith("win"):
@@ -82,49 +89,6 @@ def compress_file(file_storage):
     return output, filename
 
 
-def get_clinic_locations_map(clinic_id):
-    """
-    Returns:
-      { location_id (int): location_display_name (str) }
-    Based on Auth API response:
-      { "locations": [ ... ] }
-    """
-    try:
-        url = f"{AUTH_SYSTEM_URL}/clinic_locations/get_all/{clinic_id}"
-        resp = requests.get(url, timeout=5)
-
-        if resp.status_code != 200:
-            return {}
-
-        payload = resp.json()
-
-        # ✅ EXACT key from your response
-        locations = payload.get("locations", [])
-        if not isinstance(locations, list):
-            return {}
-
-        location_map = {}
-        for loc in locations:
-            if not isinstance(loc, dict):
-                continue
-
-            loc_id = loc.get("id")
-            loc_name = (
-                loc.get("location_name")   # ✅ primary
-                or loc.get("display_name")  # fallback
-                or f"Location #{loc_id}"
-            )
-
-            if loc_id:
-                location_map[int(loc_id)] = loc_name.strip()
-
-        return location_map
-
-    except Exception as e:
-        print("❌ Failed to fetch clinic locations:", e)
-        return {}
-
-
 # ─────────────────────────────────────────────
 # Create Ticket with files and @username tags
 @ticket_bp.route("/ticket", methods=["POST"])
@@ -267,439 +231,265 @@ def update_ticket(ticket_id):
     data = request.form if request.form else request.json
     updated_fields = []  # Track changes
 
-    # 👇 Always resolve updater info first
     updater_id = int(data.get("updated_by")) if data.get(
         "updated_by") else None
-    updater_info = get_user_info_by_id(updater_id)
-
-    # --- Title
-    if "title" in data and data["title"] != ticket.title:
-        updated_fields.append(("title", ticket.title, data["title"]))
-        ticket.title = data["title"]
-
-    # --- Details
-    if "details" in data and data["details"] != ticket.details:
-        updated_fields.append(("details", ticket.details, data["details"]))
-        ticket.details = data["details"]
-
-    # --- Priority
-    if "priority" in data and data["priority"] != ticket.priority:
-        updated_fields.append(("priority", ticket.priority, data["priority"]))
-        ticket.priority = data["priority"]
-
-    # --- Status
-    if "status" in data and data["status"] != ticket.status:
-        old_status = ticket.status
-        new_status = data["status"]
-        updated_fields.append(("status", old_status, new_status))
-        # Helper call se status + log dono handle ho jaye ga
-        update_ticket_status(ticket.id, new_status, updater_id)
-        if new_status.lower() == "completed" and not ticket.completed_at:
-            ticket.completed_at = datetime.utcnow()
-
-    # --- Category
-    category_changed = False
-    if "category_id" in data and str(data["category_id"]) != str(ticket.category_id):
-        updated_fields.append(
-            ("category_id", ticket.category_id, data["category_id"]))
-        ticket.category_id = data["category_id"]
-        category_changed = True
-
-    clinic_id = 1
-    location_map = get_clinic_locations_map(clinic_id)
-
-    # --- Location ID
-    if "location_id" in data:
-        new_location_id = data["location_id"]
-
-        if new_location_id == "" or new_location_id is None:
-            new_location_id = None
-        else:
-            try:
-                new_location_id = int(new_location_id)
-            except (ValueError, TypeError):
-                return jsonify({
-                    "error": "Invalid location_id format. Must be an integer or null"
-                }), 400
-
-        if ticket.location_id != new_location_id:
-            old_location_name = location_map.get(
-                ticket.location_id,
-                f"Location #{ticket.location_id}"
-            )
-            new_location_name = location_map.get(
-                new_location_id,
-                f"Location #{new_location_id}"
-            )
-
-            updated_fields.append((
-                "location",
-                old_location_name,
-                new_location_name
-            ))
 
-            ticket.location_id = new_location_id
-
-    # --- Due Date
-    if "due_date" in data:
-        try:
-            new_due_date = datetime.strptime(
-                data["due_date"], "%Y-%m-%d").date()
-            if ticket.due_date != new_due_date:
-                updated_fields.append(
-                    ("due_date", str(ticket.due_date), str(new_due_date)))
-                ticket.due_date = new_due_date
-        except ValueError:
-            return jsonify({"error": "Invalid due_date format. Use YYYY-MM-DD"}), 400
-    # --- Assignee Change (main part)
-    if "assign_to" in data:
-        new_assign_to = int(data["assign_to"])
-        assignment = TicketAssignment.query.filter_by(
-            ticket_id=ticket.id).first()
-        old_assign_to = assignment.assign_to if assignment else None
-        if old_assign_to != new_assign_to:
-            updated_fields.append(("assign_to", old_assign_to, new_assign_to))
-            if assignment:
-                assignment.assign_to = new_assign_to
-                assignment.assign_by = updater_id
+    def invalid(message):
+        db.session.rollback()
+        return jsonify({"error": message}), 400
+
+    # Fields, status, assignment, followers, files, their logs and the
+    # notification rows all go in ONE transaction. Autoflush is off, so no row
+    # is written (or locked) until the commit below; emails go out after it.
+    with db.session.no_autoflush:
+        # --- Title
+        if "title" in data and data["title"] != ticket.title:
+            updated_fields.append(("title", ticket.title, data["title"]))
+            ticket.title = data["title"]
+
+        # --- Details
+        if "details" in data and data["details"] != ticket.details:
+            updated_fields.append(("details", ticket.details, data["details"]))
+            ticket.details = data["details"]
+
+        # --- Priority
+        if "priority" in data and data["priority"] != ticket.priority:
+            updated_fields.append(("priority", ticket.priority, data["priority"]))
+            ticket.priority = data["priority"]
+
+        # --- Status
+        if "status" in data and data["status"] != ticket.status:
+            old_status = ticket.status
+            new_status = data["status"]
+            updated_fields.append(("status", old_status, new_status))
+            # status + log, same transaction
+            update_ticket_status(ticket.id, new_status, updater_id, ticket=ticket, commit=False)
+            if new_status.lower() == "completed" and not ticket.completed_at:
+                ticket.completed_at = datetime.utcnow()
+
+        # --- Category
+        category_changed = False
+        if "category_id" in data and str(data["category_id"]) != str(ticket.category_id):
+            updated_fields.append(
+                ("category_id", ticket.category_id, data["category_id"]))
+            ticket.category_id = data["category_id"]
+            category_changed = True
+
+        # --- Location ID
+        if "location_id" in data:
+            new_location_id = data["location_id"]
+
+            if new_location_id == "" or new_location_id is None:
+                new_location_id = None
             else:
-                assignment = TicketAssignment(
-                    ticket_id=ticket.id,
-                    assign_to=new_assign_to,
-                    assign_by=updater_id
+                try:
+                    new_location_id = int(new_location_id)
+                except (ValueError, TypeError):
+                    return invalid("Invalid location_id format. Must be an integer or null")
+
+            if ticket.location_id != new_location_id:
+                # only now do we need names; served from the cached location directory
+                location_map = get_clinic_locations_map(ticket.clinic_id)
+                old_location_name = location_map.get(
+                    ticket.location_id,
+                    f"Location #{ticket.location_id}"
+                )
+                new_location_name = location_map.get(
+                    new_location_id,
+                    f"Location #{new_location_id}"
                 )
-                db.session.add(assignment)
-            # ✅ Save assignment log
-            update_ticket_assignment_log(
-                ticket.id, old_assign_to, new_assign_to, updater_id)
 
-    db.session.commit()
+                updated_fields.append((
+                    "location",
+                    old_location_name,
+                    new_location_name
+                ))
 
-    # -----------------------------
-    # 📩 Helper: Get recipients (assign_by + assign_to + ALL followups)
-    def get_notification_recipients(ticket, updater_id):
-        recipients = set()
-        assignment = TicketAssignment.query.filter_by(
-            ticket_id=ticket.id).first()
-        assign_by = assignment.assign_by if assignment else None
-        assign_to = assignment.assign_to if assignment else None
+                ticket.location_id = new_location_id
 
-        if assign_by and assign_by != updater_id:
-            recipients.add(assign_by)
-        if assign_to and assign_to != updater_id:
-            recipients.add(assign_to)
-
-        # 🔹 Explicitly include ALL followups (except updater)
-        followups = TicketFollowUp.query.filter_by(ticket_id=ticket.id).all()
-        print("DEBUG followups in DB:", [
-              (f.user_id, f.note) for f in followups])
-        for fu in followups:
-            if fu.user_id != updater_id:   # ✅ SKIP updater
-                recipients.add(fu.user_id)
-
-        return list(recipients)
-
-    # -----------------------------
-    # Notify targeted users about changes
-    if updated_fields:
-        recipients = get_notification_recipients(ticket, updater_id)
-        change_summary = ", ".join(
-            [f"{f}: {o}  {n}" for f, o, n in updated_fields])
+        # --- Due Date
+        if "due_date" in data:
+            try:
+                new_due_date = datetime.strptime(
+                    data["due_date"], "%Y-%m-%d").date()
+                if ticket.due_date != new_due_date:
+                    updated_fields.append(
+                        ("due_date", str(ticket.due_date), str(new_due_date)))
+                    ticket.due_date = new_due_date
+            except ValueError:
+                return invalid("Invalid due_date format. Use YYYY-MM-DD")
 
-        # Fetch assignment once for debug printing
+        # --- Assignee Change (main part)
         assignment = TicketAssignment.query.filter_by(
             ticket_id=ticket.id).first()
+        if "assign_to" in data:
+            new_assign_to = int(data["assign_to"])
+            old_assign_to = assignment.assign_to if assignment else None
+            if old_assign_to != new_assign_to:
+                updated_fields.append(("assign_to", old_assign_to, new_assign_to))
+                if assignment:
+                    assignment.assign_to = new_assign_to
+                    assignment.assign_by = updater_id
+                else:
+                    assignment = TicketAssignment(
+                        ticket_id=ticket.id,
+                        assign_to=new_assign_to,
+                        assign_by=updater_id
+                    )
+                    db.session.add(assignment)
+                # ✅ Assignment log, same transaction
+                update_ticket_assignment_log(
+                    ticket.id, old_assign_to, new_assign_to, updater_id, ticket=ticket, commit=False)
+
         assign_by = assignment.assign_by if assignment else None
         assign_to = assignment.assign_to if assignment else None
+        # assign_by + assign_to, never the updater
+        assignees = {uid for uid in (assign_by, assign_to) if uid and uid != updater_id}
 
-        print("\n📩 Notification Debug Log")
-        print(f"➡️ Updater ID: {updater_id}")
-        print(f"➡️ assign_by: {assign_by}, assign_to: {assign_to}")
-        print(f"➡️ Recipients selected: {recipients}")
-        print(f"➡️ Changes: {change_summary}\n")
-
-        for uid in recipients:
-            user_info = get_user_info_by_id(uid)
-            if not user_info:
-                continue
-
-            # Debug role printing
-            role = []
-            if uid == assign_by:
-                role.append("ASSIGN_BY")
-            if uid == assign_to:
-                role.append("ASSIGN_TO")
-            if TicketFollowUp.query.filter_by(ticket_id=ticket.id, user_id=uid).first():
-                role.append("FOLLOWUP")
-
-            print(f"✅ Email/Notif sent to user_id={uid}, "
-                  f"username={user_info.get('username')}, "
-                  f"roles={','.join(role) if role else 'N/A'}")
+        # Followers loaded once; every change below is tracked in this map
+        followups = {
+            fu.user_id: fu for fu in TicketFollowUp.query.filter_by(ticket_id=ticket.id).all()
+        }
 
-            # Send email + notification
-            send_update_ticket_email(
-                ticket, user_info, updater_info, updated_fields)
-            create_notification(
+        # 📩 Field changes go to assignees + followers as they were before this request
+        update_recipients = set()
+        if updated_fields:
+            update_recipients = (assignees | set(followups)) - {updater_id, None}
+            print("\n📩 Notification Debug Log")
+            print(f"➡️ Updater ID: {updater_id}")
+            print(f"➡️ assign_by: {assign_by}, assign_to: {assign_to}")
+            print(f"➡️ Recipients selected: {sorted(update_recipients)}")
+
+        # (user_id, "added" | "removed", what the follower gets: None | "notice" | "email")
+        follower_events = []
+
+        def follow(uid, follower_gets):
+            if uid == updater_id or uid in followups:   # ✅ skip updater / existing
+                return
+            fu = TicketFollowUp(
                 ticket_id=ticket.id,
-                receiver_id=uid,
-                sender_id=updater_id,
-                notification_type="update",
-                message=f"Ticket updated ({change_summary})"
+                user_id=uid,
+                note="Added as follow-up user",
+                created_at=datetime.utcnow()
             )
+            db.session.add(fu)
+            followups[uid] = fu
+            follower_events.append((uid, "added", follower_gets))
+
+        def unfollow(uid, follower_gets):
+            if uid == updater_id or uid not in followups:   # ✅ skip updater / non-followers
+                return
+            db.session.delete(followups.pop(uid))
+            follower_events.append((uid, "removed", follower_gets))
+
+        # Handle follower_ids (replace all followers with provided list)
+        if "follower_ids" in data:
+            follower_ids = data.get("follower_ids")
+            if isinstance(follower_ids, list):
+                follower_ids = {int(uid) for uid in follower_ids if uid}
+                for uid in set(followups) - follower_ids:
+                    unfollow(uid, None)
+                for uid in follower_ids - set(followups):
+                    follow(uid, "notice")
+
+        # Handle newly added / removed followups
+        if "followup_user_ids_add" in data:
+            for uid in [int(uid.strip()) for uid in str(
+                    data["followup_user_ids_add"]).split(",") if uid.strip().isdigit()]:
+                follow(uid, "email")
+        if "followup_user_ids_remove" in data:
+            for uid in [int(uid.strip()) for uid in str(
+                    data["followup_user_ids_remove"]).split(",") if uid.strip().isdigit()]:
+                unfollow(uid, "email")
+
+        # Category assignee hears about a category change
+        category_assignee_id = None
+        if category_changed and ticket.category_id:
+            category = Category.query.get(ticket.category_id)
+            category_assignee_id = category.assignee_id if category else None
 
-    # -----------------------------
-    # Handle follower_ids (replace all followers with provided list)
-    if "follower_ids" in data:
-        follower_ids = data.get("follower_ids")
-        if isinstance(follower_ids, list):
-            # Remove duplicates
-            follower_ids = list(set([int(uid) for uid in follower_ids if uid]))
-
-            # Get current followers
-            current_followups = TicketFollowUp.query.filter_by(
-                ticket_id=ticket.id).all()
-            current_follower_ids = {fu.user_id for fu in current_followups}
-
-            # Find followers to remove (in current but not in new list)
-            followers_to_remove = current_follower_ids - set(follower_ids)
-
-            # Find followers to add (in new list but not in current)
-            followers_to_add = set(follower_ids) - current_follower_ids
-
-            # Remove followers
-            for uid in followers_to_remove:
-                if uid == updater_id:  # Skip if updater removing himself
-                    continue
-                fu = TicketFollowUp.query.filter_by(
-                    ticket_id=ticket.id, user_id=uid).first()
-                if fu:
-                    db.session.delete(fu)
-                    db.session.commit()
+        # Handle file uploads (with compression); nothing is locked while S3 uploads run
+        if "files" in request.files:
+            for f in request.files.getlist("files"):
+                if f.filename:
+                    try:
+                        compressed_stream, new_filename = compress_file(f)
+                        f.stream = compressed_stream
+                        f.filename = new_filename
+                        print(f"DEBUG: Compressed file: {new_filename}")
+                        file_url = upload_to_s3(f, folder=f"tickets/{ticket.id}")
+                        db.session.add(TicketFile(ticket_id=ticket.id,
+                                                  file_url=file_url, file_name=new_filename))
+                    except Exception as e:
+                        db.session.rollback()
+                        return jsonify({"error": str(e)}), 500
 
-                    follower_info = get_user_info_by_id(uid)
-                    follower_name = follower_info.get(
-                        "username") if follower_info else f"User {uid}"
-
-                    # Notify assignees about removed follower
-                    assignment = TicketAssignment.query.filter_by(
-                        ticket_id=ticket.id).first()
-                    recipients = set()
-                    if assignment:
-                        if assignment.assign_by and assignment.assign_by != updater_id:
-                            recipients.add(assignment.assign_by)
-                        if assignment.assign_to and assignment.assign_to != updater_id:
-                            recipients.add(assignment.assign_to)
-
-                    for rid in recipients:
-                        user_info = get_user_info_by_id(rid)
-                        if user_info:
-                            send_update_ticket_email(
-                                ticket,
-                                user_info,
-                                updater_info,
-                                [("followup", "",
-                                  f"{follower_name} unfollowed this ticket")]
-                            )
-                            create_notification(
-                                ticket_id=ticket.id,
-                                receiver_id=rid,
-                                sender_id=updater_id,
-                                notification_type="followup",
-                                message=f"{follower_name} unfollowed this ticket"
-                            )
-
-            # Add new followers
-            for uid in followers_to_add:
-                if uid == updater_id:  # Skip if updater adding himself
+        # Everyone any email / notification mentions, in one bulk lookup
+        users = get_users_info_by_ids(
+            update_recipients | assignees | {uid for uid, _, _ in follower_events}
+            | {category_assignee_id, ticket.user_id, updater_id}
+        )
+        updater_info = users.get(updater_id)
+
+        # (receiver_id, type, message) rows, written with the changes; emails wait for the commit
+        notifications = []
+        emails = []
+
+        if updated_fields:
+            change_summary = ", ".join(
+                [f"{f}: {o}  {n}" for f, o, n in updated_fields])
+            print(f"➡️ Changes: {change_summary}\n")
+            for uid in update_recipients:
+                user_info = users.get(uid)
+                if not user_info:
                     continue
-                existing = TicketFollowUp.query.filter_by(
-                    ticket_id=ticket.id, user_id=uid).first()
-                if not existing:
-                    fu = TicketFollowUp(
-                        ticket_id=ticket.id,
-                        user_id=uid,
-                        note="Added as follow-up user",
-                        created_at=datetime.utcnow()
-                    )
-                    db.session.add(fu)
-                    db.session.commit()
-
-                    follower_info = get_user_info_by_id(uid)
-                    follower_name = follower_info.get(
-                        "username") if follower_info else f"User {uid}"
-
-                    # Notify new follower
-                    create_notification(
-                        ticket_id=ticket.id,
-                        receiver_id=uid,
-                        sender_id=updater_id,
-                        notification_type="followup",
-                        message=f"You are now following ticket #{ticket.id}"
-                    )
-
-                    # Notify assignees about new follower
-                    assignment = TicketAssignment.query.filter_by(
-                        ticket_id=ticket.id).first()
-                    recipients = set()
-                    if assignment:
-                        if assignment.assign_by and assignment.assign_by != updater_id:
-                            recipients.add(assignment.assign_by)
-                        if assignment.assign_to and assignment.assign_to != updater_id:
-                            recipients.add(assignment.assign_to)
-
-                    for rid in recipients:
-                        user_info = get_user_info_by_id(rid)
-                        if user_info:
-                            send_update_ticket_email(
-                                ticket,
-                                user_info,
-                                updater_info,
-                                [("followup", "",
-                                  f"{follower_name} started following this ticket")]
-                            )
-                            create_notification(
-                                ticket_id=ticket.id,
-                                receiver_id=rid,
-                                sender_id=updater_id,
-                                notification_type="followup",
-                                message=f"{follower_name} has been added as a follow-up user"
-                            )
-
-    # -----------------------------
-    # Handle newly added followups
-    if "followup_user_ids_add" in data:
-        ids = [int(uid.strip()) for uid in str(
-            data["followup_user_ids_add"]).split(",") if uid.strip().isdigit()]
-        for uid in ids:
-            if uid == updater_id:   # ✅ skip if updater adding himself
-                continue
-            existing = TicketFollowUp.query.filter_by(
-                ticket_id=ticket.id, user_id=uid).first()
-            if not existing:
-                fu = TicketFollowUp(
-                    ticket_id=ticket.id,
-                    user_id=uid,
-                    note="Added as follow-up user",
-                    created_at=datetime.utcnow()
-                )
-                db.session.add(fu)
-                db.session.commit()
-
-                follower_info = get_user_info_by_id(uid)
-                follower_name = follower_info.get(
-                    "username") if follower_info else f"User {uid}"
-
-                assignment = TicketAssignment.query.filter_by(
-                    ticket_id=ticket.id).first()
-                recipients = {uid}
-                if assignment:
-                    if assignment.assign_by and assignment.assign_by != updater_id:
-                        recipients.add(assignment.assign_by)
-                    if assignment.assign_to and assignment.assign_to != updater_id:
-                        recipients.add(assignment.assign_to)
-
-                for rid in recipients:
-                    user_info = get_user_info_by_id(rid)
-                    if user_info:
-                        send_update_ticket_email(
-                            ticket,
-                            user_info,
-                            updater_info,
-                            [("followup", "",
-                              f"{follower_name} started following this ticket")]
-                        )
-                        create_notification(
-                            ticket_id=ticket.id,
-                            receiver_id=rid,
-                            sender_id=updater_id,
-                            notification_type="followup",
-                            message=f"{follower_name} has been added as a follow-up user"
-                        )
-
-    # -----------------------------
-    # Handle removed followups
+                emails.append((send_update_ticket_email, (ticket, user_info, updater_info, updated_fields)))
+                notifications.append((uid, "update", f"Ticket updated ({change_summary})"))
+
+        for uid, action, follower_gets in follower_events:
+            follower_info = users.get(uid)
+            follower_name = follower_info.get(
+                "username") if follower_info else f"User {uid}"
+            if action == "added":
+                change = f"{follower_name} started following this ticket"
+                message = f"{follower_name} has been added as a follow-up user"
+            else:
+                change = message = f"{follower_name} unfollowed this ticket"
 
-    if "followup_user_ids_remove" in data:
-        ids = [int(uid.strip()) for uid in str(
-            data["followup_user_ids_remove"]).split(",") if uid.strip().isdigit()]
-        for uid in ids:
-            if uid == updater_id:   # ✅ skip if updater removing himself
-                continue
-            fu = TicketFollowUp.query.filter_by(
-                ticket_id=ticket.id, user_id=uid).first()
-            if fu:
-                db.session.delete(fu)
-                db.session.commit()
+            if follower_gets == "notice":
+                notifications.append((uid, "followup", f"You are now following ticket #{ticket.id}"))
+            recipients = assignees | ({uid} if follower_gets == "email" else set())
+            for rid in recipients:
+                user_info = users.get(rid)
+                if user_info:
+                    emails.append((send_update_ticket_email,
+                                   (ticket, user_info, updater_info, [("followup", "", change)])))
+                    notifications.append((rid, "followup", message))
 
-                follower_info = get_user_info_by_id(uid)
-                follower_name = follower_info.get(
-                    "username") if follower_info else f"User {uid}"
+        assignee_info = users.get(category_assignee_id)
+        if assignee_info:
+            emails.append((send_assign_email, (ticket, assignee_info, users.get(ticket.user_id))))
+            notifications.append((assignee_info["id"], "assign", "Assigned"))
 
-                assignment = TicketAssignment.query.filter_by(
-                    ticket_id=ticket.id).first()
-                recipients = {uid}
-                if assignment:
-                    if assignment.assign_by and assignment.assign_by != updater_id:
-                        recipients.add(assignment.assign_by)
-                    if assignment.assign_to and assignment.assign_to != updater_id:
-                        recipients.add(assignment.assign_to)
-
-                for rid in recipients:
-                    user_info = get_user_info_by_id(rid)
-                    if user_info:
-                        send_update_ticket_email(
-                            ticket,
-                            user_info,
-                            updater_info,
-                            [("followup", "",
-                              f"{follower_name} unfollowed this ticket")]
-                        )
-                        create_notification(
-                            ticket_id=ticket.id,
-                            receiver_id=rid,
-                            sender_id=updater_id,
-                            notification_type="followup",
-                            message=f"{follower_name} unfollowed this ticket"
-                        )
+        for receiver_id, notification_type, message in notifications:
+            create_notification(
+                ticket_id=ticket.id,
+                receiver_id=receiver_id,
+                sender_id=updater_id,
+                notification_type=notification_type,
+                message=message,
+                commit=False
+            )
 
-    # -----------------------------
-    # Handle category assignee email if category changed
-    if category_changed and ticket.category_id:
-        category = Category.query.get(ticket.category_id)
-        if category and category.assignee_id:
-            assignee_info = get_user_info_by_id(category.assignee_id)
-            assigner_info = get_user_info_by_id(ticket.user_id)
-            if assignee_info:
-                send_assign_email(ticket, assignee_info, assigner_info)
-                create_notification(
-                    ticket_id=ticket.id,
-                    receiver_id=assignee_info["id"],
-                    sender_id=updater_id,
-                    notification_type="assign",
-                    message=f"Assigned"
-                )
+    db.session.commit()
 
     # -----------------------------
-    # Handle file uploads (with compression)
-    uploaded_files = []
-    if "files" in request.files:
-        for f in request.files.getlist("files"):
-            if f.filename:
-                try:
-                    compressed_stream, new_filename = compress_file(f)
-                    f.stream = compressed_stream
-                    f.filename = new_filename
-                    print(f"DEBUG: Compressed file: {new_filename}")
-                    file_url = upload_to_s3(f, folder=f"tickets/{ticket.id}")
-                    tf = TicketFile(ticket_id=ticket.id,
-                                    file_url=file_url, file_name=new_filename)
-                    db.session.add(tf)
-                    uploaded_files.append(
-                        {"name": new_filename, "url": file_url})
-                except Exception as e:
-                    db.session.rollback()
-                    return jsonify({"error": str(e)}), 500
-        db.session.commit()
+    # Emails only once the change is durable; a failed send doesn't undo it
+    for send, args in emails:
+        try:
+            send(*args)
+        except Exception as e:
+            print(f"❌ Ticket #{ticket.id} email failed: {e}")
 
     return jsonify({
         "success": True,
@@ -826,194 +616,56 @@ def get_tickets():
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
 
-    query = Ticket.query
-
-    if status:
-        # Handle multiple statuses (comma-separated)
-        status_list = [s.strip() for s in status.split(",") if s.strip()]
-
-        # Only proceed if we have valid statuses
-        if status_list:
-            # Create filters for each status (case-insensitive, handles variations)
-            status_filters = []
-            for s in status_list:
-                # Normalize: handle "in progress" vs "in_progress" variations
-                s_normalized = s.lower().replace(" ", "_")
-                status_filters.append(
-                    or_(
-                        Ticket.status.ilike(f"%{s}%"),
-                        func.lower(Ticket.status).like(f"%{s_normalized}%"),
-                        func.lower(Ticket.status).like(
-                            f"%{s_normalized.replace('_', ' ')}%")
-                    )
-                )
-
-            query = query.filter(or_(*status_filters))
-    if category_id:
-        query = query.filter(Ticket.category_id == category_id)
-
-    if start_date:
-        try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            start_dt = start_dt.replace(
-                hour=0, minute=0, second=0, microsecond=0)
-            query = query.filter(Ticket.created_at >= start_dt)
-        except ValueError:
-            pass
-
-    if end_date:
+    # Relationship filters are EXISTS semi-joins (see TicketQuery)
+    tickets_query = (
+        TicketQuery()
+        .status(status)
+        .category(category_id)
+        .search(search, match_id=True)
+        .created_by(created_by)
+        .assigned_to(assign_to)
+        .assigned_by(assign_by)
+        .followed_by(followup)
+        .tagged(tag)
+    )
+    # whole days; malformed dates are ignored
+    for day, apply in ((start_date, tickets_query.created_on_or_after),
+                       (end_date, tickets_query.created_on_or_before)):
         try:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            end_dt = end_dt.replace(
-                hour=23, minute=59, second=59, microsecond=999999)
-            query = query.filter(Ticket.created_at <= end_dt)
+            apply(day)
         except ValueError:
             pass
 
-    if search:
-        # Check if search term is numeric (could be a ticket ID)
-        search_conditions = [
-            Ticket.title.ilike(f"%{search}%"),
-            Ticket.details.ilike(f"%{search}%")
-        ]
+    query = tickets_query.newest_first().query
 
-        # If search is numeric, also search by ticket ID
-        if search.isdigit():
-            search_conditions.append(Ticket.id == int(search))
-
-        query = query.filter(or_(*search_conditions))
-
-    if created_by:
-        query = query.filter(Ticket.user_id == created_by)
-    if assign_to:
-        ticket_ids = [a.ticket_id for a in TicketAssignment.query.filter_by(
-            assign_to=assign_to).all()]
-        query = query.filter(Ticket.id.in_(ticket_ids))
-    if assign_by:
-        ticket_ids = [a.ticket_id for a in TicketAssignment.query.filter_by(
-            assign_by=assign_by).all()]
-        query = query.filter(Ticket.id.in_(ticket_ids))
-    if followup:
-        ticket_ids = [f.ticket_id for f in TicketFollowUp.query.filter_by(
-            user_id=followup).all()]
-        query = query.filter(Ticket.id.in_(ticket_ids))
-    if tag:
-        ticket_ids = [t.ticket_id for t in TicketTag.query.filter_by(
-            tag_name=str(tag)).all()]
-        query = query.filter(Ticket.id.in_(ticket_ids))
-
-    query = query.order_by(Ticket.created_at.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = paginate(query, Ticket, page, per_page)
     tickets = pagination.items
 
-    result = []
-    for t in tickets:
-        created_by_info = get_user_info_by_id(t.user_id) if t.user_id else None
-
-        assignments = TicketAssignment.query.filter_by(ticket_id=t.id).all()
-        assignees = []
-        for a in assignments:
-            assign_by_info = get_user_info_by_id(
-                a.assign_by) if a.assign_by else None
-            assign_to_info = get_user_info_by_id(
-                a.assign_to) if a.assign_to else None
-            assignees.append({
-                "assign_by": a.assign_by,
-                "assign_by_username": assign_by_info["username"] if assign_by_info else None,
-                "assign_to": a.assign_to,
-                "assign_to_username": assign_to_info["username"] if assign_to_info else None,
-                "assigned_at": a.assigned_at
-            })
-
-        files = [{"name": f.file_name, "url": f.file_url}
-                 for f in TicketFile.query.filter_by(ticket_id=t.id).all()]
-        tags = [tag.tag_name for tag in TicketTag.query.filter_by(
-            ticket_id=t.id).all()]
-
-        comments = []
-        for c in TicketComment.query.filter_by(ticket_id=t.id).order_by(TicketComment.created_at.desc()).all():
-            u_info = get_user_info_by_id(c.user_id)
-            comments.append({
-                "user_id": c.user_id,
-                "username": u_info["username"] if u_info else None,
-                "comment": c.comment,
-                "created_at": c.created_at
-            })
-
-        followups = []
-        for f in TicketFollowUp.query.filter_by(ticket_id=t.id).all():
-            u_info = get_user_info_by_id(f.user_id) if f.user_id else None
-            followups.append({
-                "id": f.id,
-                "note": f.note,
-                "user_id": f.user_id,
-                "username": u_info.get("username") if u_info else None,
-                "followup_date": f.followup_date,
-                "created_at": f.created_at
-            })
-
-        category = None
-        if getattr(t, "category_id", None):
-            cat = Category.query.get(t.category_id)
-            if cat:
-                category = {"id": cat.id, "name": cat.name,
-                            "is_active": cat.is_active}
-
-        # ✅ Status Logs
-        status_logs = []
-        for log in TicketStatusLog.query.filter_by(ticket_id=t.id).order_by(TicketStatusLog.changed_at.desc()).all():
-            u_info = get_user_info_by_id(log.changed_by)
-            status_logs.append({
-                "old_status": log.old_status,
-                "new_status": log.new_status,
-                "changed_by": log.changed_by,
-                "changed_by_username": u_info["username"] if u_info else None,
-                "changed_at": log.changed_at
-            })
-
-        # ✅ Project Information (if ticket is linked to a project)
-        project_info = None
-        project_ticket = ProjectTicket.query.filter_by(ticket_id=t.id).first()
-        if project_ticket:
-            project = Project.query.get(project_ticket.project_id)
-            if project:
-                project_info = {
-                    "id": project.id,
-                    "name": project.name,
-                    "status": project.status,
-                    "priority": project.priority,
-                    "color": project.color
-                }
+    # Unchanged page → 304 before serializing anything
+    etag = list_etag(pagination)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
 
-        result.append({
-            "id": t.id,
-            "title": t.title,
-            "details": t.details,
-            "priority": t.priority,
-            "status": t.status,
-            "due_date": t.due_date,
-            "created_at": t.created_at,
-            "completed_at": getattr(t, "completed_at", None),
-            "created_by": created_by_info,
-            "assignees": assignees,
-            "files": files,
-            "tags": tags,
-            "comments": comments,
-            "followups": followups,
-            "category": category,
-            "status_logs": status_logs,
-            "project": project_info  # Project information if ticket is linked to a project
-        })
+    include, fields = serializer_options(LIST_INCLUDE)
+    if request.args.get("view") == "summary":
+        # ?view=summary → one primary-key lookup on ticket_summaries
+        result = serialize_summaries([t.id for t in tickets], fields)
+    else:
+        # One IN query per requested child table + one bulk user lookup for the whole page
+        result = serialize_tickets(tickets, include, fields)
 
-    return jsonify({
+    return with_etag(jsonify({
         "tickets": result,
         "pagination": {
             "page": pagination.page,
             "per_page": pagination.per_page,
             "total": pagination.total,
-            "pages": pagination.pages
+            "pages": pagination.pages,
+            "has_next": pagination.has_next,
+            "next_cursor": next_cursor(pagination)
         }
-    })
+    }), etag)
 
 
 # ─────────────────────────────────────────────
@@ -1023,220 +675,48 @@ def get_tickets():
 @require_api_key
 @validate_token
 def get_ticket(ticket_id):
+    # Version check first: a revalidation costs one indexed lookup, no serialization
+    etag = ticket_etag(ticket_id)
+    if etag is None:
+        return jsonify({"error": "Ticket not found"}), 404
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
     ticket = Ticket.query.get(ticket_id)
     if not ticket:
         return jsonify({"error": "Ticket not found"}), 404
-    created_by = get_user_info_by_id(
-        ticket.user_id) if ticket.user_id else None
-    # --- Assignments (Current state)
-    assignments = TicketAssignment.query.filter_by(ticket_id=ticket.id).all()
-    assignees = []
-    for a in assignments:
-        assign_by_info = get_user_info_by_id(
-            a.assign_by) if a.assign_by else None
-        assign_to_info = get_user_info_by_id(
-            a.assign_to) if a.assign_to else None
-        assignees.append({
-            "assign_by": a.assign_by,
-            "assign_by_username": assign_by_info["username"] if assign_by_info else None,
-            "assign_to": a.assign_to,
-            "assign_to_username": assign_to_info["username"] if assign_to_info else None,
-            "assigned_at": a.assigned_at
-        })
-    # --- Assignment Logs (History)
-    assignment_logs = []
-    for log in TicketAssignmentLog.query.filter_by(ticket_id=ticket.id).order_by(TicketAssignmentLog.changed_at.desc()).all():
-        old_user_info = get_user_info_by_id(
-            log.old_assign_to) if log.old_assign_to else None
-        new_user_info = get_user_info_by_id(
-            log.new_assign_to) if log.new_assign_to else None
-        changed_by_info = get_user_info_by_id(
-            log.changed_by) if log.changed_by else None
-        assignment_logs.append({
-            "old_assign_to": log.old_assign_to,
-            "old_assign_to_username": old_user_info["username"] if old_user_info else None,
-            "new_assign_to": log.new_assign_to,
-            "new_assign_to_username": new_user_info["username"] if new_user_info else None,
-            "changed_by": log.changed_by,
-            "changed_by_username": changed_by_info["username"] if changed_by_info else None,
-            "changed_at": log.changed_at
-        })
-    # --- Files (exclude comment files - those are shown in comments)
-    files = [
-        {"name": f.file_name, "url": f.file_url}
-        for f in TicketFile.query.filter_by(ticket_id=ticket.id).filter(TicketFile.comment_id.is_(None)).all()
-    ]
-    # --- Tags
-    tags = [tag.tag_name for tag in TicketTag.query.filter_by(
-        ticket_id=ticket.id).all()]
-    # --- Comments
-    comments = []
-    for c in TicketComment.query.filter_by(ticket_id=ticket.id).order_by(TicketComment.created_at.desc()).all():
-        u_info = get_user_info_by_id(c.user_id) if c.user_id else None
-        # Get files attached to this comment
-        comment_files = [
-            {"name": f.file_name, "url": f.file_url}
-            for f in TicketFile.query.filter_by(ticket_id=ticket.id, comment_id=c.id).all()
-        ]
-        comments.append({
-            "id": c.id,
-            "user_id": c.user_id,
-            "username": u_info["username"] if u_info else None,
-            "comment": c.comment,
-            "created_at": c.created_at,
-            "files": comment_files  # Include files for this comment
-        })
-    # --- Followups
-    followups = []
-    for f in TicketFollowUp.query.filter_by(ticket_id=ticket.id).all():
-        u_info = get_user_info_by_id(f.user_id) if f.user_id else None
-        followups.append({
-            "id": f.id,
-            "note": f.note,
-            "user_id": f.user_id,
-            "username": u_info.get("username") if u_info else None,
-            "email": u_info.get("email") if u_info else None,
-            "followup_date": f.followup_date,
-            "created_at": f.created_at
-        })
-    # --- Category
-    category = None
-    if getattr(ticket, "category_id", None):
-        cat = Category.query.get(ticket.category_id)
-        if cat:
-            category = {
-                "id": cat.id,
-                "name": cat.name,
-                "is_active": cat.is_active
-            }
-    # --- Status Logs
-    status_logs = []
-    for log in TicketStatusLog.query.filter_by(ticket_id=ticket.id).order_by(TicketStatusLog.changed_at.desc()).all():
-        u_info = get_user_info_by_id(log.changed_by)
-        status_logs.append({
-            "old_status": log.old_status,
-            "new_status": log.new_status,
-            "changed_by": log.changed_by,
-            "changed_by_username": u_info["username"] if u_info else None,
-            "changed_at": log.changed_at
-        })
-    # --- Contact Form Patient Information
-    contact_form_info = None
-    contact_form_link = ContactFormTicketLink.query.filter_by(
-        ticket_id=ticket.id).first()
-    if contact_form_link and contact_form_link.contact_form:
-        contact_form = contact_form_link.contact_form
-        contact_form_info = {
-            "id": contact_form.id,
-            "form_name": contact_form.form_name,
-            "name": contact_form.name,
-            "phone": contact_form.phone,
-            "email": contact_form.email,
-            "message": contact_form.message,
-            "data": contact_form.data,
-            "status": contact_form.status,
-            "created_at": contact_form.created_at
-        }
 
-    # --- Location Details from Auth System
-    location_details = None
-    if ticket.location_id:
-        try:
-            AUTH_SYSTEM_URL = os.getenv(
-                "AUTH_SYSTEM_URL", "https://api.dental360grp.com/api")
-            clinic_id = ticket.clinic_id or 1  # Default to 1 if clinic_id is None
-
-            internal_api_url = f"{AUTH_SYSTEM_URL}/clinic_locations/get_all/{clinic_id}"
-            print(f"Fetching location details from: {internal_api_url}")
-
-            internal_response = requests.get(internal_api_url, timeout=10)
-
-            if internal_response.status_code == 200:
-                internal_data = internal_response.json()
-                all_locations = internal_data.get("locations", [])
-
-                # Find the location matching ticket.location_id
-                for loc in all_locations:
-                    if loc.get("id") == ticket.location_id:
-                        location_details = {
-                            "id": loc.get("id"),
-                            "location_name": loc.get("location_name"),
-                            "address": loc.get("address"),
-                            "city": loc.get("city"),
-                            "state": loc.get("state"),
-                            "postal_code": loc.get("postal_code"),
-                            "phone": loc.get("phone"),
-                            "email": loc.get("email"),
-                            "clinic_id": loc.get("clinic_id"),
-                            "is_enable": loc.get("is_enable"),
-                            "display_name": loc.get("display_name"),
-                            "greeting_message": loc.get("greeting_message"),
-                            "map_link": loc.get("map_link"),
-                            "sip_uri": loc.get("sip_uri")
-                        }
-                        print(
-                            f"✅ Found location details for location_id: {ticket.location_id}")
-                        break
+    include, fields = serializer_options(DETAIL_INCLUDE)
+    result = serialize_tickets([ticket], include, fields, detail=True)[0]
+    if timeline_requested():
+        # latest events only; the rest via /ticket/<id>/timeline?cursor=
+        events, cursor = timeline_page(ticket_id, limit=TIMELINE_PREVIEW)
+        result["timeline"] = {"events": events, "next_cursor": cursor}
+    return with_etag(jsonify(result), etag)
 
-                if not location_details:
-                    print(
-                        f"⚠️ Location ID {ticket.location_id} not found in auth system")
-            else:
-                print(
-                    f"⚠️ Failed to fetch locations from auth system: {internal_response.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error fetching location details from auth system: {e}")
-            # Continue without location details
-
-    # --- Project Information (if ticket is linked to a project)
-    project_info = None
-    project_ticket = ProjectTicket.query.filter_by(ticket_id=ticket.id).first()
-    if project_ticket:
-        project = Project.query.get(project_ticket.project_id)
-        if project:
-            created_by_project = get_user_info_by_id(
-                project.created_by) if project.created_by else None
-            project_tags = [tag.tag_name for tag in ProjectTag.query.filter_by(
-                project_id=project.id).all()]
-            project_info = {
-                "id": project.id,
-                "name": project.name,
-                "description": project.description,
-                "status": project.status,
-                "priority": project.priority,
-                "color": project.color,
-                "due_date": project.due_date.isoformat() if project.due_date else None,
-                "created_by": created_by_project,
-                "tags": project_tags
-            }
 
-    # --- Final Response
-    result = {
-        "id": ticket.id,
-        "title": ticket.title,
-        "details": ticket.details,
-        "priority": ticket.priority,
-        "status": ticket.status,
-        "due_date": ticket.due_date,
-        "created_at": ticket.created_at,
-        "completed_at": ticket.completed_at,
-        "location_id": ticket.location_id,
-        "location_details": location_details,  # Location details from auth system
-        "clinic_id": ticket.clinic_id,
-        "created_by": created_by,
-        "assignees": assignees,
-        "assignment_logs": assignment_logs,   # :white_check_mark: NEW
-        "files": files,
-        "tags": tags,
-        "comments": comments,
-        "followups": followups,
-        "category": category,
-        "status_logs": status_logs,
-        # :white_check_mark: Patient contact information from contact form
-        "contact_form_info": contact_form_info,
-        "project": project_info  # Project information if ticket is linked to a project
-    }
-    return jsonify(result)
+# ─────────────────────────────────────────────
+# Ticket activity timeline (comments, status/assignment changes, files, followers)
+@ticket_bp.route("/ticket/<int:ticket_id>/timeline", methods=["GET"])
+@require_api_key
+@validate_token
+def get_ticket_timeline(ticket_id):
+    etag = ticket_etag(ticket_id)
+    if etag is None:
+        return jsonify({"error": "Ticket not found"}), 404
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
+    limit = request.args.get("limit", TIMELINE_LIMIT, type=int)
+    events, cursor = timeline_page(ticket_id, request.args.get("cursor"), limit)
+    return with_etag(jsonify({
+        "ticket_id": ticket_id,
+        "events": events,
+        "has_next": cursor is not None,
+        "next_cursor": cursor
+    }), etag)
 
 
 # Add Ticket Activity Comment, Tags
@@ -1446,126 +926,130 @@ def filter_tickets():
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
 
-    # ✅ Base query
-    query = Ticket.query
-
-    # Admin → all tickets, Normal → created + assigned only
-    if user_role not in ["admin", "superadmin"]:
-        created = Ticket.query.filter_by(user_id=user_id)
-        assigned_ids = [a.ticket_id for a in TicketAssignment.query.filter_by(
-            assign_to=user_id).all()]
-        query = query.filter(
-            or_(Ticket.id.in_(assigned_ids), Ticket.user_id == user_id))
-
-    # ✅ Apply filters
-    if status:
-        # Handle multiple statuses (comma-separated)
-        status_list = [s.strip() for s in status.split(",") if s.strip()]
-
-        # Only proceed if we have valid statuses
-        if status_list:
-            # Create filters for each status (case-insensitive, handles variations)
-            status_filters = []
-            for s in status_list:
-                # Normalize: handle "in progress" vs "in_progress" variations
-                s_normalized = s.lower().replace(" ", "_")
-                status_filters.append(
-                    or_(
-                        Ticket.status.ilike(f"%{s}%"),
-                        func.lower(Ticket.status).like(f"%{s_normalized}%"),
-                        func.lower(Ticket.status).like(
-                            f"%{s_normalized.replace('_', ' ')}%")
-                    )
-                )
+    # ✅ Admin → all tickets, Normal → created + assigned only; then filters, latest first
+    query = (
+        TicketQuery()
+        .visible_to(user_id, user_role)
+        .status(status)
+        .category(category_id)
+        .created_from(start_date)
+        .created_until(end_date)
+        .search(search)
+        .newest_first()
+        .query
+    )
 
-            query = query.filter(or_(*status_filters))
-    if category_id:
-        query = query.filter(Ticket.category_id == category_id)
-    if start_date:
-        query = query.filter(Ticket.created_at >= start_date)
-    if end_date:
-        query = query.filter(Ticket.created_at <= end_date)
-    if search:
-        query = query.filter(or_(
-            Ticket.title.ilike(f"%{search}%"),
-            Ticket.details.ilike(f"%{search}%")
-        ))
-
-    # ✅ Order by latest
-    query = query.order_by(Ticket.created_at.desc())
-
-    # ✅ Pagination
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    # ✅ Pagination (?cursor= switches to keyset mode)
+    pagination = paginate(query, Ticket, page, per_page)
     tickets = pagination.items
 
-    result = []
-    for t in tickets:
-        created_by = get_user_info_by_id(t.user_id) if t.user_id else None
-
-        assignments = TicketAssignment.query.filter_by(ticket_id=t.id).all()
-        assignees = []
-        for a in assignments:
-            assign_by_info = get_user_info_by_id(
-                a.assign_by) if a.assign_by else None
-            assign_to_info = get_user_info_by_id(
-                a.assign_to) if a.assign_to else None
-            assignees.append({
-                "assign_by": a.assign_by,
-                "assign_by_username": assign_by_info["username"] if assign_by_info else None,
-                "assign_to": a.assign_to,
-                "assign_to_username": assign_to_info["username"] if assign_to_info else None,
-                "assigned_at": a.assigned_at
-            })
+    # role decides visibility and the per-row "role" field, so it's part of the tag
+    etag = list_etag(pagination, user_role)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
 
-        files = [{"name": f.file_name, "url": f.file_url}
-                 for f in TicketFile.query.filter_by(ticket_id=t.id).all()]
-        tags = [tag.tag_name for tag in TicketTag.query.filter_by(
-            ticket_id=t.id).all()]
-
-        comments = []
-        for c in TicketComment.query.filter_by(ticket_id=t.id).order_by(TicketComment.created_at.desc()).all():
-            u_info = get_user_info_by_id(c.user_id) if c.user_id else None
-            comments.append({
-                "user_id": c.user_id,
-                "username": u_info["username"] if u_info else None,
-                "comment": c.comment,
-                "created_at": c.created_at
-            })
+    include, fields = serializer_options(FILTER_INCLUDE)
+    if request.args.get("view") == "summary":
+        result = serialize_summaries([t.id for t in tickets], fields)
+    else:
+        result = serialize_tickets(tickets, include, fields)
 
-        category = None
-        if getattr(t, "category_id", None):
-            cat = Category.query.get(t.category_id)
-            if cat:
-                category = {"id": cat.id, "name": cat.name}
-
-        role = None
-        if user_role not in ["admin", "superadmin"]:
-            role = "creator" if t.user_id == user_id else "assignee"
-
-        result.append({
-            "id": t.id,
-            "title": t.title,
-            "details": t.details,
-            "priority": t.priority,
-            "status": t.status,
-            "due_date": t.due_date,
-            "created_at": t.created_at,
-            "completed_at": getattr(t, "completed_at", None),
-            "created_by": created_by,
-            "assignees": assignees,
-            "files": files,
-            "tags": tags,
-            "comments": comments,
-            "category": category,
-            "role": role
-        })
+    if fields is None or "role" in fields:
+        for t, item in zip(tickets, result):
+            role = None
+            if user_role not in ["admin", "superadmin"]:
+                role = "creator" if t.user_id == user_id else "assignee"
+            item["role"] = role
 
-    return jsonify({
+    return with_etag(jsonify({
         "tickets": result,
         "total": pagination.total,
         "page": pagination.page,
         "per_page": pagination.per_page,
-        "pages": pagination.pages
+        "pages": pagination.pages,
+        "has_next": pagination.has_next,
+        "next_cursor": next_cursor(pagination)
+    }), etag)
+
+
+# ─────────────────────────────────────────────
+# Ticket Typeahead (id prefix / title word prefixes)
+@ticket_bp.route("/tickets/suggest", methods=["GET"])
+@require_api_key
+@validate_token
+def suggest_tickets():
+    user_id = request.args.get("user_id", type=int)
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+    q = request.args.get("q", "").strip()
+    limit = min(max(request.args.get("limit", SUGGEST_LIMIT, type=int), 1), SUGGEST_MAX_LIMIT)
+    if not q:
+        return jsonify({"suggestions": []})
+
+    user_info = get_user_info_by_id(user_id)
+    if not user_info:
+        return jsonify({"error": "Invalid user"}), 404
+
+    # In-memory index ranks candidates; the database drops deleted / invisible ones
+    scope = TicketQuery().visible_to(user_id, user_info.get("role", "")).query
+    rows = suggest_visible_tickets(q, scope, limit)
+
+    return jsonify({
+        "suggestions": [
+            {"id": r.id, "title": r.title, "status": r.status}
+            for r in rows
+        ]
+    })
+
+
+# ─────────────────────────────────────────────
+# Full-text Ticket Search (ranked, with snippets)
+@ticket_bp.route("/tickets/search", methods=["GET"])
+@require_api_key
+@validate_token
+def search_tickets():
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 10, type=int), 1), 50)
+
+    # Optional: restrict to what user_id may see (same rule as /tickets/filter)
+    scope = TicketQuery()
+    user_id = request.args.get("user_id", type=int)
+    if user_id:
+        user_info = get_user_info_by_id(user_id)
+        if not user_info:
+            return jsonify({"error": "Invalid user"}), 404
+        scope.visible_to(user_id, user_info.get("role", ""))
+    scope.status(request.args.get("status")).category(request.args.get("category_id", type=int))
+
+    # one extra row tells us whether there is a next page
+    hits = ranked_search(q, scope.query, limit=per_page + 1, offset=(page - 1) * per_page)
+    has_next = len(hits) > per_page
+    hits = hits[:per_page]
+
+    tickets_by_id = {}
+    if hits:
+        tickets_by_id = {t.id: t for t in Ticket.query.filter(Ticket.id.in_([h[0] for h in hits])).all()}
+    tickets = [tickets_by_id[ticket_id] for ticket_id, _, _ in hits if ticket_id in tickets_by_id]
+
+    include, fields = serializer_options(LIST_INCLUDE)
+    result = serialize_tickets(tickets, include, fields)
+    matches = {ticket_id: (rank, snippet) for ticket_id, rank, snippet in hits}
+    for t, item in zip(tickets, result):
+        item["rank"], item["snippet"] = matches[t.id]
+
+    return jsonify({
+        "query": q,
+        "tickets": result,
+        "pagination": {
+            "page": page,
+            "per_page": per_page,
+            "has_next": has_next
+        }
     })
 
 
@@ -2327,8 +1811,8 @@ def _process_emails_internal():
         }
 
         # Make the API request
-        response = requests.get(base_url, headers=headers,
-                                params=params, timeout=30)
+        response = http_client.get(base_url, headers=headers,
+                                params=params, timeout=30, service="graph-mailbox")
 
         if response.status_code != 200:
             return {
@@ -2341,6 +1825,12 @@ def _process_emails_internal():
         data = response.json()
         emails = data.get('value', [])
 
+        # Resolve all distinct senders in one concurrent step (served from the email directory)
+        prime_user_email_directory(
+            (email.get("from") or {}).get("emailAddress", {}).get("address")
+            for email in emails
+        )
+
         # Metrics tracking
         tickets_created = 0
         comments_added = 0
@@ -3151,8 +2641,8 @@ def read_emails():
         }
 
         # Make the API request
-        response = requests.get(base_url, headers=headers,
-                                params=params, timeout=30)
+        response = http_client.get(base_url, headers=headers,
+                                params=params, timeout=30, service="graph-mailbox")
 
         if response.status_code != 200:
             return jsonify({
@@ -3378,12 +2868,13 @@ def reprocess_email(email_id):
             "Content-Type": "application/json"
         }
 
-        response = requests.get(
+        response = http_client.get(
             base_url,
             headers=headers,
             params={
                 '$select': 'id,subject,from,toRecipients,receivedDateTime,isRead,bodyPreview,body,hasAttachments,conversationId'},
-            timeout=30
+            timeout=30,
+            service="graph-mailbox"
         )
 
         if response.status_code != 200:
@@ -3809,8 +3300,6 @@ def get_ticket_locations(ticket_id):
     }
     """
     try:
-        import os
-
         # Validate ticket exists
         ticket = Ticket.query.get(ticket_id)
         if not ticket:
@@ -3831,36 +3320,8 @@ def get_ticket_locations(ticket_id):
         # Extract location_ids to fetch from auth system
         location_ids = [assign.location_id for assign in assignments]
 
-        # Fetch location details from auth system
-        AUTH_SYSTEM_URL = os.getenv(
-            "AUTH_SYSTEM_URL", "https://api.dental360grp.com/api")
-        clinic_id = ticket.clinic_id or 1  # Default to 1 if clinic_id is None
-
-        location_details_map = {}
-        try:
-            internal_api_url = f"{AUTH_SYSTEM_URL}/clinic_locations/get_all/{clinic_id}"
-            print(f"Fetching locations from: {internal_api_url}")
-
-            internal_response = requests.get(internal_api_url, timeout=10)
-
-            if internal_response.status_code == 200:
-                internal_data = internal_response.json()
-                all_locations = internal_data.get("locations", [])
-
-                # Create a map of location_id -> location details
-                for loc in all_locations:
-                    loc_id = loc.get("id")
-                    if loc_id in location_ids:
-                        location_details_map[loc_id] = loc
-
-                print(
-                    f"✅ Found {len(location_details_map)} matching locations out of {len(all_locations)} total")
-            else:
-                print(
-                    f"⚠️ Failed to fetch locations from auth system: {internal_response.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error fetching location details from auth system: {e}")
-            # Continue without location details
+        # Location details from the cached clinic location directory
+        location_details_map = get_locations(ticket.clinic_id, location_ids)
 
         # Build response with location details
         locations = []
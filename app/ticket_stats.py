@@ -4,9 +4,17 @@ from datetime import datetime, timedelta, date
 from app import db
 from app.model import Ticket, Category, TicketFollowUp
 from app.dashboard_routes import require_api_key, validate_token
+from app.utils.cache import get_cache
+from app.utils.ticket_query import TicketQuery
+from app.utils.ticket_status import STATUS_LABELS, PRIORITY_LABELS, COMPLETED, IN_PROGRESS, PENDING
+import os
 
 stats_bp = Blueprint("stats", __name__)
 
+# Dashboard stats are expensive aggregates; serve repeats from cache for a short while
+STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 60))
+stats_cache = get_cache("ticket_stats", maxsize=256, ttl=STATS_CACHE_TTL, negative_ttl=0)
+
 TIMEFRAME_PRESETS = {
     "today":       0,
     "yesterday":   1,
@@ -22,6 +30,14 @@ TIMEFRAME_PRESETS = {
 @validate_token
 @require_api_key
 def get_ticket_stats():
+    # "today"/"last_7_days" are relative, so the date is part of the key
+    cache_key = f"{date.today()}|" + "&".join(
+        f"{k}={v}" for k, v in sorted(request.args.items(multi=True))
+    )
+    cached = stats_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached)
+
     try:
         # 🔹 Query params
         timeframe = request.args.get("timeframe")
@@ -30,84 +46,59 @@ def get_ticket_stats():
         start_date_param = request.args.get("start_date")
         end_date_param = request.args.get("end_date")
 
-        # 🔹 Base query
-        query = Ticket.query
-
-        # 🔹 Filter by clinic_id
-        if clinic_id:
-            query = query.filter(Ticket.clinic_id == clinic_id)
-
-        # 🔹 Filter by category_id
-        if category_id:
-            query = query.filter(Ticket.category_id == category_id)
-
-        # 🔹 Filter by start_date and end_date (takes precedence over timeframe)
-        if start_date_param or end_date_param:
-            try:
-                if start_date_param:
-                    start_date_obj = datetime.strptime(start_date_param, "%Y-%m-%d").date()
-                    query = query.filter(func.date(Ticket.created_at) >= start_date_obj)
-                
-                if end_date_param:
-                    end_date_obj = datetime.strptime(end_date_param, "%Y-%m-%d").date()
-                    query = query.filter(func.date(Ticket.created_at) <= end_date_obj)
-            except ValueError as e:
-                return jsonify({
-                    "error": "Invalid date format",
-                    "message": "Date must be in YYYY-MM-DD format",
-                    "details": str(e)
-                }), 400
-        # 🔹 Filter by timeframe (only if start_date/end_date not provided)
+        # 🔹 Validate start_date / end_date up front
+        try:
+            start_day = datetime.strptime(start_date_param, "%Y-%m-%d").date() if start_date_param else None
+            end_day = datetime.strptime(end_date_param, "%Y-%m-%d").date() if end_date_param else None
+        except ValueError as e:
+            return jsonify({
+                "error": "Invalid date format",
+                "message": "Date must be in YYYY-MM-DD format",
+                "details": str(e)
+            }), 400
+
+        def scoped(base=None):
+            """clinic_id / category_id filters shared by every aggregate below"""
+            return TicketQuery(base).clinic(clinic_id).category(category_id)
+
+        # 🔹 Base query: start_date/end_date take precedence over timeframe
+        tickets_query = scoped()
+        if start_day or end_day:
+            tickets_query.created_on_or_after(start_day).created_on_or_before(end_day)
         elif timeframe in TIMEFRAME_PRESETS:
             days = TIMEFRAME_PRESETS[timeframe]
             if timeframe == "today":
-                start_date = date.today()
-                query = query.filter(func.date(Ticket.created_at) == start_date)
+                tickets_query.created_on(date.today())
             elif timeframe == "yesterday":
-                yest = date.today() - timedelta(days=1)
-                query = query.filter(func.date(Ticket.created_at) == yest)
+                tickets_query.created_on(date.today() - timedelta(days=1))
             else:
-                start_date = datetime.utcnow() - timedelta(days=days)
-                query = query.filter(Ticket.created_at >= start_date)
+                tickets_query.created_from(datetime.utcnow() - timedelta(days=days))
+        query = tickets_query.query
 
         # 1️⃣ Total tickets
         total_tickets = query.count() or 0
 
-        # 2️⃣ Status wise count
-        status_counts = (
-            query.with_entities(Ticket.status, func.count(Ticket.id))
-            .group_by(Ticket.status)
+        # 2️⃣ Status wise count (status_key is already normalized)
+        status_counts = dict(
+            query.with_entities(Ticket.status_key, func.count(Ticket.id))
+            .group_by(Ticket.status_key)
             .all()
         )
-        raw_status = {status: count for status, count in status_counts if status}
-        # Normalize status values (case-insensitive exact matching)
         status_data = {
-            "Completed": 0,
-            "In Progress": 0,
-            "Pending": 0
+            STATUS_LABELS[key]: status_counts.get(key, 0)
+            for key in (COMPLETED, IN_PROGRESS, PENDING)
         }
-        # Map actual status values to normalized keys using exact matching
-        for status, count in raw_status.items():
-            if not status:
-                continue
-            status_lower = status.lower().strip()
-            # Exact matching to avoid false positives (e.g., "archived_not_completed")
-            if status_lower == "completed":
-                status_data["Completed"] += count
-            elif status_lower in ["in progress", "in_progress"]:
-                status_data["In Progress"] += count
-            elif status_lower == "pending":
-                status_data["Pending"] += count
 
         # 3️⃣ Priority wise count
-        priority_counts = (
-            query.with_entities(Ticket.priority, func.count(Ticket.id))
-            .group_by(Ticket.priority)
+        priority_counts = dict(
+            query.with_entities(Ticket.priority_key, func.count(Ticket.id))
+            .group_by(Ticket.priority_key)
             .all()
         )
-        raw_priority = {priority: count for priority, count in priority_counts if priority}
-        priorities = ["High", "Urgent", "Low"]
-        priority_data = {p: raw_priority.get(p, 0) for p in priorities}
+        priority_data = {
+            PRIORITY_LABELS[key]: priority_counts.get(key, 0)
+            for key in ("high", "urgent", "low")
+        }
 
         # 4️⃣ Category wise count
         try:
@@ -128,7 +119,7 @@ def get_ticket_stats():
         last_30_days = datetime.utcnow() - timedelta(days=30)
         completed_last_30 = query.filter(
             and_(
-                func.lower(Ticket.status).in_(["completed"]),
+                Ticket.status_key == COMPLETED,
                 Ticket.completed_at >= last_30_days
             )
         ).count() or 0
@@ -136,7 +127,7 @@ def get_ticket_stats():
         # 6️⃣ Average ticket resolution time (for completed tickets)
         completed_tickets = query.filter(
             and_(
-                func.lower(Ticket.status).in_(["completed"]),
+                Ticket.status_key == COMPLETED,
                 Ticket.completed_at.isnot(None),
                 Ticket.created_at.isnot(None)
             )
@@ -158,26 +149,13 @@ def get_ticket_stats():
 
         # 7️⃣ Total followups (apply clinic_id, category_id and date filters if passed)
         try:
-            followup_query = TicketFollowUp.query.join(Ticket)
-            if clinic_id:
-                followup_query = followup_query.filter(Ticket.clinic_id == clinic_id)
-            
-            if category_id:
-                followup_query = followup_query.filter(Ticket.category_id == category_id)
-            
-            # Apply date filters to followups (based on ticket created_at)
-            if start_date_param:
-                try:
-                    start_date_obj = datetime.strptime(start_date_param, "%Y-%m-%d").date()
-                    followup_query = followup_query.filter(func.date(Ticket.created_at) >= start_date_obj)
-                except ValueError:
-                    pass
-            if end_date_param:
-                try:
-                    end_date_obj = datetime.strptime(end_date_param, "%Y-%m-%d").date()
-                    followup_query = followup_query.filter(func.date(Ticket.created_at) <= end_date_obj)
-                except ValueError:
-                    pass
+            # followups have no FK to tickets, so the join condition is explicit
+            followup_query = (
+                scoped(TicketFollowUp.query.join(Ticket, Ticket.id == TicketFollowUp.ticket_id))
+                .created_on_or_after(start_day)
+                .created_on_or_before(end_day)
+                .query
+            )
             
             followup_counts = followup_query.count() or 0
         except Exception as e:
@@ -185,66 +163,30 @@ def get_ticket_stats():
 
         # 8️⃣ Daily tickets count (respects clinic_id, category_id, timeframe, and date filters)
         today = date.today()
-        # Create a fresh query for daily stats
-        daily_query = Ticket.query
-        
-        # Apply clinic_id filter
-        if clinic_id:
-            daily_query = daily_query.filter(Ticket.clinic_id == clinic_id)
-        
-        # Apply category_id filter
-        if category_id:
-            daily_query = daily_query.filter(Ticket.category_id == category_id)
         
         # Determine date range for daily stats
         start_date_for_daily = today - timedelta(days=6)  # Default: last 7 days
         end_date_for_daily = today
         
-        # Apply start_date and end_date filters (takes precedence)
-        if start_date_param or end_date_param:
-            try:
-                if start_date_param:
-                    start_date_obj = datetime.strptime(start_date_param, "%Y-%m-%d").date()
-                    daily_query = daily_query.filter(func.date(Ticket.created_at) >= start_date_obj)
-                    start_date_for_daily = start_date_obj
-                
-                if end_date_param:
-                    end_date_obj = datetime.strptime(end_date_param, "%Y-%m-%d").date()
-                    daily_query = daily_query.filter(func.date(Ticket.created_at) <= end_date_obj)
-                    end_date_for_daily = end_date_obj
-                elif start_date_param:
-                    # If only start_date provided, show from start_date to today
-                    end_date_for_daily = today
-            except ValueError:
-                pass  # Already handled above
-        # Apply timeframe filter if it exists (only if start_date/end_date not provided)
+        if start_day or end_day:
+            # start_date alone shows start_date → today
+            start_date_for_daily = start_day or start_date_for_daily
+            end_date_for_daily = end_day or today
         elif timeframe in TIMEFRAME_PRESETS:
             days = TIMEFRAME_PRESETS[timeframe]
             if timeframe == "today":
-                # For today, only show today
-                daily_query = daily_query.filter(func.date(Ticket.created_at) == today)
                 start_date_for_daily = today
-                end_date_for_daily = today
             elif timeframe == "yesterday":
-                # For yesterday, only show yesterday
-                yest = today - timedelta(days=1)
-                daily_query = daily_query.filter(func.date(Ticket.created_at) == yest)
-                start_date_for_daily = yest
-                end_date_for_daily = yest
+                start_date_for_daily = end_date_for_daily = today - timedelta(days=1)
             else:
-                # For last_7_days, last_14_days, etc.
-                # Use date comparison to avoid timezone issues
-                start_date_for_query = today - timedelta(days=days - 1)  # Include today
-                daily_query = daily_query.filter(func.date(Ticket.created_at) >= start_date_for_query)
-                start_date_for_daily = start_date_for_query
-                end_date_for_daily = today
+                # last_7_days etc. include today
+                start_date_for_daily = today - timedelta(days=days - 1)
         
-        # Ensure we're getting at least the date range we want to display
-        daily_query = daily_query.filter(
-            and_(
-                func.date(Ticket.created_at) >= start_date_for_daily,
-                func.date(Ticket.created_at) <= end_date_for_daily
-            )
+        daily_query = (
+            scoped()
+            .created_on_or_after(start_date_for_daily)
+            .created_on_or_before(end_date_for_daily)
+            .query
         )
         
         # Get daily counts grouped by date
@@ -272,7 +214,7 @@ def get_ticket_stats():
         # 9️⃣ Overdue tickets
         overdue_tickets = query.filter(
             and_(
-                ~func.lower(Ticket.status).in_(["completed"]),
+                Ticket.status_key != COMPLETED,
                 Ticket.due_date.isnot(None),
                 Ticket.due_date < today
             )
@@ -289,7 +231,7 @@ def get_ticket_stats():
         ]
 
         # ✅ Final merged response
-        return jsonify({
+        payload = {
             "total_tickets": total_tickets,
             "by_status": status_data,
             "by_priority": priority_data,
@@ -299,7 +241,9 @@ def get_ticket_stats():
             "avg_resolution_time_hours": avg_resolution_time_hours,
             "daily_ticket_stats": daily_stats,
             "overdue_tickets": overdue_list
-        })
+        }
+        stats_cache.set(cache_key, payload)
+        return jsonify(payload)
     except Exception as e:
         import traceback
         error_msg = str(e)
@@ -0,0 +1,252 @@
+import os
+import threading
+
+from app.utils.cache_backends import LocalLRUBackend, shared_backend
+
+
+# ─── Sentinel for "looked up, does not exist" ───────────────
+MISSING = object()
+
+# With a shared tier, keep the per-worker copy short-lived so invalidations
+# made by another worker are picked up quickly.
+CACHE_LOCAL_TTL_CAP = int(os.getenv("CACHE_LOCAL_TTL_CAP", 30))
+
+
+class _Flight:
+    """One in-progress load that concurrent callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe, bounded cache with per-entry TTL and LRU eviction.
+
+    - Positive results live for `ttl` seconds, negative results (loader
+      returned None) for `negative_ttl` seconds.
+    - get_or_load() is single-flight: concurrent misses for the same key wait
+      for one loader call instead of each hitting the upstream.
+    - Loader exceptions are never cached, so a transient upstream failure
+      does not poison the cache.
+    - Two tiers: an in-process LRU, optionally backed by a `shared` backend
+      that every gunicorn worker on the host reads and writes. Values cross
+      the shared tier as JSON via `encode` / `decode`.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=300, negative_ttl=30, shared=None, encode=None, decode=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self.local = LocalLRUBackend(maxsize)
+        self.shared = shared
+        self._encode = encode or (lambda value: value)
+        self._decode = decode or (lambda value: value)
+
+        self._inflight = {}          # key -> _Flight
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.shared_errors = 0
+
+    # ─── Internal helpers ───────────────────────────────────
+    def _ttl_for(self, value, ttl=None):
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        return ttl
+
+    def _local_ttl(self, ttl):
+        return min(ttl, CACHE_LOCAL_TTL_CAP) if self.shared is not None else ttl
+
+    def _count_hit(self, value):
+        # caller holds the lock
+        if value is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+
+    def _shared_call(self, method, *args):
+        """Run a shared-backend call; failures degrade to a miss, never to an error."""
+        try:
+            return getattr(self.shared, method)(*args)
+        except Exception as e:
+            with self._lock:
+                self.shared_errors += 1
+            print(f"⚠️ Shared cache {self.name}.{method} failed: {e}")
+            return None
+
+    def _shared_lookup(self, key):
+        """(value, found) from the shared tier, promoting hits into the local tier."""
+        if self.shared is None:
+            return None, False
+        entry = self._shared_call("get", key)
+        if entry is None:
+            return None, False
+        raw, ttl_left = entry
+        value = None if raw is None else self._decode(raw)
+        with self._lock:
+            self.shared_hits += 1
+            self.local.set(key, value, self._local_ttl(ttl_left))
+        return value, True
+
+    def _store(self, key, value, ttl=None):
+        ttl = self._ttl_for(value, ttl)
+        with self._lock:
+            self.local.set(key, value, self._local_ttl(ttl))
+        if self.shared is not None:
+            self._shared_call("set", key, None if value is None else self._encode(value), ttl)
+
+    # ─── Public API ─────────────────────────────────────────
+    def get(self, key, default=None):
+        """Return a cached value (None for a cached negative) or `default`."""
+        with self._lock:
+            entry = self.local.get(key)
+            if entry is not None:
+                self._count_hit(entry[0])
+                return entry[0]
+
+        value, found = self._shared_lookup(key)
+        with self._lock:
+            if not found:
+                self.misses += 1
+                return default
+            self._count_hit(value)
+        return value
+
+    def contains(self, key):
+        with self._lock:
+            return self.local.get(key) is not None
+
+    def set(self, key, value, ttl=None):
+        """Store `value`; `ttl` overrides the cache default for this entry only."""
+        self._store(key, value, ttl)
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Return the cached value for `key`, calling `loader()` on a miss.
+        A None result is cached as a negative entry for `negative_ttl`.
+        `ttl` may be a number or a callable(value) -> seconds.
+        """
+        with self._lock:
+            entry = self.local.get(key)
+            if entry is not None:
+                self._count_hit(entry[0])
+                return entry[0]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            # Someone else is already fetching → share their result
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self._count_hit(flight.value)
+            return flight.value
+
+        try:
+            value, found = self._shared_lookup(key)
+            if found:
+                with self._lock:
+                    self._count_hit(value)
+            else:
+                with self._lock:
+                    self.misses += 1
+                value = loader()
+                with self._lock:
+                    self.loads += 1
+                self._store(key, value, ttl(value) if callable(ttl) else ttl)
+            flight.value = value
+            return value
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.load_errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key):
+        with self._lock:
+            self.local.delete(key)
+        if self.shared is not None:
+            self._shared_call("delete", key)
+
+    def clear(self):
+        with self._lock:
+            self.local.clear()
+        if self.shared is not None:
+            self._shared_call("clear")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            stats = {
+                "name": self.name,
+                "size": len(self.local),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "load_errors": self.load_errors,
+                "evictions": self.local.evictions,
+                "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                "backend": self.local.kind,
+            }
+        if self.shared is not None:
+            stats["backend"] = f"{self.local.kind}+{self.shared.kind}"
+            stats["shared_errors"] = self.shared_errors
+            stats["shared"] = self._shared_call("stats")
+        return stats
+
+
+# ─── Registry so stats can be exposed from one place ────────
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name, maxsize=1024, ttl=300, negative_ttl=30, shared=True, encode=None, decode=None):
+    """
+    Return the process-wide cache called `name`, creating it on first use.
+    `name` is also the namespace in the shared tier (CACHE_BACKEND); pass
+    shared=False for values that must stay inside this worker.
+    """
+    with _registry_lock:
+        cache = _registry.get(name)
+        if cache is None:
+            cache = TTLCache(
+                name,
+                maxsize=maxsize,
+                ttl=ttl,
+                negative_ttl=negative_ttl,
+                shared=shared_backend(name) if shared else None,
+                encode=encode,
+                decode=decode,
+            )
+            _registry[name] = cache
+        return cache
+
+
+def all_cache_stats():
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {c.name: c.stats() for c in caches}
@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# ─── Config ─────────────────────────────────────────────────
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local").lower()            # local | sqlite
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "/tmp/ticket-system-cache.sqlite3")
+CACHE_SQLITE_PURGE_EVERY = int(os.getenv("CACHE_SQLITE_PURGE_EVERY", 500))  # writes between expiry sweeps
+
+
+class CacheBackend:
+    """
+    Storage for one cache namespace.
+
+    get() returns (value, ttl_left) or None on a miss; a stored None is a
+    valid (negative) value. Backends never raise on a miss and never apply
+    their own TTL policy – the caller passes the TTL on every set().
+    """
+
+    kind = "base"
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {"backend": self.kind}
+
+
+class LocalLRUBackend(CacheBackend):
+    """
+    In-process LRU dict with per-entry expiry. Not locked on its own:
+    TTLCache serialises access with its own lock.
+    """
+
+    kind = "local"
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._data = OrderedDict()   # key -> (expires_at, value)
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        ttl_left = expires_at - time.monotonic()
+        if ttl_left <= 0:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value, ttl_left
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            "backend": self.kind,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "evictions": self.evictions,
+        }
+
+
+class _SQLiteStore:
+    """
+    One SQLite file in WAL mode shared by every worker process on the host.
+    Each thread gets its own connection; values are stored as JSON text.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        conn = self.connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)")
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        # a connection inherited through fork (gunicorn --preload) must not be reused
+        if conn is None or self._local.pid != os.getpid():
+            # autocommit; WAL lets readers in other workers run alongside a writer
+            conn = sqlite3.connect(self.path, timeout=2, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def note_write(self):
+        """Sweep expired rows every CACHE_SQLITE_PURGE_EVERY writes from this process."""
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % CACHE_SQLITE_PURGE_EVERY == 0
+        if due:
+            self.connection().execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+
+class SQLiteBackend(CacheBackend):
+    """Shared, cross-process cache namespace backed by a _SQLiteStore."""
+
+    kind = "sqlite"
+
+    def __init__(self, store, namespace):
+        self.store = store
+        self.namespace = namespace
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key)
+
+    def get(self, key):
+        row = self.store.connection().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, self._key(key))
+        ).fetchone()
+        if row is None:
+            return None
+        ttl_left = row[1] - time.time()
+        if ttl_left <= 0:
+            return None
+        return json.loads(row[0]), ttl_left
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            self.delete(key)
+            return
+        self.store.connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, self._key(key), json.dumps(value), time.time() + ttl)
+        )
+        self.store.note_write()
+
+    def delete(self, key):
+        self.store.connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, self._key(key))
+        )
+
+    def clear(self):
+        self.store.connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def stats(self):
+        size = self.store.connection().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires_at > ?",
+            (self.namespace, time.time())
+        ).fetchone()[0]
+        return {"backend": self.kind, "path": self.store.path, "size": size}
+
+
+# ─── Factory ────────────────────────────────────────────────
+_sqlite_store = None
+_sqlite_store_lock = threading.Lock()
+
+
+def shared_backend(namespace):
+    """
+    The cross-worker backend for `namespace` according to CACHE_BACKEND,
+    or None when caches are process-local only.
+    """
+    global _sqlite_store
+    if CACHE_BACKEND != "sqlite":
+        return None
+    with _sqlite_store_lock:
+        if _sqlite_store is None:
+            try:
+                _sqlite_store = _SQLiteStore(CACHE_SQLITE_PATH)
+            except Exception as e:
+                print(f"⚠️ Shared cache disabled, cannot open {CACHE_SQLITE_PATH}: {e}")
+                return None
+    return SQLiteBackend(_sqlite_store, namespace)
@@ -0,0 +1,87 @@
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+# ─── Config ─────────────────────────────────────────────────
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))   # bytes; smaller bodies aren't worth it
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 5))   # 6+ costs ~2x the CPU for ~10% smaller pages
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))  # 4-5 ≈ gzip -6 speed, smaller output
+COMPRESS_MIMETYPES = {
+    "application/json",
+    "text/html",
+    "text/plain",
+    "text/csv",
+    "text/css",
+    "application/javascript",
+}
+
+
+def available_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+
+
+def _negotiate():
+    """Best encoding the client accepts (honouring q-values), or None."""
+    accepted = request.accept_encodings
+    best = None
+    best_q = 0
+    for encoding in available_encodings():
+        q = accepted[encoding]
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _compressible(response):
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    return response.mimetype in COMPRESS_MIMETYPES
+
+
+def init_compression(app):
+    """
+    gzip / brotli responses over COMPRESS_MIN_SIZE, negotiated via Accept-Encoding.
+
+    Call this before registering other after_request hooks that change the
+    body: Flask runs after_request functions in reverse order, so the hook
+    registered first sees the final body.
+    """
+    if not app.config.get("COMPRESS_RESPONSES", os.getenv("COMPRESS_RESPONSES", "1") == "1"):
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if not _compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        encoding = _negotiate()
+        if encoding is None:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # a strong tag names exact bytes; the encoded body is a different representation
+            response.set_etag(f"{etag}-{encoding}")
+        return response
@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from contextvars import ContextVar
+
+import requests
+from flask import current_app, request
+
+
+# ─── Config ─────────────────────────────────────────────────
+# Budget (seconds) for a request that has no per-route entry; 0 (default) means none,
+# so side-effecting routes (ticket writes, sendMail, email ingestion) never give up early.
+REQUEST_DEADLINE_DEFAULT = float(os.getenv("REQUEST_DEADLINE_DEFAULT", 0))
+# Never hand an outbound call less than this; below it we give up instead.
+DEADLINE_MIN_CALL_TIMEOUT = float(os.getenv("DEADLINE_MIN_CALL_TIMEOUT", 0.05))
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The request's time budget ran out before (or during) an outbound call."""
+
+
+class Deadline:
+    """Absolute time budget for one inbound request, plus what got degraded because of it."""
+
+    def __init__(self, seconds):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.degraded = set()
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= DEADLINE_MIN_CALL_TIMEOUT
+
+    def timeout(self, timeout):
+        """`timeout` clipped to the remaining budget; raises DeadlineExceeded when nothing is left."""
+        remaining = self.remaining()
+        if remaining <= DEADLINE_MIN_CALL_TIMEOUT:
+            raise DeadlineExceeded(f"Request deadline of {self.budget}s exhausted")
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def mark_degraded(self, part):
+        self.degraded.add(part)
+
+
+_current = ContextVar("request_deadline", default=None)
+
+
+def current_deadline():
+    """The Deadline of the request running on this thread, or None."""
+    return _current.get()
+
+
+def mark_degraded(part, deadline=None):
+    """Record that `part` of the response was left out to stay within the budget."""
+    deadline = deadline or current_deadline()
+    if deadline is not None:
+        deadline.mark_degraded(part)
+
+
+def run_with_deadline(deadline, fn, *args, **kwargs):
+    """
+    Run `fn` with `deadline` as the current deadline. Worker-pool threads
+    don't inherit the request's context, so fan-out code passes it explicitly.
+    """
+    token = _current.set(deadline)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current.reset(token)
+
+
+def request_deadline(seconds):
+    """Route decorator: give this view its own budget (overrides REQUEST_DEADLINES)."""
+    def decorator(f):
+        f.request_deadline = seconds
+        return f
+    return decorator
+
+
+# ─── Flask wiring ───────────────────────────────────────────
+def _budget_for_endpoint(app, endpoint):
+    view = app.view_functions.get(endpoint)
+    seconds = getattr(view, "request_deadline", None)
+    if seconds is None:
+        seconds = app.config.get("REQUEST_DEADLINES", {}).get(endpoint)
+    if seconds is None:
+        seconds = app.config.get("REQUEST_DEADLINE_DEFAULT", REQUEST_DEADLINE_DEFAULT)
+    return float(seconds or 0)
+
+
+def init_deadlines(app):
+    """
+    Start a Deadline for budgeted requests and flag degraded responses.
+
+    Per-route budgets come from @request_deadline or app.config["REQUEST_DEADLINES"]
+    ({endpoint: seconds}, also settable as JSON in the REQUEST_DEADLINES env var).
+    Routes without one run unbounded unless REQUEST_DEADLINE_DEFAULT is set.
+    """
+    overrides = os.getenv("REQUEST_DEADLINES")
+    if overrides:
+        try:
+            app.config.setdefault("REQUEST_DEADLINES", {}).update(json.loads(overrides))
+        except ValueError as e:
+            print(f"⚠️ Ignoring invalid REQUEST_DEADLINES env: {e}")
+
+    @app.before_request
+    def start_deadline():
+        seconds = _budget_for_endpoint(app, request.endpoint)
+        if seconds > 0:
+            request.environ["app.deadline_token"] = _current.set(Deadline(seconds))
+
+    @app.after_request
+    def flag_degraded(response):
+        deadline = current_deadline()
+        if deadline is None or not deadline.degraded:
+            return response
+
+        parts = sorted(deadline.degraded)
+        response.headers["X-Degraded"] = ",".join(parts)
+        if response.is_json:
+            body = response.get_json(silent=True)
+            if isinstance(body, dict):
+                body["degraded"] = True
+                body["degraded_parts"] = parts
+                response.set_data(current_app.json.dumps(body))
+        return response
+
+    @app.teardown_request
+    def end_deadline(exc=None):
+        token = request.environ.pop("app.deadline_token", None)
+        if token is not None:
+            try:
+                _current.reset(token)
+            except ValueError:
+                # teardown ran in a different context; just clear it
+                _current.set(None)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+
+from flask import current_app, request
+
+from app import db
+from app.model import Ticket
+from app.utils.deadline import current_deadline
+
+
+# ─── Config ─────────────────────────────────────────────────
+ETAGS_ENABLED = os.getenv("ETAGS_ENABLED", "1") == "1"
+# Bump to invalidate every client copy at once (e.g. after changing a payload's shape)
+ETAG_SALT = os.getenv("ETAG_SALT", "1")
+
+# compression.py appends "-br" / "-gzip" to strong tags of encoded bodies
+_ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def make_etag(*parts):
+    """
+    Strong ETag over `parts` plus everything that shapes the response:
+    the endpoint and its query string (filters, page, include/fields).
+    """
+    args = sorted(request.args.items(multi=True))
+    raw = repr((ETAG_SALT, request.endpoint, args) + parts).encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def ticket_etag(ticket_id):
+    """ETag of one ticket's payload from its version counter, or None if it doesn't exist."""
+    row = db.session.query(Ticket.version, Ticket.updated_at).filter(Ticket.id == ticket_id).first()
+    if row is None:
+        return None
+    return make_etag(ticket_id, row.version, row.updated_at)
+
+
+def list_etag(pagination, *parts):
+    """
+    ETag of one page of a ticket list from the rows that page already fetched:
+    (id, version, updated_at) of each plus has_next and total. No extra query;
+    any insert, delete or version bump that reaches the page changes it.
+    """
+    rows = tuple((t.id, t.version, t.updated_at) for t in pagination.items)
+    return make_etag(*parts, rows, pagination.has_next, pagination.total)
+
+
+def _strip_encoding(tag):
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def not_modified(etag):
+    """304 response when the client's If-None-Match already has `etag`, else None."""
+    if not ETAGS_ENABLED or etag is None:
+        return None
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    # If-None-Match uses weak comparison, so W/ tags from proxies count too
+    if if_none_match.star_tag or etag in {_strip_encoding(t) for t in if_none_match.as_set(include_weak=True)}:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def with_etag(response, etag):
+    """Attach `etag` unless parts of the body were left out to meet the deadline."""
+    if not ETAGS_ENABLED or etag is None:
+        return response
+    deadline = current_deadline()
+    if deadline is not None and deadline.degraded:
+        # an incomplete body must not be revalidated as if it were the real one
+        return response
+    response.set_etag(etag)
+    # per-user data: clients may keep it but must revalidate before reuse
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
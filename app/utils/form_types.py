@@ -0,0 +1,74 @@
+import os
+
+from app.utils.cache import get_cache
+from app.utils.deadline import DeadlineExceeded, mark_degraded
+from app.utils.http_client import http_client
+
+
+# ─── Config ─────────────────────────────────────────────────
+AUTH_API_BASE = "https://api.dental360grp.com/api/form_types"
+
+FORM_TYPE_CACHE_TTL = int(os.getenv("FORM_TYPE_CACHE_TTL", 300))
+FORM_TYPE_CACHE_NEGATIVE_TTL = int(os.getenv("FORM_TYPE_CACHE_NEGATIVE_TTL", 60))
+FORM_TYPE_CACHE_MAXSIZE = int(os.getenv("FORM_TYPE_CACHE_MAXSIZE", 512))
+
+# form_type_id -> form type payload (name, description, users, ...)
+form_type_cache = get_cache(
+    "form_types",
+    maxsize=FORM_TYPE_CACHE_MAXSIZE,
+    ttl=FORM_TYPE_CACHE_TTL,
+    negative_ttl=FORM_TYPE_CACHE_NEGATIVE_TTL,
+)
+
+
+def _fetch_form_type(form_type_id):
+    """
+    Fetch one form type (with its assigned users) from the Auth backend.
+    None if it does not exist; raises on transport/server errors so they are never cached.
+    """
+    resp = http_client.get(f"{AUTH_API_BASE}/{form_type_id}", timeout=8, service="auth-form-types")
+    if resp.status_code == 404:
+        return None
+    if resp.status_code != 200:
+        raise RuntimeError(f"Auth API returned {resp.status_code}")
+    data = resp.json()
+    return data if isinstance(data, dict) and data else None
+
+
+def get_form_type(form_type_id):
+    """
+    Cached form type dict, or None if it doesn't exist / can't be fetched.
+    The returned dict (and its "users" list) is a copy, safe to modify.
+    """
+    try:
+        form_type_id = int(form_type_id)
+    except (TypeError, ValueError):
+        return None
+    try:
+        ft = form_type_cache.get_or_load(form_type_id, lambda: _fetch_form_type(form_type_id))
+    except DeadlineExceeded:
+        mark_degraded("form_type")
+        return None
+    except Exception as e:
+        print(f"⚠️ Error fetching form_type {form_type_id} from API: {e}")
+        return None
+    if not ft:
+        return None
+    return {**ft, "users": list(ft.get("users") or [])}
+
+
+def get_form_types(form_type_ids):
+    """{ form_type_id: form type dict or None } — one lookup per distinct id."""
+    result = {}
+    for form_type_id in set(form_type_ids):
+        if form_type_id is not None:
+            result[form_type_id] = get_form_type(form_type_id)
+    return result
+
+
+def invalidate_form_type(form_type_id=None):
+    """Drop one form type (or all of them) so the next read refetches it."""
+    if form_type_id is None:
+        form_type_cache.clear()
+    else:
+        form_type_cache.invalidate(int(form_type_id))
@@ -1,14 +1,18 @@
-import os, uuid, mimetypes, botocore, boto3, requests
-from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime
+import os, uuid, mimetypes, botocore, boto3
+from flask import Blueprint, request, jsonify, current_app, g, has_app_context
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, request, jsonify
 from app import db
 import aiohttp
 from aiohttp import BasicAuth
 import asyncio
 import os
-import requests
-from app.model import Ticket, TicketAssignment, TicketFile, TicketTag, TicketComment, TicketStatusLog, TicketAssignmentLog,EmailLog  
+from sqlalchemy import select
+from app.model import Ticket, TicketAssignment, TicketFile, TicketTag, TicketComment, TicketStatusLog, TicketAssignmentLog, TicketFollowUp, EmailLog, UserCache
+from app.utils.cache import get_cache, MISSING
+from app.utils.http_client import http_client
+from app.utils.deadline import DeadlineExceeded, current_deadline, mark_degraded, run_with_deadline
 
 
 # ─── S3 Config ──────────────────────────────────────────────
@@ -88,29 +92,43 @@ GRAPH_TOKEN_URL = "https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/tok
 GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
 
 
+# Graph tokens are reused until shortly before they expire (shared across workers)
+GRAPH_TOKEN_EXPIRY_MARGIN = 60
+graph_token_cache = get_cache("graph_token", maxsize=4, ttl=3000, negative_ttl=0)
+
+
+def _fetch_graph_token(tenant_id):
+    token_url = GRAPH_TOKEN_URL.format(tenant_id=tenant_id)
+    data = {
+        "grant_type": "client_credentials",
+        "client_id": MICROSOFT_CLIENT_ID,
+        "client_secret": MICROSOFT_CLIENT_SECRET,
+        "scope": "https://graph.microsoft.com/.default"
+    }
+
+    # client-credentials token requests are safe to retry
+    response = http_client.post(token_url, data=data, timeout=30, retries=2, service="graph-token")
+    response.raise_for_status()
+    payload = response.json()
+    token = payload.get("access_token")
+    if not token:
+        raise Exception("No access_token found in Graph response")
+    return {"access_token": token, "expires_in": int(payload.get("expires_in") or 3600)}
+
+
 def get_graph_token():
     """
     Get an access token from Microsoft Graph using client credentials.
+    Cached until GRAPH_TOKEN_EXPIRY_MARGIN seconds before it expires.
     """
     try:
         tenant_id = MICROSOFT_TENANT_ID
-        client_id = MICROSOFT_CLIENT_ID
-        client_secret = MICROSOFT_CLIENT_SECRET
-
-        token_url = GRAPH_TOKEN_URL.format(tenant_id=tenant_id)
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "scope": "https://graph.microsoft.com/.default"
-        }
-
-        response = requests.post(token_url, data=data, timeout=30)
-        response.raise_for_status()
-        token = response.json().get("access_token")
-        if not token:
-            raise Exception("No access_token found in Graph response")
-        return token
+        cached = graph_token_cache.get_or_load(
+            tenant_id,
+            lambda: _fetch_graph_token(tenant_id),
+            ttl=lambda t: t["expires_in"] - GRAPH_TOKEN_EXPIRY_MARGIN
+        )
+        return cached["access_token"]
 
     except Exception as e:
         print(f"⚠️ Failed to get Microsoft Graph token: {e}")
@@ -160,7 +178,7 @@ def send_email(to, subject, body_html, body_text=None):
             )
 
             url = f"{GRAPH_BASE_URL}/users/{sender_email}/sendMail"
-            response = requests.post(url, headers=headers, json=message, timeout=30)
+            response = http_client.post(url, headers=headers, json=message, timeout=30, service="graph-mail")
 
             success = response.status_code in (200, 202)
             response_text = response.text or response.reason
@@ -306,62 +324,279 @@ def send_email(to, subject, body_html, body_text=None):
 
 
 # ─── Helper: Get user info from external API ────────────────
-def get_user_info_by_id(user_id):
+AUTH_USER_URL = "https://api.dental360grp.com/api/user/{user_id}"
+
+# Process-wide user cache (TTL + LRU, negative caching, single-flight)
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 300))
+USER_CACHE_NEGATIVE_TTL = int(os.getenv("USER_CACHE_NEGATIVE_TTL", 30))
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", 5000))
+
+user_info_cache = get_cache(
+    "user_info",
+    maxsize=USER_CACHE_MAXSIZE,
+    ttl=USER_CACHE_TTL,
+    negative_ttl=USER_CACHE_NEGATIVE_TTL,
+)
+
+
+def _fetch_user_info(user_id):
+    """
+    Fetch one user from the Auth System.
+    Returns the user dict, None if the user does not exist (404),
+    and raises on transport/server errors so they are never cached.
+    """
+    resp = http_client.get(AUTH_USER_URL.format(user_id=user_id), timeout=5, service="auth-users")
+    if resp.status_code == 404:
+        return None
+    if resp.status_code != 200:
+        raise RuntimeError(f"Auth system returned {resp.status_code}")
+    user = resp.json()
+    return {
+        "id": user.get("id"),
+        "username": f"{user.get('first_name', '')} {user.get('last_name', '')}".strip(),
+        "email": user.get("email"),
+        "phone": user.get("phone"),
+        "role": user.get("user_role")
+    }
+
+
+def _request_user_map():
+    """Per-request identity map (user_id -> info) kept on flask.g, or None outside a context."""
+    if not has_app_context():
+        return None
+    if "user_info_map" not in g:
+        g.user_info_map = {}
+    return g.user_info_map
+
+
+def _load_user_info(user_id):
     try:
-        url = f"https://api.dental360grp.com/api/user/{user_id}"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code == 200:
-            user = resp.json()
-            return {
-                "id": user.get("id"),
-                "username": f"{user.get('first_name', '')} {user.get('last_name', '')}".strip(),
-                "email": user.get("email"),
-                "phone": user.get("phone"),
-                "role": user.get("user_role")
-            }
+        user = user_info_cache.get_or_load(user_id, lambda: _fetch_user_info(user_id))
+        # hand out a copy so callers can't mutate the cached entry
+        return dict(user) if user else None
+    except DeadlineExceeded:
+        mark_degraded("users")
     except Exception as e:
         print(f"❌ Error fetching user info for {user_id}: {e}")
     return None
 
 
+def get_user_info_by_id(user_id):
+    if not user_id:
+        return None
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    return get_users_info_by_ids([user_id]).get(user_id)
+
+
+# Bounded pool for concurrent user lookups (shared by all requests in this worker)
+USER_FETCH_WORKERS = int(os.getenv("USER_FETCH_WORKERS", 8))
+_user_fetch_pool = ThreadPoolExecutor(max_workers=USER_FETCH_WORKERS, thread_name_prefix="user-fetch")
+
+# Local users_cache mirror (see app.utils.user_sync)
+USER_MIRROR_ENABLED = os.getenv("USER_MIRROR_ENABLED", "true").lower() == "true"
+USER_MIRROR_MAX_AGE = int(os.getenv("USER_MIRROR_MAX_AGE", 24 * 3600))
+
+
+def _mirror_lookup(user_ids):
+    """Fresh rows from the users_cache mirror for these ids, in one IN query."""
+    if not user_ids or not USER_MIRROR_ENABLED or not has_app_context():
+        return {}
+    cutoff = datetime.utcnow() - timedelta(seconds=USER_MIRROR_MAX_AGE)
+    try:
+        # own pooled connection: a failed lookup (e.g. users_cache not migrated yet)
+        # can't abort the caller's transaction on Postgres, and reading here
+        # doesn't flush the caller's pending writes
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                select(UserCache.id, UserCache.username, UserCache.email, UserCache.phone, UserCache.role)
+                .where(UserCache.id.in_(user_ids), UserCache.synced_at >= cutoff)
+            ).all()
+    except Exception as e:
+        print(f"⚠️ users_cache lookup failed: {e}")
+        return {}
+    # same shape as UserCache.to_user_info()
+    return {row.id: dict(row._mapping) for row in rows}
+
+
+def get_users_info_by_ids(user_ids):
+    """
+    Resolve many users at once.
+    Returns { user_id (int): user_info dict or None }.
+
+    Lookup order: per-request identity map → process cache → local
+    users_cache mirror (one IN query) → Auth System, fetched concurrently.
+    A page of N users therefore costs at most one DB query plus one
+    parallel upstream round-trip instead of N serial calls.
+    """
+    ids = set()
+    for uid in user_ids or []:
+        try:
+            if uid:
+                ids.add(int(uid))
+        except (TypeError, ValueError):
+            continue
+
+    identity_map = _request_user_map()
+    result = {}
+    pending = []
+    for uid in ids:
+        if identity_map is not None and uid in identity_map:
+            result[uid] = identity_map[uid]
+            continue
+        cached = user_info_cache.get(uid, MISSING)
+        if cached is not MISSING:
+            result[uid] = dict(cached) if cached else None
+        else:
+            pending.append(uid)
+
+    if pending:
+        mirrored = _mirror_lookup(pending)
+        for uid, user in mirrored.items():
+            user_info_cache.set(uid, dict(user))
+            result[uid] = user
+        pending = [uid for uid in pending if uid not in mirrored]
+
+    deadline = current_deadline()
+    if pending and deadline is not None and deadline.expired():
+        # out of budget: leave these users null rather than blocking the response
+        deadline.mark_degraded("users")
+        result.update((uid, None) for uid in pending)
+        pending = []
+
+    if len(pending) == 1:
+        result[pending[0]] = _load_user_info(pending[0])
+    elif pending:
+        # pool threads don't see this request's deadline unless we hand it over
+        load = lambda uid: run_with_deadline(deadline, _load_user_info, uid)
+        for uid, user in zip(pending, _user_fetch_pool.map(load, pending)):
+            result[uid] = user
+
+    if identity_map is not None:
+        identity_map.update(result)
+    return result
+
+
+def collect_ticket_user_ids(tickets):
+    """
+    Every user id a ticket payload may show: creator, assignees, assignment
+    log actors, commenters, followers and status log actors.
+    Uses one IN query per child table, so callers can resolve the whole
+    page with a single get_users_info_by_ids() call.
+    """
+    ticket_ids = [t.id for t in tickets]
+    user_ids = {t.user_id for t in tickets if t.user_id}
+    if not ticket_ids:
+        return user_ids
+
+    for assign_by, assign_to in TicketAssignment.query.with_entities(
+            TicketAssignment.assign_by, TicketAssignment.assign_to).filter(
+            TicketAssignment.ticket_id.in_(ticket_ids)).all():
+        user_ids.update([assign_by, assign_to])
+
+    for old_to, new_to, changed_by in TicketAssignmentLog.query.with_entities(
+            TicketAssignmentLog.old_assign_to, TicketAssignmentLog.new_assign_to,
+            TicketAssignmentLog.changed_by).filter(
+            TicketAssignmentLog.ticket_id.in_(ticket_ids)).all():
+        user_ids.update([old_to, new_to, changed_by])
+
+    for (uid,) in TicketComment.query.with_entities(TicketComment.user_id).filter(
+            TicketComment.ticket_id.in_(ticket_ids)).all():
+        user_ids.add(uid)
+
+    for (uid,) in TicketFollowUp.query.with_entities(TicketFollowUp.user_id).filter(
+            TicketFollowUp.ticket_id.in_(ticket_ids)).all():
+        user_ids.add(uid)
+
+    for (uid,) in TicketStatusLog.query.with_entities(TicketStatusLog.changed_by).filter(
+            TicketStatusLog.ticket_id.in_(ticket_ids)).all():
+        user_ids.add(uid)
+
+    user_ids.discard(None)
+    return user_ids
+
+
+def invalidate_user_info(user_id=None):
+    """Drop one user (or every user) from the user info cache."""
+    if user_id is None:
+        user_info_cache.clear()
+    else:
+        user_info_cache.invalidate(int(user_id))
+
+
+# Email → user_id directory for the email ingestion path
+USER_EMAIL_CACHE_TTL = int(os.getenv("USER_EMAIL_CACHE_TTL", 3600))
+USER_EMAIL_CACHE_NEGATIVE_TTL = int(os.getenv("USER_EMAIL_CACHE_NEGATIVE_TTL", 600))
+
+user_email_directory = get_cache(
+    "user_email_directory",
+    maxsize=USER_CACHE_MAXSIZE,
+    ttl=USER_EMAIL_CACHE_TTL,
+    negative_ttl=USER_EMAIL_CACHE_NEGATIVE_TTL,
+)
+
+
+def _normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def _fetch_user_id_by_email(email):
+    """
+    Search the Auth System by email address.
+    Returns the user_id, None if nobody matches, raises on upstream errors.
+    Response structure: {"message": "...", "results": [{"id": 149, "user_id": 71, ...}]}
+    """
+    url = f"https://api.dental360grp.com/api/clinic_team/search"
+    params = {"query": email}
+    resp = http_client.get(url, params=params, timeout=5, service="auth-user-search")
+    if resp.status_code != 200:
+        raise RuntimeError(f"Auth system returned {resp.status_code}")
+
+    results = resp.json().get("results", [])
+    if not results:
+        print(f"⚠️ No results found for email {email}")
+        return None
+
+    # Get first matching user → 'user_id' is the primary user ID
+    user_id = results[0].get("user_id")
+    if user_id:
+        print(f"✅ Found user_id {user_id} for email {email}")
+        return user_id
+    print(f"⚠️ User found but no ID field for email {email}")
+    return None
+
+
 def get_user_id_by_email(email):
     """
     Get user_id from Auth System API by email address.
     Returns user_id if found, None otherwise.
-    Response structure: {"message": "...", "results": [{"id": 149, "user_id": 71, ...}]}
+    Results (including "not found") are cached by lower-cased email.
     """
+    email = _normalize_email(email)
+    if not email:
+        return None
     try:
-        url = f"https://api.dental360grp.com/api/clinic_team/search"
-        params = {"query": email}
-        resp = requests.get(url, params=params, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            results = data.get("results", [])
-            
-            if results and len(results) > 0:
-                # Get first matching user
-                user = results[0]
-                # Return 'id' field (primary user ID) or 'user_id' as fallback
-                user_id =  user.get("user_id")
-                if user_id:
-                    print(f"✅ Found user_id {user_id} for email {email}")
-                    return user_id
-                else:
-                    print(f"⚠️ User found but no ID field for email {email}")
-                    return None
-            else:
-                print(f"⚠️ No results found for email {email}")
-                return None
-        else:
-            print(f"⚠️ User not found for email {email}: {resp.status_code}")
-            return None
+        return user_email_directory.get_or_load(email, lambda: _fetch_user_id_by_email(email))
     except Exception as e:
         print(f"❌ Error fetching user by email {email}: {e}")
         return None
 
 
-def update_ticket_status(ticket_id, new_status, user_id):
-    ticket = Ticket.query.get(ticket_id)
+def prime_user_email_directory(emails):
+    """
+    Resolve a batch of sender emails up front (concurrently, deduped), so the
+    per-email lookups during an ingestion run are served from the directory.
+    Returns { normalized_email: user_id or None }.
+    """
+    pending = sorted({_normalize_email(e) for e in emails if _normalize_email(e)})
+    return dict(zip(pending, _user_fetch_pool.map(get_user_id_by_email, pending)))
+
+
+def update_ticket_status(ticket_id, new_status, user_id, ticket=None, commit=True):
+    """Set the status and log it. Pass `ticket` to skip the re-read, commit=False to join the caller's transaction."""
+    ticket = ticket or Ticket.query.get(ticket_id)
     if not ticket:
         return None
     
@@ -377,11 +612,13 @@ def update_ticket_status(ticket_id, new_status, user_id):
         changed_by=user_id
     )
     db.session.add(log)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return ticket
 
-def update_ticket_assignment_log(ticket_id, old_assign_to, new_assign_to, changed_by):
-    ticket = Ticket.query.get(ticket_id)
+def update_ticket_assignment_log(ticket_id, old_assign_to, new_assign_to, changed_by, ticket=None, commit=True):
+    """Log an assignee change. Pass `ticket` to skip the existence check, commit=False to join the caller's transaction."""
+    ticket = ticket or Ticket.query.get(ticket_id)
     if not ticket:
         return None
 
@@ -392,7 +629,8 @@ def update_ticket_assignment_log(ticket_id, old_assign_to, new_assign_to, change
         changed_by=changed_by
     )
     db.session.add(log)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return log
 
 
@@ -0,0 +1,210 @@
+import os
+import random
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.utils.deadline import DeadlineExceeded, current_deadline
+
+
+# ─── Config ─────────────────────────────────────────────────
+HTTP_DEFAULT_TIMEOUT = float(os.getenv("HTTP_DEFAULT_TIMEOUT", 10))
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 10))   # hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 20))           # keep-alive conns per host
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 2))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", 0.2))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", 2))
+HTTP_BREAKER_FAILURES = int(os.getenv("HTTP_BREAKER_FAILURES", 5))
+HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", 30))
+
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed → open → half-open breaker for one upstream service.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    every call fails immediately for `reset_timeout` seconds. Then a single
+    trial call is let through; success closes the breaker, failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failure_threshold=HTTP_BREAKER_FAILURES, reset_timeout=HTTP_BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"⚠️ Circuit breaker OPEN for {self.name} after {self.failures} failure(s)")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self):
+        """The call ended without saying anything about the upstream (e.g. our deadline ran out)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "rejected": self.rejected,
+            }
+
+
+class HttpClient:
+    """
+    One shared requests.Session for all outbound calls.
+
+    - keep-alive connection pool per host (HTTP_POOL_MAXSIZE connections each)
+    - default timeout on every call (HTTP_DEFAULT_TIMEOUT)
+    - retries with jittered exponential backoff for idempotent methods on
+      connection errors and 502/503/504
+    - circuit breaker per upstream service (`service=`, default: the host) so a
+      dead upstream fails fast instead of tying up worker threads, without
+      taking down other services that share its host
+    - every timeout and backoff is clipped to the inbound request's remaining
+      deadline (app.utils.deadline); DeadlineExceeded once it is used up
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        # never carry cookies from one upstream call into the next
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker_for(self, url, service=None):
+        name = service or urlsplit(url).netloc
+        with self._breakers_lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name)
+                self._breakers[name] = breaker
+            return breaker
+
+    @staticmethod
+    def _backoff(attempt):
+        # "full jitter": sleep anywhere between 0 and the exponential cap
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+    def request(self, method, url, timeout=None, retries=None, deadline=None, service=None, **kwargs):
+        method = method.upper()
+        if timeout is None:
+            timeout = HTTP_DEFAULT_TIMEOUT
+        if retries is None:
+            retries = HTTP_MAX_RETRIES if method in IDEMPOTENT_METHODS else 0
+        if deadline is None:
+            deadline = current_deadline()
+
+        breaker = self.breaker_for(url, service)
+        attempt = 0
+        while True:
+            call_timeout = deadline.timeout(timeout) if deadline is not None else timeout
+            clipped = call_timeout != timeout
+
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {breaker.name}, skipping {method} {url}")
+
+            try:
+                response = self.session.request(method, url, timeout=call_timeout, **kwargs)
+            except requests.exceptions.Timeout as e:
+                if clipped:
+                    # our budget ran out, not the upstream's normal timeout – don't blame the service
+                    breaker.release()
+                    raise DeadlineExceeded(f"Request deadline hit calling {method} {url}") from e
+                breaker.record_failure()
+                # Read timeouts are not retried: the upstream is slow, not down
+                if isinstance(e, requests.exceptions.ReadTimeout) or attempt >= retries:
+                    raise
+                last_error, response = e, None
+            except requests.exceptions.ConnectionError as e:
+                breaker.record_failure()
+                if attempt >= retries:
+                    raise
+                last_error, response = e, None
+            except Exception:
+                # anything else (SSLError, ChunkedEncodingError, InvalidURL, ...) still settles
+                # the call, so a half-open trial can never stay in flight forever
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+
+            pause = self._backoff(attempt)
+            if deadline is not None and pause >= deadline.remaining():
+                # no budget left for another attempt: surface what we have
+                if response is not None:
+                    return response
+                raise last_error
+            if response is not None:
+                # discarded for a retry: hand its pooled connection back now, not at GC
+                response.close()
+            time.sleep(pause)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        with self._breakers_lock:
+            breakers = dict(self._breakers)
+        return {host: b.stats() for host, b in breakers.items()}
+
+
+# ─── Shared client used by every module ─────────────────────
+http_client = HttpClient()
@@ -0,0 +1,71 @@
+import decimal
+import os
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to Flask's stdlib-json provider
+    orjson = None
+
+
+# ─── Config ─────────────────────────────────────────────────
+# "http" keeps Flask's "Tue, 07 Oct 2025 10:00:00 GMT" datetimes (what clients get today);
+# "iso" emits 2025-10-07T10:00:00 natively, which is also faster
+JSON_DATETIME_FORMAT = os.getenv("JSON_DATETIME_FORMAT", "http")
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")  # orjson | default
+
+
+def _fallback(o):
+    """Types orjson doesn't handle itself — same results as Flask's default provider."""
+    if isinstance(o, (datetime, date)):
+        return http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson. Output matches DefaultJSONProvider
+    (sorted keys, non-str keys, http-date datetimes unless configured for ISO);
+    anything orjson rejects (e.g. ints beyond 64 bits) goes through the stdlib path.
+    """
+
+    datetime_format = JSON_DATETIME_FORMAT
+
+    def _options(self, indent):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if self.datetime_format != "iso":
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return option
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, default=_fallback, option=self._options(kwargs.get("indent"))).decode()
+        except (orjson.JSONEncodeError, TypeError):
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # stdlib accepts a few things orjson doesn't (NaN, big ints); let it decide
+            return super().loads(s, **kwargs)
+
+
+def init_json(app):
+    """Install the orjson provider when available (JSON_ENCODER=default keeps Flask's)."""
+    if orjson is None or app.config.get("JSON_ENCODER", JSON_ENCODER) != "orjson":
+        return
+    provider = OrjsonProvider(app)
+    provider.datetime_format = app.config.get("JSON_DATETIME_FORMAT", JSON_DATETIME_FORMAT)
+    app.json = provider
@@ -0,0 +1,150 @@
+import os
+
+from app.utils.cache import get_cache
+from app.utils.deadline import DeadlineExceeded, mark_degraded
+from app.utils.http_client import http_client
+
+
+# ─── Config ─────────────────────────────────────────────────
+AUTH_SYSTEM_URL = os.getenv("AUTH_SYSTEM_URL", "https://api.dental360grp.com/api")
+CLINIC_LOCATIONS_URL = AUTH_SYSTEM_URL + "/clinic_locations/get_all/{clinic_id}"
+DEFAULT_CLINIC_ID = 1
+
+LOCATION_CACHE_TTL = int(os.getenv("LOCATION_CACHE_TTL", 600))
+LOCATION_CACHE_NEGATIVE_TTL = int(os.getenv("LOCATION_CACHE_NEGATIVE_TTL", 60))
+LOCATION_CACHE_MAXSIZE = int(os.getenv("LOCATION_CACHE_MAXSIZE", 256))
+
+
+def _normalize_postal_code(postal_code):
+    if postal_code is None:
+        return None
+    code = str(postal_code).replace(" ", "").strip().upper()
+    return code or None
+
+
+class ClinicLocations:
+    """
+    One clinic's locations, indexed for O(1) lookups.
+    Instances are shared through the cache, so treat them as read-only.
+    """
+
+    def __init__(self, clinic_id, locations):
+        self.clinic_id = clinic_id
+        self.locations = []
+        self.by_id = {}
+        self.by_postal_code = {}
+
+        for loc in locations:
+            if not isinstance(loc, dict) or not loc.get("id"):
+                continue
+            try:
+                loc_id = int(loc["id"])
+            except (TypeError, ValueError):
+                continue
+            self.locations.append(loc)
+            self.by_id[loc_id] = loc
+            code = _normalize_postal_code(loc.get("postal_code"))
+            if code:
+                # first location wins, same as the old linear scan
+                self.by_postal_code.setdefault(code, loc)
+
+    def name_map(self):
+        """{ location_id: display name } — the shape get_clinic_locations_map() always returned."""
+        return {
+            loc_id: (loc.get("location_name") or loc.get("display_name") or f"Location #{loc_id}").strip()
+            for loc_id, loc in self.by_id.items()
+        }
+
+
+# Shared tier stores the raw location list; each worker rebuilds the indexes once
+clinic_locations_cache = get_cache(
+    "clinic_locations",
+    maxsize=LOCATION_CACHE_MAXSIZE,
+    ttl=LOCATION_CACHE_TTL,
+    negative_ttl=LOCATION_CACHE_NEGATIVE_TTL,
+    encode=lambda directory: {"clinic_id": directory.clinic_id, "locations": directory.locations},
+    decode=lambda raw: ClinicLocations(raw["clinic_id"], raw["locations"]),
+)
+
+
+def _fetch_clinic_locations(clinic_id):
+    """Download one clinic's locations. Raises on upstream errors so they are never cached."""
+    resp = http_client.get(CLINIC_LOCATIONS_URL.format(clinic_id=clinic_id), timeout=10, service="auth-locations")
+    if resp.status_code == 404:
+        return None
+    if resp.status_code != 200:
+        raise RuntimeError(f"Auth system returned {resp.status_code}")
+    locations = resp.json().get("locations", [])
+    if not isinstance(locations, list):
+        locations = []
+    return ClinicLocations(clinic_id, locations)
+
+
+def get_clinic_locations(clinic_id):
+    """Cached ClinicLocations for a clinic, or None when it can't be loaded."""
+    clinic_id = int(clinic_id or DEFAULT_CLINIC_ID)
+    try:
+        return clinic_locations_cache.get_or_load(clinic_id, lambda: _fetch_clinic_locations(clinic_id))
+    except DeadlineExceeded:
+        mark_degraded("location")
+        return None
+    except Exception as e:
+        print(f"❌ Failed to fetch clinic locations for clinic {clinic_id}: {e}")
+        return None
+
+
+def get_location(clinic_id, location_id):
+    """One location dict (a copy) or None."""
+    if not location_id:
+        return None
+    directory = get_clinic_locations(clinic_id)
+    if directory is None:
+        return None
+    try:
+        loc = directory.by_id.get(int(location_id))
+    except (TypeError, ValueError):
+        return None
+    return dict(loc) if loc else None
+
+
+def get_locations(clinic_id, location_ids):
+    """{ location_id: location dict } for the ids that exist; missing ids are left out."""
+    directory = get_clinic_locations(clinic_id)
+    if directory is None:
+        return {}
+    found = {}
+    for loc_id in location_ids:
+        loc = directory.by_id.get(loc_id)
+        if loc:
+            found[loc_id] = dict(loc)
+    return found
+
+
+def find_location_by_postal_code(clinic_id, postal_code):
+    """The first location of the clinic with this postal code, or None."""
+    code = _normalize_postal_code(postal_code)
+    if not code:
+        return None
+    directory = get_clinic_locations(clinic_id)
+    if directory is None:
+        return None
+    loc = directory.by_postal_code.get(code)
+    return dict(loc) if loc else None
+
+
+def get_clinic_locations_map(clinic_id):
+    """
+    Returns:
+      { location_id (int): location_display_name (str) }
+    Empty dict if the Auth System can't be reached.
+    """
+    directory = get_clinic_locations(clinic_id)
+    return directory.name_map() if directory else {}
+
+
+def invalidate_clinic_locations(clinic_id=None):
+    """Drop one clinic (or every clinic) from the location cache."""
+    if clinic_id is None:
+        clinic_locations_cache.clear()
+    else:
+        clinic_locations_cache.invalidate(int(clinic_id))
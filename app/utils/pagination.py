@@ -0,0 +1,241 @@
+import base64
+import json
+import os
+from datetime import datetime
+
+from flask import jsonify, request
+from sqlalchemy import and_, func, or_, select
+
+
+# ─── Config ─────────────────────────────────────────────────
+# ?count=estimate counts at most this many rows and reports "<cap>+" beyond it
+COUNT_ESTIMATE_CAP = int(os.getenv("COUNT_ESTIMATE_CAP", 1000))
+COUNT_MODES = ("exact", "estimate", "none")
+
+
+class PaginationError(ValueError):
+    """Bad pagination parameters (?cursor=, ?count=) → 400."""
+
+
+class InvalidCursor(PaginationError):
+    """The ?cursor= value could not be decoded."""
+
+
+def encode_cursor(payload):
+    """Opaque, URL-safe cursor for a JSON-able payload."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if not isinstance(payload, dict):
+        raise InvalidCursor("Invalid cursor")
+    return payload
+
+
+def _position(row):
+    """(created_at, id) cursor payload for a row; "t" is None for rows without a created_at."""
+    return {"t": row.created_at.isoformat() if row.created_at else None, "id": row.id}
+
+
+def _parse_position(payload):
+    try:
+        t = payload["t"]
+        return (datetime.fromisoformat(t) if t is not None else None), int(payload["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def keyset_filter(query, model, position):
+    """Dated rows strictly after a dated `position` in (created_at DESC, id DESC) order."""
+    if position is None:
+        return query
+    created_at, row_id = position
+    return query.filter(or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < row_id)
+    ))
+
+
+def keyset_order(query, model):
+    return query.order_by(None).order_by(model.created_at.desc(), model.id.desc())
+
+
+def keyset_rows(query, model, position, limit):
+    """
+    Up to `limit` rows after `position` in (created_at DESC NULLS LAST, id DESC)
+    order. Dated and undated rows are read separately: Postgres would sort
+    NULLs first under DESC, and NULLS LAST can't use the plain
+    (…, created_at, id) indexes, while each part on its own can.
+    """
+    rows = []
+    in_undated = position is not None and position[0] is None
+    if not in_undated:
+        dated = query.filter(model.created_at.isnot(None))
+        rows = keyset_order(keyset_filter(dated, model, position), model).limit(limit).all()
+    if len(rows) < limit:
+        undated = query.filter(model.created_at.is_(None))
+        if in_undated:
+            undated = undated.filter(model.id < position[1])
+        rows += undated.order_by(None).order_by(model.id.desc()).limit(limit - len(rows)).all()
+    return rows
+
+
+def _pages(total, per_page):
+    if not isinstance(total, int) or not per_page:
+        return None
+    return (total + per_page - 1) // per_page
+
+
+class KeysetPage:
+    """
+    One page of a keyset query. Quacks like Flask-SQLAlchemy's Pagination
+    (items / per_page / has_next) so endpoints can build their response the
+    same way; page is None, and total/pages stay None unless ?count= asks.
+    """
+
+    page = None
+    total = None
+    pages = None
+
+    def __init__(self, items, per_page, next_cursor, has_prev):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+        self.has_prev = has_prev
+
+
+class OffsetPage:
+    """OFFSET page whose total is capped ("1000+") or skipped (None) per ?count=."""
+
+    next_cursor = None
+
+    def __init__(self, items, page, per_page, total, has_next):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = _pages(total, per_page)
+        self.has_next = has_next
+        self.has_prev = page > 1
+
+
+def count_mode(default="exact"):
+    """?count=exact|estimate|none"""
+    mode = request.args.get("count", default).strip().lower()
+    if mode not in COUNT_MODES:
+        raise PaginationError(f"count must be one of: {', '.join(COUNT_MODES)}")
+    return mode
+
+
+def count_rows(query, model, mode):
+    """
+    Total for `query`: an int (exact, or estimate under the cap), "<cap>+" when
+    the estimate hits the cap, or None for count=none. The estimate stops
+    scanning after COUNT_ESTIMATE_CAP + 1 rows instead of counting them all.
+    """
+    if mode == "none":
+        return None
+    query = query.order_by(None)
+    if mode == "exact":
+        return query.count()
+    capped = query.with_entities(model.id).limit(COUNT_ESTIMATE_CAP + 1).subquery()
+    total = query.session.execute(select(func.count()).select_from(capped)).scalar()
+    return f"{COUNT_ESTIMATE_CAP}+" if total > COUNT_ESTIMATE_CAP else total
+
+
+def offset_paginate(query, model, page, per_page, mode):
+    """OFFSET pagination that only counts as much as `mode` asks for."""
+    if mode == "exact":
+        return query.paginate(page=page, per_page=per_page, error_out=False)
+    page = max(page, 1)
+    rows = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    total = count_rows(query, model, mode)
+    if isinstance(total, int):
+        # the estimate was exact, so pages is too
+        return OffsetPage(rows[:per_page], page, per_page, total, has_next=page * per_page < total)
+    return OffsetPage(rows[:per_page], page, per_page, total, has_next=len(rows) > per_page)
+
+
+def keyset_paginate(query, model, cursor, per_page):
+    """
+    Page through `query` ordered by (created_at DESC, id DESC), undated rows
+    last, using an opaque cursor instead of OFFSET, and without COUNT(*). Cost is the same
+    for page 1 and page 10,000 given an index on (…filters, created_at, id).
+    """
+    position = _parse_position(decode_cursor(cursor)) if cursor else None
+    rows = keyset_rows(query, model, position, per_page + 1)
+
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page and items:
+        next_cursor = encode_cursor(_position(items[-1]))
+    return KeysetPage(items, per_page, next_cursor, has_prev=bool(cursor))
+
+
+def keyset_merge(sources, cursor, per_page):
+    """
+    Keyset page over several tables merged by (created_at DESC, id DESC).
+
+    `sources` is {name: (query, model)}. The cursor remembers the position in
+    each source separately, so ids from different tables never collide.
+    Items are (name, row) tuples.
+    """
+    positions = decode_cursor(cursor) if cursor else {}
+    candidates = []
+    for name, (query, model) in sources.items():
+        raw = positions.get(name)
+        position = _parse_position(raw) if raw else None
+        rows = keyset_rows(query, model, position, per_page + 1)
+        candidates.extend((name, row) for row in rows)
+
+    # undated rows last, as in keyset_rows
+    candidates.sort(key=lambda c: (c[1].created_at is not None, c[1].created_at or datetime.min, c[1].id),
+                    reverse=True)
+    items = candidates[:per_page]
+
+    next_cursor = None
+    if len(candidates) > per_page:
+        next_positions = {name: positions.get(name) for name in sources}
+        for name, row in items:
+            next_positions[name] = _position(row)
+        next_cursor = encode_cursor(next_positions)
+    return KeysetPage(items, per_page, next_cursor, has_prev=bool(cursor))
+
+
+def cursor_requested():
+    """Keyset mode is opt-in: any ?cursor= (empty for the first page) switches to it."""
+    return "cursor" in request.args
+
+
+def paginate(query, model, page, per_page):
+    """
+    ?cursor= → KeysetPage, otherwise OFFSET pagination.
+
+    ?count= picks how `total` is computed: exact (default for offset mode),
+    estimate (capped) or none (default for cursor mode; has_next comes from
+    fetching per_page + 1 rows).
+    """
+    if cursor_requested():
+        mode = count_mode(default="none")
+        pagination = keyset_paginate(query, model, request.args.get("cursor"), per_page)
+        pagination.total = count_rows(query, model, mode)
+        pagination.pages = _pages(pagination.total, per_page)
+        return pagination
+    return offset_paginate(query, model, page, per_page, count_mode())
+
+
+def next_cursor(pagination):
+    return getattr(pagination, "next_cursor", None)
+
+
+def register_pagination_errors(app):
+    @app.errorhandler(PaginationError)
+    def invalid_pagination(e):
+        return jsonify({"error": str(e)}), 400
@@ -0,0 +1,135 @@
+import re
+
+from sqlalchemy import select, text
+
+from app import db
+from app.model import (
+    Ticket, TicketAssignment, TicketAssignmentLog, TicketFile, TicketComment, TicketTag,
+    TicketFollowUp, TicketStatusLog, TicketNotification, FormEmailLog, FormEntry, FormFieldValue,
+    EmailLog, EmailProcessedLog, ContactFormTicketLink, ContactFormSubmission, ProjectTicket,
+    ProjectAssignment
+)
+from app.utils.pagination import keyset_order
+from app.utils.ticket_query import TicketQuery
+
+
+IDS = [1, 2, 3]
+
+
+def _hot_queries():
+    """
+    (name, statement, tables that must be reached through an index).
+    Mirrors what the list/detail endpoints and email processing actually run.
+    """
+    return [
+        ("tickets page (keyset)",
+         keyset_order(Ticket.query, Ticket).limit(11), ["tickets"]),
+        ("tickets by status_key",
+         TicketQuery().status("pending,in progress").newest_first().query.limit(11), ["tickets"]),
+        ("tickets assigned_to (EXISTS)",
+         TicketQuery().assigned_to(7).query.limit(11), ["ticket_assignments"]),
+        ("tickets assigned_by (EXISTS)",
+         TicketQuery().assigned_by(7).query.limit(11), ["ticket_assignments"]),
+        ("tickets followed_by (EXISTS)",
+         TicketQuery().followed_by(7).query.limit(11), ["ticket_followups"]),
+        ("tickets tagged (EXISTS)",
+         TicketQuery().tagged("7").query.limit(11), ["ticket_tags"]),
+        ("project tickets (EXISTS)",
+         TicketQuery().in_project(7).query.limit(11), ["project_tickets"]),
+        ("assignments of page", select(TicketAssignment).where(TicketAssignment.ticket_id.in_(IDS)), ["ticket_assignments"]),
+        ("assignment logs of page", select(TicketAssignmentLog).where(TicketAssignmentLog.ticket_id.in_(IDS)), ["ticket_assignment_log"]),
+        ("files of page", select(TicketFile).where(TicketFile.ticket_id.in_(IDS)), ["ticket_files"]),
+        ("files of comment", select(TicketFile).where(TicketFile.comment_id == 7), ["ticket_files"]),
+        ("comments of page",
+         select(TicketComment).where(TicketComment.ticket_id.in_(IDS)).order_by(TicketComment.created_at),
+         ["ticket_comments"]),
+        ("tags of page", select(TicketTag).where(TicketTag.ticket_id.in_(IDS)), ["ticket_tags"]),
+        ("followups of page", select(TicketFollowUp).where(TicketFollowUp.ticket_id.in_(IDS)), ["ticket_followups"]),
+        ("status logs of page", select(TicketStatusLog).where(TicketStatusLog.ticket_id.in_(IDS)), ["ticket_status_logs"]),
+        ("project links of page", select(ProjectTicket).where(ProjectTicket.ticket_id.in_(IDS)), ["project_tickets"]),
+        ("contact form links of page",
+         select(ContactFormTicketLink).where(ContactFormTicketLink.ticket_id.in_(IDS)), ["contact_form_ticket_links"]),
+        ("notifications of receiver (keyset)",
+         keyset_order(TicketNotification.query.filter_by(receiver_id=7), TicketNotification).limit(11),
+         ["ticket_notifications"]),
+        ("notifications of ticket",
+         keyset_order(TicketNotification.query.filter_by(ticket_id=7), TicketNotification).limit(11),
+         ["ticket_notifications"]),
+        ("form email logs of receiver (keyset)",
+         keyset_order(FormEmailLog.query.filter_by(receiver_id=7), FormEmailLog).limit(11),
+         ["form_email_logs"]),
+        ("contact forms of clinic (keyset)",
+         keyset_order(ContactFormSubmission.query.filter_by(clinic_id=7), ContactFormSubmission).limit(11),
+         ["contact_form_submissions"]),
+        ("form entries of type",
+         select(FormEntry).where(FormEntry.form_type_id == 7).order_by(FormEntry.created_at.desc()),
+         ["form_entries"]),
+        ("field values of entry", select(FormFieldValue).where(FormFieldValue.form_entry_id == 7), ["form_field_values"]),
+        ("email log of recipient",
+         select(EmailLog).where(EmailLog.to == "a@b.c").order_by(EmailLog.created_at.desc()).limit(1),
+         ["email_logs"]),
+        ("processed emails of conversation",
+         select(EmailProcessedLog).where(EmailProcessedLog.conversation_id == "c").limit(1),
+         ["email_processed_logs"]),
+        ("processed emails of ticket",
+         select(EmailProcessedLog).where(EmailProcessedLog.ticket_id == 7), ["email_processed_logs"]),
+        ("project team of user",
+         select(ProjectAssignment).where(ProjectAssignment.user_id == 7), ["project_assignments"]),
+    ]
+
+
+def _statement(query):
+    return query.statement if hasattr(query, "statement") else query
+
+
+def _sql(connection, query):
+    compiled = _statement(query).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    return str(compiled)
+
+
+def _plan_lines(connection, sql):
+    if connection.dialect.name == "sqlite":
+        return [row[-1] for row in connection.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    return [row[0] for row in connection.execute(text("EXPLAIN " + sql))]
+
+
+def _full_scans(dialect, lines, tables):
+    """Tables from `tables` that the plan reads without an index."""
+    hits = set()
+    for line in lines:
+        for table in tables:
+            if dialect == "sqlite":
+                # "SCAN tickets" is a table scan; "SCAN tickets USING INDEX ..." walks an index
+                if re.search(rf"\bSCAN (TABLE )?{table}\b(?!.*USING)", line):
+                    hits.add(table)
+            elif re.search(rf"Seq Scan on {table}\b", line):
+                hits.add(table)
+    return sorted(hits)
+
+
+def explain_hot_queries():
+    """
+    EXPLAIN every hot query and report the ones that would read a whole table.
+
+    On Postgres sequential scans are disabled for the check (SET LOCAL
+    enable_seqscan = off), so a Seq Scan in the plan means no usable index
+    exists rather than "the table is small" — the result doesn't depend on
+    how much data the database holds. SQLite always uses a usable index.
+    Returns [{"name", "plan", "full_scans"}]. tests/test_query_plans.py runs
+    it against a seeded SQLite database; `flask explain-hot-queries` against
+    any configured one.
+    """
+    results = []
+    with db.engine.connect() as connection:
+        with connection.begin() as transaction:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("SET LOCAL enable_seqscan = off"))
+            for name, query, tables in _hot_queries():
+                lines = _plan_lines(connection, _sql(connection, query))
+                results.append({
+                    "name": name,
+                    "plan": lines,
+                    "full_scans": _full_scans(connection.dialect.name, lines, tables),
+                })
+            transaction.rollback()
+    return results
@@ -0,0 +1,56 @@
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+
+
+# ─── Config ─────────────────────────────────────────────────
+# Timings reveal backend structure; switch off for public deployments if that matters
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "1") == "1"
+
+_NAME_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def record_timing(name, seconds):
+    """Add `seconds` to this request's `name` entry (repeat calls accumulate)."""
+    if not SERVER_TIMING_ENABLED or not has_request_context():
+        return
+    timings = g.setdefault("server_timings", {})
+    timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name):
+    """Time the block into this request's Server-Timing header."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - started)
+
+
+def call_timed(fn, *args, **kwargs):
+    """
+    (result, seconds) of fn(*args, **kwargs). For worker-pool threads, which
+    can't see flask.g; the request thread records the duration on join.
+    """
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def init_server_timing(app):
+    """Emit `Server-Timing: db;dur=4.1, users;dur=120.5, ...` for every recorded branch."""
+    if not SERVER_TIMING_ENABLED:
+        return
+
+    @app.after_request
+    def add_server_timing(response):
+        timings = g.pop("server_timings", None)
+        if timings:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{_NAME_RE.sub('_', name)};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
+            )
+        return response
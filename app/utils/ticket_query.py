@@ -0,0 +1,168 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import and_, exists, or_
+
+from app.model import Ticket, TicketAssignment, TicketFollowUp, TicketTag, ProjectTicket
+from app.utils.ticket_search import search_clause
+from app.utils.ticket_status import normalize_priority, status_keys
+
+
+ADMIN_ROLES = ("admin", "superadmin")
+
+
+def _day_start(day):
+    """Midnight at the start of `day` (a date or a YYYY-MM-DD string)."""
+    if isinstance(day, str):
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+    if isinstance(day, datetime):
+        day = day.date()
+    return datetime.combine(day, time.min)
+
+
+class TicketQuery:
+    """
+    Chainable filters for Ticket list/aggregate queries.
+
+    Relationship filters (assignee, follower, tag, project, visibility) are
+    correlated EXISTS subqueries, so the database resolves them with the
+    child-table indexes instead of us loading id lists into Python and sending
+    them back as IN (...). Date filters compare created_at against bounds
+    (never func.date(created_at)) so the created_at index stays usable.
+
+    Every method returns self; `.query` is the resulting SQLAlchemy query.
+    `base` may be any query that has Ticket in its FROM (e.g. a join).
+    """
+
+    def __init__(self, base=None):
+        self.query = base if base is not None else Ticket.query
+
+    def filter(self, *criteria):
+        self.query = self.query.filter(*criteria)
+        return self
+
+    # ─── Column filters ─────────────────────────────────────
+    def status(self, status_csv):
+        """Comma-separated statuses in any spelling ("In Progress", "in_progress") → exact status_key match."""
+        keys = status_keys(status_csv)
+        if keys:
+            self.filter(Ticket.status_key.in_(keys))
+        return self
+
+    def priority(self, priority):
+        key = normalize_priority(priority)
+        if key:
+            self.filter(Ticket.priority_key == key)
+        return self
+
+    def category(self, category_id):
+        if category_id:
+            self.filter(Ticket.category_id == category_id)
+        return self
+
+    def clinic(self, clinic_id):
+        if clinic_id:
+            self.filter(Ticket.clinic_id == clinic_id)
+        return self
+
+    def created_by(self, user_id):
+        if user_id:
+            self.filter(Ticket.user_id == user_id)
+        return self
+
+    def search(self, term, match_id=False):
+        """
+        Full-text match on title/details/comments (ilike on title/details where
+        full-text search isn't available); with match_id a numeric term also
+        matches the ticket id.
+        """
+        if not term:
+            return self
+        conditions = [search_clause(term)]
+        if match_id and term.isdigit():
+            conditions.append(Ticket.id == int(term))
+        return self.filter(or_(*conditions))
+
+    # ─── Date filters ───────────────────────────────────────
+    def created_from(self, moment):
+        """created_at >= moment (datetime or raw string, compared as given)."""
+        if moment:
+            self.filter(Ticket.created_at >= moment)
+        return self
+
+    def created_until(self, moment):
+        """created_at <= moment (datetime or raw string, compared as given)."""
+        if moment:
+            self.filter(Ticket.created_at <= moment)
+        return self
+
+    def created_on_or_after(self, day):
+        """Same as func.date(created_at) >= day, but index-friendly."""
+        if day:
+            self.filter(Ticket.created_at >= _day_start(day))
+        return self
+
+    def created_on_or_before(self, day):
+        """Same as func.date(created_at) <= day, but index-friendly."""
+        if day:
+            self.filter(Ticket.created_at < _day_start(day) + timedelta(days=1))
+        return self
+
+    def created_on(self, day):
+        return self.created_on_or_after(day).created_on_or_before(day)
+
+    # ─── Relationship filters (semi-joins) ──────────────────
+    def assigned_to(self, user_id):
+        if user_id:
+            self.filter(exists().where(and_(
+                TicketAssignment.ticket_id == Ticket.id,
+                TicketAssignment.assign_to == user_id
+            )))
+        return self
+
+    def assigned_by(self, user_id):
+        if user_id:
+            self.filter(exists().where(and_(
+                TicketAssignment.ticket_id == Ticket.id,
+                TicketAssignment.assign_by == user_id
+            )))
+        return self
+
+    def followed_by(self, user_id):
+        if user_id:
+            self.filter(exists().where(and_(
+                TicketFollowUp.ticket_id == Ticket.id,
+                TicketFollowUp.user_id == user_id
+            )))
+        return self
+
+    def tagged(self, tag_name):
+        if tag_name:
+            self.filter(exists().where(and_(
+                TicketTag.ticket_id == Ticket.id,
+                TicketTag.tag_name == str(tag_name)
+            )))
+        return self
+
+    def in_project(self, project_id):
+        self.filter(exists().where(and_(
+            ProjectTicket.ticket_id == Ticket.id,
+            ProjectTicket.project_id == project_id
+        )))
+        return self
+
+    def visible_to(self, user_id, role):
+        """Admins see everything; everyone else sees tickets they created or are assigned to."""
+        if (role or "").lower() in ADMIN_ROLES:
+            return self
+        return self.filter(or_(
+            Ticket.user_id == user_id,
+            exists().where(and_(
+                TicketAssignment.ticket_id == Ticket.id,
+                TicketAssignment.assign_to == user_id
+            ))
+        ))
+
+    # ─── Ordering ───────────────────────────────────────────
+    def newest_first(self):
+        self.query = self.query.order_by(Ticket.created_at.desc())
+        return self
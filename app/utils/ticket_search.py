@@ -0,0 +1,357 @@
+import html
+import os
+import re
+
+from sqlalchemy import DDL, column, delete, event, func, insert, inspect, literal_column, or_, select, table
+
+from app import db
+from app.model import Ticket, TicketComment, TicketSearchDocument
+
+
+# ─── Config ─────────────────────────────────────────────────
+# Off by default, and nothing is indexed while off. To turn on: run `flask search-reindex`
+# (creates the schema, builds documents), set this to 1 and restart, then run
+# `flask search-reindex` again to pick up tickets written in between
+SEARCH_FTS_ENABLED = os.getenv("SEARCH_FTS_ENABLED", "0") == "1"
+SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "english")  # Postgres text search config
+# Email-created tickets carry whole email bodies in comments; index the first N chars
+SEARCH_BODY_MAX_CHARS = int(os.getenv("SEARCH_BODY_MAX_CHARS", 100_000))
+
+FTS_TABLE = "ticket_search_fts"          # SQLite FTS5 index over ticket_search_documents
+# FTS5 exposes a hidden column named after the table; MATCH, bm25() and snippet() take it
+fts_table = table(FTS_TABLE, column("rowid"), column("title"), column("body"), column(FTS_TABLE))
+PG_INDEX = "ix_ticket_search_documents_document"
+
+# snippets are marked with control characters in SQL, then HTML-escaped and
+# turned into <mark> here, so markup from email bodies can't leak through
+_HL_START, _HL_STOP = "\x02", "\x03"
+
+_DIRTY_KEY = "ticket_search_dirty"
+
+
+# ─── Schema (dialect specific) ──────────────────────────────
+_PG_DDL = [
+    f"""
+    ALTER TABLE ticket_search_documents ADD COLUMN IF NOT EXISTS document tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON ticket_search_documents USING gin (document)",
+]
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, body, content='ticket_search_documents', content_rowid='ticket_id'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON ticket_search_documents BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.ticket_id, new.title, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON ticket_search_documents BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.ticket_id, old.title, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON ticket_search_documents BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.ticket_id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.ticket_id, new.title, new.body);
+    END
+    """,
+]
+
+for _statement in _PG_DDL:
+    event.listen(TicketSearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in _SQLITE_DDL:
+    event.listen(TicketSearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def ensure_search_schema(connection):
+    """Create the full-text structures if missing (create_all does this for new databases)."""
+    statements = {"postgresql": _PG_DDL, "sqlite": _SQLITE_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+_schema_ready = {}
+
+
+def _schema_present(connection):
+    dialect = connection.dialect.name
+    inspector = inspect(connection)
+    if dialect == "postgresql":
+        if not inspector.has_table(TicketSearchDocument.__tablename__):
+            return False
+        columns = {c["name"] for c in inspector.get_columns(TicketSearchDocument.__tablename__)}
+        return "document" in columns
+    return inspector.has_table(FTS_TABLE)
+
+
+def fts_available():
+    """Enabled, supported dialect, and the full-text structures exist (checked once per database)."""
+    if not SEARCH_FTS_ENABLED or _dialect() not in ("postgresql", "sqlite"):
+        return False
+    url = str(db.session.get_bind().url)
+    if url not in _schema_ready:
+        try:
+            _schema_ready[url] = _schema_present(db.session.connection())
+        except Exception as e:
+            print(f"⚠️ Search schema check failed, using ilike search: {e}")
+            _schema_ready[url] = False
+        if not _schema_ready[url]:
+            print("⚠️ Full-text search schema missing; run `flask search-reindex`. Using ilike search.")
+    return _schema_ready[url]
+
+
+# ─── Documents ──────────────────────────────────────────────
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _plain_text(value):
+    """Comments from emails are HTML; index the text, not the markup."""
+    if not value:
+        return ""
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", value))).strip()
+
+
+def write_documents(connection, ticket_ids):
+    """(Re)build the search documents of `ticket_ids`; deleted tickets lose theirs."""
+    ticket_ids = list({int(t) for t in ticket_ids if t})
+    if not ticket_ids:
+        return 0
+
+    tickets = connection.execute(
+        select(Ticket.id, Ticket.title, Ticket.details).where(Ticket.id.in_(ticket_ids))
+    ).all()
+    comments = {}
+    for ticket_id, comment in connection.execute(
+        select(TicketComment.ticket_id, TicketComment.comment)
+        .where(TicketComment.ticket_id.in_(ticket_ids))
+        .order_by(TicketComment.id)
+    ):
+        comments.setdefault(ticket_id, []).append(_plain_text(comment))
+
+    rows = []
+    for ticket_id, title, details in tickets:
+        body = "\n".join([_plain_text(details)] + comments.get(ticket_id, []))
+        rows.append({"ticket_id": ticket_id, "title": title, "body": body[:SEARCH_BODY_MAX_CHARS]})
+
+    connection.execute(delete(TicketSearchDocument).where(TicketSearchDocument.ticket_id.in_(ticket_ids)))
+    if rows:
+        connection.execute(insert(TicketSearchDocument), rows)
+    return len(rows)
+
+
+def _changed(obj, *attrs):
+    state = inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in attrs)
+
+
+def _collect_dirty_tickets(session, flush_context):
+    if not SEARCH_FTS_ENABLED:
+        return
+    dirty = session.info.setdefault(_DIRTY_KEY, set())
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            dirty.add(obj.id)
+        elif isinstance(obj, TicketComment):
+            dirty.add(obj.ticket_id)
+    for obj in session.dirty:
+        if isinstance(obj, Ticket) and _changed(obj, "title", "details"):
+            dirty.add(obj.id)
+        elif isinstance(obj, TicketComment) and _changed(obj, "comment", "ticket_id"):
+            dirty.add(obj.ticket_id)
+            old = inspect(obj).attrs.ticket_id.history.deleted
+            dirty.update(old)
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            dirty.add(obj.id)
+        elif isinstance(obj, TicketComment):
+            dirty.add(obj.ticket_id)
+    dirty.discard(None)
+
+
+def _index_before_commit(session):
+    """Write search documents in the same transaction as the ticket/comment change."""
+    session.flush()
+    ticket_ids = session.info.pop(_DIRTY_KEY, None)
+    if not ticket_ids:
+        return
+    connection = session.connection()
+    try:
+        with connection.begin_nested():
+            write_documents(connection, ticket_ids)
+    except Exception as e:
+        # never fail the user's write over the index; `flask search-reindex` repairs it
+        print(f"⚠️ Search index update failed for tickets {sorted(ticket_ids)}: {e}")
+
+
+def _forget_dirty(session, previous_transaction=None):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def init_ticket_search(app):
+    """Keep ticket_search_documents in step with ticket and comment writes (only when SEARCH_FTS_ENABLED)."""
+    if not SEARCH_FTS_ENABLED:
+        # no savepoint + DELETE/INSERT per write for an index nobody reads
+        return
+    event.listen(db.session, "after_flush", _collect_dirty_tickets)
+    event.listen(db.session, "before_commit", _index_before_commit)
+    event.listen(db.session, "after_soft_rollback", _forget_dirty)
+
+
+def reindex_all(batch=500):
+    """Rebuild every document in id-ordered batches and drop orphans. Returns counts."""
+    ensure_search_schema(db.session.connection())
+    db.session.commit()
+    _schema_ready.clear()
+
+    last_id, indexed = 0, 0
+    while True:
+        ids = db.session.execute(
+            select(Ticket.id).where(Ticket.id > last_id).order_by(Ticket.id).limit(batch)
+        ).scalars().all()
+        if not ids:
+            break
+        indexed += write_documents(db.session.connection(), ids)
+        db.session.commit()
+        last_id = ids[-1]
+
+    orphans = db.session.execute(
+        delete(TicketSearchDocument).where(
+            ~TicketSearchDocument.ticket_id.in_(select(Ticket.id))
+        )
+    ).rowcount
+    db.session.commit()
+    return {"indexed": indexed, "removed": orphans}
+
+
+# ─── Queries ────────────────────────────────────────────────
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(term):
+    return _TOKEN_RE.findall(term or "")[:16]
+
+
+def _pg_tsquery(term):
+    # every word must match, as a prefix so search-as-you-type works
+    tokens = _tokens(term)
+    if not tokens:
+        return None
+    return func.to_tsquery(SEARCH_LANGUAGE, " & ".join(f"{t}:*" for t in tokens))
+
+
+def _fts5_query(term):
+    tokens = _tokens(term)
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def match_clause(term):
+    """
+    WHERE clause "ticket matches `term`" backed by the full-text index,
+    or None when full-text search isn't available (callers fall back to ilike).
+    """
+    if not fts_available():
+        return None
+    dialect = _dialect()
+    if dialect == "postgresql":
+        tsquery = _pg_tsquery(term)
+        if tsquery is None:
+            return None
+        document = literal_column("ticket_search_documents.document")
+        return Ticket.id.in_(
+            select(TicketSearchDocument.ticket_id).where(document.op("@@")(tsquery))
+        )
+    match = _fts5_query(term)
+    if match is None:
+        return None
+    return Ticket.id.in_(
+        select(fts_table.c.rowid).where(fts_table.c[FTS_TABLE].op("MATCH")(match))
+    )
+
+
+def _ilike_clause(term):
+    return or_(Ticket.title.ilike(f"%{term}%"), Ticket.details.ilike(f"%{term}%"))
+
+
+def search_clause(term):
+    """Full-text match when available, otherwise the old title/details ilike."""
+    clause = match_clause(term)
+    return clause if clause is not None else _ilike_clause(term)
+
+
+def _highlight(snippet):
+    if not snippet:
+        return None
+    return html.escape(snippet).replace(_HL_START, "<mark>").replace(_HL_STOP, "</mark>")
+
+
+def ranked_search(term, scope_query, limit, offset=0):
+    """
+    [(ticket_id, rank, snippet)] for tickets in `scope_query` (a Ticket query
+    with the caller's filters) matching `term`, best first. Snippets are
+    HTML-escaped with matches wrapped in <mark>. Falls back to ilike (newest
+    first, rank and snippet None) when full-text search isn't available.
+    """
+    scope = scope_query.order_by(None).with_entities(Ticket.id)
+
+    if not fts_available() or not _tokens(term):
+        rows = (
+            scope.filter(_ilike_clause(term))
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+            .limit(limit).offset(offset).all()
+        )
+        return [(row[0], None, None) for row in rows]
+
+    if _dialect() == "postgresql":
+        tsquery = _pg_tsquery(term)
+        document = literal_column("ticket_search_documents.document")
+        rank = func.ts_rank_cd(document, tsquery).label("score")
+        page = db.session.execute(
+            select(TicketSearchDocument.ticket_id, rank)
+            .where(document.op("@@")(tsquery))
+            .where(TicketSearchDocument.ticket_id.in_(scope.statement))
+            .order_by(rank.desc(), TicketSearchDocument.ticket_id.desc())
+            .limit(limit).offset(offset)
+        ).all()
+        if not page:
+            return []
+        # headlines are expensive; only build them for the page
+        options = f"StartSel={_HL_START}, StopSel={_HL_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+        snippets = dict(db.session.execute(
+            select(
+                TicketSearchDocument.ticket_id,
+                func.ts_headline(SEARCH_LANGUAGE, func.coalesce(TicketSearchDocument.body, ""), tsquery, options)
+            ).where(TicketSearchDocument.ticket_id.in_([ticket_id for ticket_id, _ in page]))
+        ).all())
+        return [(ticket_id, float(score), _highlight(snippets.get(ticket_id))) for ticket_id, score in page]
+
+    fts = fts_table.c[FTS_TABLE]
+    # bm25: lower is better; title matches weigh double
+    # ("rank" is a reserved FTS5 column name, hence "score")
+    bm25 = func.bm25(fts, 2.0, 1.0).label("score")
+    rows = db.session.execute(
+        select(
+            fts_table.c.rowid.label("ticket_id"),
+            bm25,
+            func.snippet(fts, 1, _HL_START, _HL_STOP, "…", 16).label("snippet"),
+        )
+        .where(fts.op("MATCH")(_fts5_query(term)))
+        .where(fts_table.c.rowid.in_(scope.statement))
+        .order_by(bm25, fts_table.c.rowid.desc())
+        .limit(limit).offset(offset)
+    ).all()
+    return [(ticket_id, -float(score), _highlight(snippet)) for ticket_id, score, snippet in rows]
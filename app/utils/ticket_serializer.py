@@ -0,0 +1,429 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from flask import request
+
+from app.model import (
+    TicketAssignment, TicketAssignmentLog, TicketFile, TicketTag, TicketComment, TicketFollowUp,
+    TicketStatusLog, Category, ProjectTicket, Project, ProjectTag, ContactFormTicketLink,
+    ContactFormSubmission
+)
+from app.utils.deadline import current_deadline, run_with_deadline
+from app.utils.helper_function import get_users_info_by_ids
+from app.utils.location_directory import get_locations
+from app.utils.server_timing import call_timed, record_timing, timed
+
+
+# ─── Relations a caller can ask for with ?include= ──────────
+RELATIONS = (
+    "assignees",
+    "assignment_logs",
+    "files",
+    "tags",
+    "comments",
+    "followups",
+    "category",
+    "status_logs",
+    "project",
+    "contact_form_info",
+    "location_details",
+)
+
+BASE_FIELDS = (
+    "id", "title", "details", "priority", "status", "due_date", "created_at",
+    "completed_at", "location_id", "clinic_id", "created_by",
+)
+
+# Per-endpoint defaults – each matches what that endpoint returned before ?include= existed
+LIST_INCLUDE = ("assignees", "files", "tags", "comments", "followups", "category", "status_logs", "project")
+FILTER_INCLUDE = ("assignees", "files", "tags", "comments", "category")
+DETAIL_INCLUDE = RELATIONS
+CONTACT_FORM_INCLUDE = ("assignees", "assignment_logs", "files", "tags", "comments", "followups", "category", "status_logs")
+PROJECT_INCLUDE = ("assignees", "files", "tags", "category")
+
+# Bounded pool for remote enrichment that runs alongside user resolution (per worker)
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", 4))
+_enrich_pool = ThreadPoolExecutor(max_workers=ENRICH_WORKERS, thread_name_prefix="ticket-enrich")
+
+LOCATION_FIELDS = (
+    "id", "location_name", "address", "city", "state", "postal_code", "phone", "email",
+    "clinic_id", "is_enable", "display_name", "greeting_message", "map_link", "sip_uri",
+)
+
+
+def _csv_arg(name):
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    return {part.strip() for part in raw.split(",") if part.strip()}
+
+
+def serializer_options(default_include):
+    """
+    (include, fields) from the query string.
+      ?include=comments,status_logs   relations to load ("all" / "none" accepted)
+      ?fields=id,title,status         top-level keys to return
+    Relations that are not included are never queried.
+    """
+    include = _csv_arg("include")
+    if include is None:
+        include = set(default_include)
+    elif "all" in include:
+        include = set(RELATIONS)
+    else:
+        include &= set(RELATIONS)
+
+    fields = _csv_arg("fields")
+    if fields is not None:
+        include &= fields
+    return include, fields
+
+
+def _group_by_ticket(rows):
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.ticket_id].append(row)
+    return grouped
+
+
+def _username(users, user_id):
+    info = users.get(user_id)
+    return info.get("username") if info else None
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+class TicketBatch:
+    """
+    Child rows for a page of tickets, loaded with one IN query per
+    requested table and grouped by ticket_id in memory. A page costs the
+    same number of queries whether it holds 1 ticket or 100, and tables
+    for relations nobody asked for are not touched at all.
+    """
+
+    def __init__(self, tickets, include, detail=False):
+        self.tickets = list(tickets)
+        self.include = set(include)
+        self.detail = detail
+        self.locations = {}  # (clinic_id, location_id) -> location; filled remotely by serialize_tickets
+        ticket_ids = [t.id for t in self.tickets]
+
+        def load(relation, query):
+            if relation in self.include and ticket_ids:
+                return _group_by_ticket(query.all())
+            return {}
+
+        self.assignments = load("assignees", TicketAssignment.query.filter(
+            TicketAssignment.ticket_id.in_(ticket_ids)))
+        self.assignment_logs = load("assignment_logs", TicketAssignmentLog.query.filter(
+            TicketAssignmentLog.ticket_id.in_(ticket_ids)).order_by(TicketAssignmentLog.changed_at.desc()))
+        self.tags = load("tags", TicketTag.query.filter(TicketTag.ticket_id.in_(ticket_ids)))
+        self.comments = load("comments", TicketComment.query.filter(
+            TicketComment.ticket_id.in_(ticket_ids)).order_by(TicketComment.created_at.desc()))
+        self.followups = load("followups", TicketFollowUp.query.filter(
+            TicketFollowUp.ticket_id.in_(ticket_ids)))
+        self.status_logs = load("status_logs", TicketStatusLog.query.filter(
+            TicketStatusLog.ticket_id.in_(ticket_ids)).order_by(TicketStatusLog.changed_at.desc()))
+
+        # the detail view nests comment attachments under their comment
+        need_files = "files" in self.include or (detail and "comments" in self.include)
+        self.files = _group_by_ticket(
+            TicketFile.query.filter(TicketFile.ticket_id.in_(ticket_ids)).all()
+        ) if need_files and ticket_ids else {}
+
+        self.categories = {}
+        category_ids = {t.category_id for t in self.tickets if t.category_id}
+        if "category" in self.include and category_ids:
+            self.categories = {c.id: c for c in Category.query.filter(Category.id.in_(category_ids)).all()}
+
+        self.project_id_by_ticket, self.projects, self.project_tags = {}, {}, {}
+        if "project" in self.include and ticket_ids:
+            links = ProjectTicket.query.filter(
+                ProjectTicket.ticket_id.in_(ticket_ids)).order_by(ProjectTicket.id).all()
+            # first link wins, like ProjectTicket.query.filter_by(ticket_id=...).first()
+            for link in links:
+                self.project_id_by_ticket.setdefault(link.ticket_id, link.project_id)
+            project_ids = set(self.project_id_by_ticket.values())
+            if project_ids:
+                self.projects = {p.id: p for p in Project.query.filter(Project.id.in_(project_ids)).all()}
+                if detail:
+                    for tag in ProjectTag.query.filter(ProjectTag.project_id.in_(project_ids)).all():
+                        self.project_tags.setdefault(tag.project_id, []).append(tag.tag_name)
+
+        self.contact_forms = {}
+        if "contact_form_info" in self.include and ticket_ids:
+            links = ContactFormTicketLink.query.filter(
+                ContactFormTicketLink.ticket_id.in_(ticket_ids)).order_by(ContactFormTicketLink.id).all()
+            form_ids = {link.contact_form_id for link in links}
+            forms = {
+                f.id: f for f in ContactFormSubmission.query.filter(ContactFormSubmission.id.in_(form_ids)).all()
+            } if form_ids else {}
+            for link in links:
+                if link.ticket_id not in self.contact_forms and link.contact_form_id in forms:
+                    self.contact_forms[link.ticket_id] = forms[link.contact_form_id]
+
+    def user_ids(self, with_creator=True):
+        """Every user id the serialized page shows."""
+        ids = {t.user_id for t in self.tickets} if with_creator else set()
+        for rows in self.assignments.values():
+            for a in rows:
+                ids.update([a.assign_by, a.assign_to])
+        for rows in self.assignment_logs.values():
+            for log in rows:
+                ids.update([log.old_assign_to, log.new_assign_to, log.changed_by])
+        for rows in self.comments.values():
+            ids.update(c.user_id for c in rows)
+        for rows in self.followups.values():
+            ids.update(f.user_id for f in rows)
+        for rows in self.status_logs.values():
+            ids.update(log.changed_by for log in rows)
+        if self.detail:
+            ids.update(p.created_by for p in self.projects.values())
+        ids.discard(None)
+        return ids
+
+    def project_for(self, ticket):
+        project_id = self.project_id_by_ticket.get(ticket.id)
+        return self.projects.get(project_id) if project_id else None
+
+
+# ─── Relation builders ──────────────────────────────────────
+def _assignees(ticket, batch, users, iso_dates):
+    return [
+        {
+            "assign_by": a.assign_by,
+            "assign_by_username": _username(users, a.assign_by),
+            "assign_to": a.assign_to,
+            "assign_to_username": _username(users, a.assign_to),
+            "assigned_at": _iso(a.assigned_at) if iso_dates else a.assigned_at
+        }
+        for a in batch.assignments.get(ticket.id, [])
+    ]
+
+
+def _assignment_logs(ticket, batch, users):
+    return [
+        {
+            "old_assign_to": log.old_assign_to,
+            "old_assign_to_username": _username(users, log.old_assign_to),
+            "new_assign_to": log.new_assign_to,
+            "new_assign_to_username": _username(users, log.new_assign_to),
+            "changed_by": log.changed_by,
+            "changed_by_username": _username(users, log.changed_by),
+            "changed_at": log.changed_at
+        }
+        for log in batch.assignment_logs.get(ticket.id, [])
+    ]
+
+
+def _files(ticket, batch):
+    files = batch.files.get(ticket.id, [])
+    if batch.detail:
+        # detail view: comment attachments are shown under their comment instead
+        files = [f for f in files if f.comment_id is None]
+    return [{"name": f.file_name, "url": f.file_url} for f in files]
+
+
+def _comments(ticket, batch, users):
+    comments = []
+    for c in batch.comments.get(ticket.id, []):
+        comment = {
+            "id": c.id,
+            "user_id": c.user_id,
+            "username": _username(users, c.user_id),
+            "comment": c.comment,
+            "created_at": c.created_at
+        }
+        if batch.detail:
+            comment["files"] = [
+                {"name": f.file_name, "url": f.file_url}
+                for f in batch.files.get(ticket.id, []) if f.comment_id == c.id
+            ]
+        comments.append(comment)
+    return comments
+
+
+def _followups(ticket, batch, users):
+    followups = []
+    for f in batch.followups.get(ticket.id, []):
+        u_info = users.get(f.user_id)
+        followups.append({
+            "id": f.id,
+            "note": f.note,
+            "user_id": f.user_id,
+            "username": u_info.get("username") if u_info else None,
+            "email": u_info.get("email") if u_info else None,
+            "followup_date": f.followup_date,
+            "created_at": f.created_at
+        })
+    return followups
+
+
+def _status_logs(ticket, batch, users):
+    return [
+        {
+            "old_status": log.old_status,
+            "new_status": log.new_status,
+            "changed_by": log.changed_by,
+            "changed_by_username": _username(users, log.changed_by),
+            "changed_at": log.changed_at
+        }
+        for log in batch.status_logs.get(ticket.id, [])
+    ]
+
+
+def _category(ticket, batch):
+    cat = batch.categories.get(ticket.category_id)
+    return {"id": cat.id, "name": cat.name, "is_active": cat.is_active} if cat else None
+
+
+def _project(ticket, batch, users):
+    project = batch.project_for(ticket)
+    if not project:
+        return None
+    info = {
+        "id": project.id,
+        "name": project.name,
+        "status": project.status,
+        "priority": project.priority,
+        "color": project.color
+    }
+    if batch.detail:
+        info.update({
+            "description": project.description,
+            "due_date": project.due_date.isoformat() if project.due_date else None,
+            "created_by": users.get(project.created_by),
+            "tags": batch.project_tags.get(project.id, [])
+        })
+    return info
+
+
+def _contact_form_info(ticket, batch):
+    form = batch.contact_forms.get(ticket.id)
+    if not form:
+        return None
+    return {
+        "id": form.id,
+        "form_name": form.form_name,
+        "name": form.name,
+        "phone": form.phone,
+        "email": form.email,
+        "message": form.message,
+        "data": form.data,
+        "status": form.status,
+        "created_at": form.created_at
+    }
+
+
+def _load_locations(tickets):
+    """{ (clinic_id, location_id): location dict } with one directory lookup per clinic."""
+    by_clinic = defaultdict(set)
+    for t in tickets:
+        if t.location_id:
+            try:
+                by_clinic[t.clinic_id].add(int(t.location_id))
+            except (TypeError, ValueError):
+                continue
+    found = {}
+    for clinic_id, location_ids in by_clinic.items():
+        for loc_id, loc in get_locations(clinic_id, location_ids).items():
+            found[(clinic_id, loc_id)] = loc
+    return found
+
+
+def _location_details(ticket, batch):
+    if not ticket.location_id:
+        return None
+    try:
+        loc = batch.locations.get((ticket.clinic_id, int(ticket.location_id)))
+    except (TypeError, ValueError):
+        loc = None
+    if not loc:
+        print(f"⚠️ Location ID {ticket.location_id} not found in auth system")
+        return None
+    return {key: loc.get(key) for key in LOCATION_FIELDS}
+
+
+# ─── Public API ─────────────────────────────────────────────
+def serialize_ticket(ticket, batch, users, fields=None, iso_dates=False):
+    """One ticket dict built from a preloaded TicketBatch and a resolved user map."""
+    include = batch.include
+    result = {
+        "id": ticket.id,
+        "title": ticket.title,
+        "details": ticket.details,
+        "priority": ticket.priority,
+        "status": ticket.status,
+        "due_date": _iso(ticket.due_date) if iso_dates else ticket.due_date,
+        "created_at": _iso(ticket.created_at) if iso_dates else ticket.created_at,
+        "completed_at": _iso(ticket.completed_at) if iso_dates else ticket.completed_at,
+        "location_id": ticket.location_id,
+        "clinic_id": ticket.clinic_id,
+        "created_by": users.get(ticket.user_id),
+    }
+    if "assignees" in include:
+        result["assignees"] = _assignees(ticket, batch, users, iso_dates)
+    if "assignment_logs" in include:
+        result["assignment_logs"] = _assignment_logs(ticket, batch, users)
+    if "files" in include:
+        result["files"] = _files(ticket, batch)
+    if "tags" in include:
+        result["tags"] = [tag.tag_name for tag in batch.tags.get(ticket.id, [])]
+    if "comments" in include:
+        result["comments"] = _comments(ticket, batch, users)
+    if "followups" in include:
+        result["followups"] = _followups(ticket, batch, users)
+    if "category" in include:
+        result["category"] = _category(ticket, batch)
+    if "status_logs" in include:
+        result["status_logs"] = _status_logs(ticket, batch, users)
+    if "project" in include:
+        result["project"] = _project(ticket, batch, users)
+    if "contact_form_info" in include:
+        result["contact_form_info"] = _contact_form_info(ticket, batch)
+    if "location_details" in include:
+        result["location_details"] = _location_details(ticket, batch)
+
+    if fields is not None:
+        result = {key: value for key, value in result.items() if key in fields}
+    return result
+
+
+def serialize_tickets(tickets, include=LIST_INCLUDE, fields=None, detail=False, iso_dates=False):
+    """
+    Serialize a page of tickets with a constant number of queries:
+    one IN query per included child table plus one bulk user resolution.
+
+    include    relation names to load (see RELATIONS); everything else is skipped
+    fields     optional set of top-level keys to keep
+    detail     single-ticket shape: comment files nested, full project info
+    iso_dates  ISO-8601 strings for ticket/assignment dates (project endpoints)
+
+    Remote enrichment runs concurrently: locations are fetched on the
+    enrichment pool while users resolve on the request thread, so the page
+    waits for the slower upstream rather than both in turn. Each branch
+    shows up in the Server-Timing header.
+    """
+    with timed("db"):
+        batch = TicketBatch(tickets, include, detail=detail)
+
+    locations = None
+    if "location_details" in batch.include and any(t.location_id for t in batch.tickets):
+        # pool threads don't see this request's deadline unless we hand it over
+        locations = _enrich_pool.submit(
+            call_timed, run_with_deadline, current_deadline(), _load_locations, batch.tickets)
+
+    with timed("users"):
+        with_creator = fields is None or "created_by" in fields
+        users = get_users_info_by_ids(batch.user_ids(with_creator=with_creator))
+
+    if locations is not None:
+        batch.locations, seconds = locations.result()
+        record_timing("location", seconds)
+
+    with timed("serialize"):
+        return [serialize_ticket(t, batch, users, fields=fields, iso_dates=iso_dates) for t in batch.tickets]
@@ -0,0 +1,63 @@
+import re
+
+
+# ─── Canonical keys ─────────────────────────────────────────
+# tickets.status / tickets.priority stay free text for display;
+# status_key / priority_key hold these normalized values for filtering and grouping.
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+STATUS_LABELS = {
+    PENDING: "Pending",
+    IN_PROGRESS: "In Progress",
+    COMPLETED: "Completed",
+}
+
+STATUS_ALIASES = {
+    "inprogress": IN_PROGRESS,
+    "complete": COMPLETED,
+}
+
+PRIORITY_LABELS = {
+    "low": "Low",
+    "medium": "Medium",
+    "high": "High",
+    "urgent": "Urgent",
+}
+
+KEY_MAX_LENGTH = 50
+
+
+def _slug(value):
+    """ "In Progress" / "in-progress" / " IN_PROGRESS " → "in_progress" """
+    if value is None:
+        return None
+    slug = re.sub(r"[\s\-]+", "_", str(value).strip().lower()).strip("_")
+    return slug[:KEY_MAX_LENGTH] or None
+
+
+def normalize_status(value):
+    """Canonical status key for any free-text status (unknown values are slugged, not dropped)."""
+    slug = _slug(value)
+    return STATUS_ALIASES.get(slug, slug)
+
+
+def normalize_priority(value):
+    return _slug(value)
+
+
+def status_keys(status_csv):
+    """Comma-separated ?status= values → distinct canonical keys."""
+    keys = []
+    for part in (status_csv or "").split(","):
+        key = normalize_status(part)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def fill_ticket_keys(ticket):
+    """Keep status_key / priority_key in step with status / priority."""
+    ticket.status_key = normalize_status(ticket.status)
+    ticket.priority_key = normalize_priority(ticket.priority)
@@ -0,0 +1,231 @@
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app import db
+from app.model import Ticket
+
+
+# ─── Config ─────────────────────────────────────────────────
+SUGGEST_LIMIT = int(os.getenv("SUGGEST_LIMIT", 10))
+SUGGEST_MAX_LIMIT = int(os.getenv("SUGGEST_MAX_LIMIT", 20))
+# Pick up tickets written by other workers at most this often (seconds)
+SUGGEST_REFRESH_SECONDS = float(os.getenv("SUGGEST_REFRESH_SECONDS", 30))
+# Stop walking one prefix after this many ids ("a" matches half the tickets)
+SUGGEST_SCAN_CAP = int(os.getenv("SUGGEST_SCAN_CAP", 5000))
+# Candidates re-checked against the database (visibility, deletes) per round trip
+SUGGEST_CANDIDATES = int(os.getenv("SUGGEST_CANDIDATES", 200))
+
+_PENDING_KEY = "ticket_suggest_pending"
+_DELETED = object()
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def title_tokens(title):
+    return {t for t in _TOKEN_RE.findall((title or "").lower())}
+
+
+class PrefixIndex:
+    """
+    Per-process prefix index: ticket id digits and lower-cased title words,
+    each kept in a sorted list so a prefix lookup is one bisect plus a short
+    walk. Thread-safe; every worker keeps its own copy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = []            # sorted str(ticket_id)
+        self._tokens = []         # sorted (token, ticket_id)
+        self._by_ticket = {}      # ticket_id -> set(tokens)
+        self.built = False
+        self.watermark = None     # newest updated_at seen
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self._by_ticket)
+
+    # ─── Writes ─────────────────────────────────────────────
+    def _remove(self, ticket_id):
+        tokens = self._by_ticket.pop(ticket_id, None)
+        if tokens is None:
+            return
+        key = str(ticket_id)
+        i = bisect_left(self._ids, key)
+        if i < len(self._ids) and self._ids[i] == key:
+            del self._ids[i]
+        for token in tokens:
+            i = bisect_left(self._tokens, (token, ticket_id))
+            if i < len(self._tokens) and self._tokens[i] == (token, ticket_id):
+                del self._tokens[i]
+
+    def _add(self, ticket_id, title):
+        tokens = title_tokens(title)
+        self._by_ticket[ticket_id] = tokens
+        insort(self._ids, str(ticket_id))
+        for token in tokens:
+            insort(self._tokens, (token, ticket_id))
+
+    def upsert(self, rows):
+        """rows: [(ticket_id, title)]"""
+        with self._lock:
+            for ticket_id, title in rows:
+                self._remove(ticket_id)
+                self._add(ticket_id, title)
+
+    def remove(self, ticket_ids):
+        with self._lock:
+            for ticket_id in ticket_ids:
+                self._remove(ticket_id)
+
+    def load(self, rows, watermark):
+        """Replace everything (startup / rebuild)."""
+        ids, tokens, by_ticket = [], [], {}
+        for ticket_id, title in rows:
+            words = title_tokens(title)
+            by_ticket[ticket_id] = words
+            ids.append(str(ticket_id))
+            tokens.extend((w, ticket_id) for w in words)
+        ids.sort()
+        tokens.sort()
+        with self._lock:
+            self._ids, self._tokens, self._by_ticket = ids, tokens, by_ticket
+            self.watermark = watermark
+            self.refreshed_at = time.monotonic()
+            self.built = True
+
+    # ─── Reads ──────────────────────────────────────────────
+    def _walk(self, entries, prefix, key, cap):
+        found = []
+        i = bisect_left(entries, key)
+        while i < len(entries) and len(found) < cap:
+            entry = entries[i]
+            value = entry[0] if isinstance(entry, tuple) else entry
+            if not value.startswith(prefix):
+                break
+            found.append(entry[1] if isinstance(entry, tuple) else int(entry))
+            i += 1
+        return found
+
+    def lookup(self, query):
+        """Ticket ids matching `query`: id prefix first, then titles with every word as a prefix."""
+        words = _TOKEN_RE.findall((query or "").lower())
+        if not words:
+            return []
+        with self._lock:
+            by_id = []
+            if len(words) == 1 and words[0].isdigit():
+                by_id = self._walk(self._ids, words[0], words[0], SUGGEST_SCAN_CAP)
+                # exact id first, then shorter ids before longer ones
+                by_id.sort(key=lambda t: (len(str(t)), t))
+
+            by_title = None
+            for word in words:
+                ids = set(self._walk(self._tokens, word, (word, -1), SUGGEST_SCAN_CAP))
+                by_title = ids if by_title is None else by_title & ids
+                if not by_title:
+                    break
+
+        seen = set(by_id)
+        # newest tickets first among title matches
+        return by_id + sorted((t for t in (by_title or ()) if t not in seen), reverse=True)
+
+
+suggest_index = PrefixIndex()
+_build_lock = threading.Lock()
+
+
+# ─── Keeping it current ─────────────────────────────────────
+def _rebuild():
+    rows = db.session.query(Ticket.id, Ticket.title, Ticket.updated_at).all()
+    watermark = max((r.updated_at for r in rows if r.updated_at), default=None)
+    suggest_index.load([(r.id, r.title) for r in rows], watermark)
+    print(f"✅ Ticket suggest index built: {len(rows)} tickets")
+
+
+def _catch_up():
+    """Fold in tickets created/renamed by other workers since the last look."""
+    query = db.session.query(Ticket.id, Ticket.title, Ticket.updated_at)
+    if suggest_index.watermark is not None:
+        # small overlap so same-timestamp writes aren't missed
+        query = query.filter(Ticket.updated_at >= suggest_index.watermark - timedelta(seconds=1))
+    rows = query.all()
+    if rows:
+        suggest_index.upsert([(r.id, r.title) for r in rows])
+        newest = max((r.updated_at for r in rows if r.updated_at), default=None)
+        if newest and (suggest_index.watermark is None or newest > suggest_index.watermark):
+            suggest_index.watermark = newest
+    suggest_index.refreshed_at = time.monotonic()
+
+
+def ensure_index():
+    """Build on first use in this worker, then catch up every SUGGEST_REFRESH_SECONDS."""
+    if not suggest_index.built:
+        with _build_lock:
+            if not suggest_index.built:
+                _rebuild()
+        return
+    if time.monotonic() - suggest_index.refreshed_at >= SUGGEST_REFRESH_SECONDS:
+        with _build_lock:
+            if time.monotonic() - suggest_index.refreshed_at >= SUGGEST_REFRESH_SECONDS:
+                _catch_up()
+
+
+def _collect_ticket_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            pending[obj.id] = obj.title
+    for obj in session.dirty:
+        if isinstance(obj, Ticket):
+            pending[obj.id] = obj.title
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            pending[obj.id] = _DELETED
+
+
+def _apply_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not suggest_index.built:
+        return
+    suggest_index.remove([t for t, title in pending.items() if title is _DELETED])
+    suggest_index.upsert([(t, title) for t, title in pending.items() if title is not _DELETED])
+
+
+def _forget_pending(session, previous_transaction=None):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_ticket_suggest(app):
+    """Apply this worker's own ticket writes to the index as soon as they commit."""
+    event.listen(db.session, "after_flush", _collect_ticket_changes)
+    event.listen(db.session, "after_commit", _apply_after_commit)
+    event.listen(db.session, "after_soft_rollback", _forget_pending)
+
+
+def suggest_visible_tickets(query, scope, limit):
+    """
+    Up to `limit` (id, title, status) rows for `query`, best first. Index
+    candidates are checked against `scope` (e.g. TicketQuery.visible_to) in
+    chunks of SUGGEST_CANDIDATES, in rank order, until `limit` rows survive,
+    so a user who can only see a few tickets still gets their matches.
+    """
+    ensure_index()
+    candidates = suggest_index.lookup(query)
+    rank = {ticket_id: i for i, ticket_id in enumerate(candidates)}
+    found = []
+    for start in range(0, len(candidates), SUGGEST_CANDIDATES):
+        chunk = candidates[start:start + SUGGEST_CANDIDATES]
+        rows = (
+            scope.filter(Ticket.id.in_(chunk))
+            .with_entities(Ticket.id, Ticket.title, Ticket.status)
+            .all()
+        )
+        found.extend(sorted(rows, key=lambda r: rank[r.id]))
+        if len(found) >= limit:
+            break
+    return found[:limit]
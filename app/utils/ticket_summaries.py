@@ -0,0 +1,305 @@
+import json
+from datetime import datetime
+
+from sqlalchemy import delete, distinct, event, func, insert, select
+
+from app import db
+from app.model import (
+    Ticket, TicketAssignment, TicketFile, TicketComment, TicketFollowUp, TicketStatusLog,
+    Category, Project, ProjectTicket, TicketSummary
+)
+from app.utils.helper_function import get_users_info_by_ids
+from app.utils.ticket_versions import VERSIONED_CHILDREN
+
+
+_DIRTY_KEY = "ticket_summaries_dirty"
+
+# Columns compared by the consistency check (refreshed_at is bookkeeping)
+SUMMARY_COLUMNS = tuple(c.name for c in TicketSummary.__table__.columns if c.name != "refreshed_at")
+
+
+# ─── Building rows ──────────────────────────────────────────
+def _latest(*values):
+    return max((v for v in values if v is not None), default=None)
+
+
+def build_summaries(connection, ticket_ids):
+    """
+    {ticket_id: summary row dict} computed from the source tables with one
+    query per table. Only user ids are stored; usernames change in the Auth
+    System, so serialize_summaries resolves them at read time.
+    """
+    ids = sorted({t for t in ticket_ids if t is not None})
+    if not ids:
+        return {}
+    tickets = connection.execute(
+        select(Ticket.id, Ticket.title, Ticket.status, Ticket.priority, Ticket.created_at,
+               Ticket.updated_at, Ticket.user_id, Ticket.category_id)
+        .where(Ticket.id.in_(ids))
+    ).all()
+    if not tickets:
+        return {}
+    ids = [t.id for t in tickets]
+
+    def activity(model, column, counted=None):
+        counted = model.id if counted is None else distinct(counted)
+        rows = connection.execute(
+            select(model.ticket_id, func.count(counted), func.max(column))
+            .where(model.ticket_id.in_(ids))
+            .group_by(model.ticket_id)
+        )
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    comments = activity(TicketComment, TicketComment.created_at)
+    files = activity(TicketFile, TicketFile.uploaded_at)
+    followers = activity(TicketFollowUp, TicketFollowUp.created_at, counted=TicketFollowUp.user_id)
+    status_changes = activity(TicketStatusLog, TicketStatusLog.changed_at)
+
+    assignees, assigned_at = {}, {}
+    for row in connection.execute(
+        select(TicketAssignment.ticket_id, TicketAssignment.assign_to, TicketAssignment.assigned_at)
+        .where(TicketAssignment.ticket_id.in_(ids))
+        .order_by(TicketAssignment.id)
+    ):
+        if row.assign_to is not None and row.assign_to not in assignees.setdefault(row.ticket_id, []):
+            assignees[row.ticket_id].append(row.assign_to)
+        assigned_at[row.ticket_id] = _latest(assigned_at.get(row.ticket_id), row.assigned_at)
+
+    # first link wins, same as the full serializer
+    project_by_ticket = {}
+    for row in connection.execute(
+        select(ProjectTicket.ticket_id, ProjectTicket.project_id)
+        .where(ProjectTicket.ticket_id.in_(ids))
+        .order_by(ProjectTicket.id)
+    ):
+        project_by_ticket.setdefault(row.ticket_id, row.project_id)
+    projects = {}
+    if project_by_ticket:
+        projects = {row.id: row for row in connection.execute(
+            select(Project.id, Project.name, Project.color)
+            .where(Project.id.in_(set(project_by_ticket.values())))
+        )}
+
+    category_ids = {t.category_id for t in tickets if t.category_id}
+    categories = dict(connection.execute(
+        select(Category.id, Category.name).where(Category.id.in_(category_ids))
+    ).all()) if category_ids else {}
+
+    now = datetime.utcnow()
+    summaries = {}
+    for t in tickets:
+        project = projects.get(project_by_ticket.get(t.id))
+        comment_count, last_comment = comments.get(t.id, (0, None))
+        file_count, last_file = files.get(t.id, (0, None))
+        follower_count, last_follow = followers.get(t.id, (0, None))
+        summaries[t.id] = {
+            "ticket_id": t.id,
+            "title": t.title,
+            "status": t.status,
+            "priority": t.priority,
+            "created_at": t.created_at,
+            "created_by": t.user_id,
+            "assignees": json.dumps(assignees.get(t.id, [])),
+            "category_id": t.category_id,
+            "category_name": categories.get(t.category_id),
+            "project_id": project.id if project else None,
+            "project_name": project.name if project else None,
+            "project_color": project.color if project else None,
+            "comment_count": comment_count,
+            "file_count": file_count,
+            "follower_count": follower_count,
+            "last_activity_at": _latest(t.updated_at, t.created_at, last_comment, last_file, last_follow,
+                                        status_changes.get(t.id, (0, None))[1], assigned_at.get(t.id)),
+            "refreshed_at": now,
+        }
+    return summaries
+
+
+def write_summaries(connection, ticket_ids):
+    """Replace the summary rows of `ticket_ids`; deleted tickets lose theirs."""
+    ids = sorted({t for t in ticket_ids if t is not None})
+    if not ids:
+        return 0
+    rows = build_summaries(connection, ids)
+    connection.execute(delete(TicketSummary).where(TicketSummary.ticket_id.in_(ids)))
+    if rows:
+        connection.execute(insert(TicketSummary), list(rows.values()))
+    return len(rows)
+
+
+def _assignee_ids(row):
+    # rows written before names moved to read time hold [{"id", "username"}]
+    return [a["id"] if isinstance(a, dict) else a for a in json.loads(row["assignees"] or "[]")]
+
+
+def _username(users, user_id):
+    info = users.get(user_id)
+    return info.get("username") if info else None
+
+
+def _summary_dict(row, users):
+    created_by = row["created_by"]
+    return {
+        "id": row["ticket_id"],
+        "title": row["title"],
+        "status": row["status"],
+        "priority": row["priority"],
+        "created_at": row["created_at"],
+        "created_by": {"id": created_by, "username": _username(users, created_by)} if created_by else None,
+        "assignees": [{"id": u, "username": _username(users, u)} for u in _assignee_ids(row)],
+        "category": {"id": row["category_id"], "name": row["category_name"]} if row["category_id"] else None,
+        "project": {
+            "id": row["project_id"], "name": row["project_name"], "color": row["project_color"]
+        } if row["project_id"] else None,
+        "comment_count": row["comment_count"],
+        "file_count": row["file_count"],
+        "follower_count": row["follower_count"],
+        "last_activity_at": row["last_activity_at"],
+    }
+
+
+def serialize_summaries(ticket_ids, fields=None):
+    """
+    Summary dicts for `ticket_ids` (in that order) from one primary-key
+    lookup on ticket_summaries plus one bulk user lookup for the names.
+    Tickets without a row yet (before the first rebuild) are computed on
+    the fly instead of being dropped.
+    """
+    connection = db.session.connection()
+    rows = {
+        row.ticket_id: row._mapping
+        for row in connection.execute(
+            select(TicketSummary.__table__).where(TicketSummary.ticket_id.in_(ticket_ids)))
+    }
+    missing = [t for t in ticket_ids if t not in rows]
+    if missing:
+        rows.update(build_summaries(connection, missing))
+    users = {}
+    if fields is None or {"created_by", "assignees"} & set(fields):
+        user_ids = set()
+        for row in rows.values():
+            user_ids.add(row["created_by"])
+            user_ids.update(_assignee_ids(row))
+        user_ids.discard(None)
+        users = get_users_info_by_ids(user_ids) if user_ids else {}
+    result = [_summary_dict(rows[t], users) for t in ticket_ids if t in rows]
+    if fields is not None:
+        result = [{key: value for key, value in item.items() if key in fields} for item in result]
+    return result
+
+
+# ─── Keeping rows current ───────────────────────────────────
+def _collect_dirty_summaries(session, flush_context):
+    dirty = session.info.setdefault(_DIRTY_KEY, {"tickets": set(), "categories": set(), "projects": set()})
+    for group in (session.new, session.dirty, session.deleted):
+        for obj in group:
+            if isinstance(obj, Ticket):
+                dirty["tickets"].add(obj.id)
+            elif isinstance(obj, VERSIONED_CHILDREN):
+                dirty["tickets"].add(obj.ticket_id)
+            elif isinstance(obj, Category) and group is not session.new:
+                dirty["categories"].add(obj.id)
+            elif isinstance(obj, Project) and group is not session.new:
+                dirty["projects"].add(obj.id)
+
+
+def _summaries_before_commit(session):
+    """Rewrite affected summaries in the same transaction as the change."""
+    session.flush()
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+    connection = session.connection()
+    ticket_ids = set(dirty["tickets"])
+    try:
+        with connection.begin_nested():
+            # a renamed category / project changes the badge on every ticket that shows it
+            if dirty["categories"]:
+                ticket_ids.update(connection.execute(
+                    select(Ticket.id).where(Ticket.category_id.in_(dirty["categories"]))).scalars())
+            if dirty["projects"]:
+                ticket_ids.update(connection.execute(
+                    select(ProjectTicket.ticket_id).where(ProjectTicket.project_id.in_(dirty["projects"]))).scalars())
+            write_summaries(connection, ticket_ids)
+    except Exception as e:
+        # never fail the user's write over the read model; `flask ticket-summaries-rebuild` repairs it
+        print(f"⚠️ Ticket summary update failed for tickets {sorted(t for t in ticket_ids if t)}: {e}")
+
+
+def _forget_dirty(session, previous_transaction=None):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def init_ticket_summaries(app):
+    """Maintain ticket_summaries from every ORM write to tickets and their child rows."""
+    event.listen(db.session, "after_flush", _collect_dirty_summaries)
+    event.listen(db.session, "before_commit", _summaries_before_commit)
+    event.listen(db.session, "after_soft_rollback", _forget_dirty)
+
+
+# ─── Maintenance ────────────────────────────────────────────
+def _ticket_id_batches(batch):
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            select(Ticket.id).where(Ticket.id > last_id).order_by(Ticket.id).limit(batch)
+        ).scalars().all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def rebuild_all(batch=500):
+    """Recompute every summary and drop rows whose ticket is gone."""
+    written = 0
+    for ids in _ticket_id_batches(batch):
+        written += write_summaries(db.session.connection(), ids)
+        db.session.commit()
+    orphans = db.session.execute(
+        delete(TicketSummary).where(~TicketSummary.ticket_id.in_(select(Ticket.id)))
+    ).rowcount
+    db.session.commit()
+    return {"written": written, "orphans_removed": orphans}
+
+
+def check_consistency(batch=500, fix=False):
+    """
+    Compare stored summaries with freshly computed ones.
+    Returns counts plus the first few offending ticket ids; `fix` rewrites them.
+    """
+    missing, stale, checked = [], [], 0
+    for ids in _ticket_id_batches(batch):
+        connection = db.session.connection()
+        expected = build_summaries(connection, ids)
+        stored = {
+            row.ticket_id: row._mapping
+            for row in connection.execute(select(TicketSummary.__table__).where(TicketSummary.ticket_id.in_(ids)))
+        }
+        bad = []
+        for ticket_id, row in expected.items():
+            current = stored.get(ticket_id)
+            if current is None:
+                missing.append(ticket_id)
+                bad.append(ticket_id)
+            elif any(current[c] != row[c] for c in SUMMARY_COLUMNS):
+                stale.append(ticket_id)
+                bad.append(ticket_id)
+        if fix and bad:
+            write_summaries(connection, bad)
+            db.session.commit()
+        checked += len(ids)
+
+    orphan_query = select(TicketSummary.ticket_id).where(~TicketSummary.ticket_id.in_(select(Ticket.id)))
+    orphans = db.session.execute(orphan_query).scalars().all()
+    if fix and orphans:
+        db.session.execute(delete(TicketSummary).where(TicketSummary.ticket_id.in_(orphans)))
+        db.session.commit()
+    return {
+        "checked": checked,
+        "missing": len(missing),
+        "stale": len(stale),
+        "orphans": len(orphans),
+        "examples": sorted(missing + stale + orphans)[:20],
+        "fixed": fix,
+    }
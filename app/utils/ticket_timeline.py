@@ -0,0 +1,153 @@
+import os
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import Integer, String, Text, and_, cast, literal, null, or_, select, union_all
+
+from app import db
+from app.model import TicketComment, TicketStatusLog, TicketAssignmentLog, TicketFile, TicketFollowUp
+from app.utils.helper_function import get_users_info_by_ids
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+# ─── Config ─────────────────────────────────────────────────
+TIMELINE_LIMIT = int(os.getenv("TIMELINE_LIMIT", 20))
+TIMELINE_MAX_LIMIT = int(os.getenv("TIMELINE_MAX_LIMIT", 100))
+# events embedded in GET /ticket/<id>?include=timeline
+TIMELINE_PREVIEW = int(os.getenv("TIMELINE_PREVIEW", 10))
+
+# Every source is projected onto these columns so they can be UNION ALL-ed
+COLUMNS = ("kind", "id", "at", "actor_id", "body", "old_value", "new_value",
+           "old_user_id", "new_user_id", "url", "comment_id")
+_TYPES = {"body": Text, "old_value": String(255), "new_value": String(255), "old_user_id": Integer,
+          "new_user_id": Integer, "url": Text, "comment_id": Integer, "actor_id": Integer}
+
+
+def _sources():
+    """kind → (model, timestamp column, {timeline column: source column})"""
+    return {
+        "comment": (TicketComment, TicketComment.created_at, {
+            "actor_id": TicketComment.user_id,
+            "body": TicketComment.comment,
+        }),
+        "status": (TicketStatusLog, TicketStatusLog.changed_at, {
+            "actor_id": TicketStatusLog.changed_by,
+            "old_value": TicketStatusLog.old_status,
+            "new_value": TicketStatusLog.new_status,
+        }),
+        "assignment": (TicketAssignmentLog, TicketAssignmentLog.changed_at, {
+            "actor_id": TicketAssignmentLog.changed_by,
+            "old_user_id": TicketAssignmentLog.old_assign_to,
+            "new_user_id": TicketAssignmentLog.new_assign_to,
+        }),
+        "file": (TicketFile, TicketFile.uploaded_at, {
+            "body": TicketFile.file_name,
+            "url": TicketFile.file_url,
+            "comment_id": TicketFile.comment_id,
+        }),
+        "follower": (TicketFollowUp, TicketFollowUp.created_at, {
+            "actor_id": TicketFollowUp.user_id,
+            "body": TicketFollowUp.note,
+        }),
+    }
+
+
+def _after(kind, at, row_id, position):
+    """Rows of one source strictly after `position` in (at, kind, id) DESC order; kind is constant per source."""
+    if position is None:
+        return None
+    t, k, i = position
+    if kind < k:
+        return at <= t
+    if kind > k:
+        return at < t
+    return or_(at < t, and_(at == t, row_id < i))
+
+
+def _branch(kind, model, at, mapping, ticket_id, position, limit):
+    columns = [literal(kind, String).label("kind"), model.id.label("id"), at.label("at")]
+    for name in COLUMNS[3:]:
+        source = mapping.get(name)
+        columns.append((source if source is not None else cast(null(), _TYPES[name])).label(name))
+    # rows without a timestamp can't be placed on the timeline (all sources default one)
+    query = select(*columns).where(model.ticket_id == ticket_id, at.isnot(None))
+    after = _after(kind, at, model.id, position)
+    if after is not None:
+        query = query.where(after)
+    # per-branch LIMIT keeps each side on its (ticket_id, timestamp) index; wrapped so
+    # SQLite accepts ORDER BY/LIMIT inside a compound select
+    inner = query.order_by(at.desc(), model.id.desc()).limit(limit).subquery()
+    return select(*[inner.c[name] for name in COLUMNS])
+
+
+def _parse_position(cursor):
+    if not cursor:
+        return None
+    payload = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(payload["t"]), str(payload["k"]), int(payload["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def _event(row, users):
+    def username(user_id):
+        info = users.get(user_id)
+        return info.get("username") if info else None
+
+    event = {"type": row.kind, "id": row.id, "at": row.at}
+    if row.kind != "file":
+        event["actor_id"] = row.actor_id
+        event["actor_username"] = username(row.actor_id)
+    if row.kind == "comment":
+        event["comment"] = row.body
+    elif row.kind == "status":
+        event["old_status"] = row.old_value
+        event["new_status"] = row.new_value
+    elif row.kind == "assignment":
+        event["old_assign_to"] = row.old_user_id
+        event["old_assign_to_username"] = username(row.old_user_id)
+        event["new_assign_to"] = row.new_user_id
+        event["new_assign_to_username"] = username(row.new_user_id)
+    elif row.kind == "file":
+        event.update({"name": row.body, "url": row.url, "comment_id": row.comment_id})
+    elif row.kind == "follower":
+        event["note"] = row.body
+    return event
+
+
+def timeline_page(ticket_id, cursor=None, limit=TIMELINE_LIMIT):
+    """
+    (events, next_cursor) for one ticket, newest first: comments, status
+    and assignment changes, file uploads and followers merged by the
+    database with UNION ALL and paged by (at, type, id). Actors are
+    resolved with one bulk user lookup.
+    """
+    position = _parse_position(cursor)
+    limit = max(1, min(limit, TIMELINE_MAX_LIMIT))
+    merged = union_all(*[
+        _branch(kind, model, at, mapping, ticket_id, position, limit + 1)
+        for kind, (model, at, mapping) in _sources().items()
+    ]).subquery()
+    rows = db.session.execute(
+        select(merged).order_by(merged.c.at.desc(), merged.c.kind.desc(), merged.c.id.desc()).limit(limit + 1)
+    ).all()
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor({"t": last.at.isoformat(), "k": last.kind, "id": last.id})
+
+    user_ids = set()
+    for row in page:
+        user_ids.update([row.actor_id, row.old_user_id, row.new_user_id])
+    user_ids.discard(None)
+    users = get_users_info_by_ids(user_ids) if user_ids else {}
+    return [_event(row, users) for row in page], next_cursor
+
+
+def timeline_requested():
+    """GET /ticket/<id>?include=timeline (not a TicketBatch relation, so checked separately)."""
+    include = request.args.get("include") or ""
+    return "timeline" in {part.strip() for part in include.split(",")}
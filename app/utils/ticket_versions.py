@@ -0,0 +1,104 @@
+from sqlalchemy import event, inspect, select, update
+
+from app import db
+from app.model import (
+    Ticket, TicketAssignment, TicketAssignmentLog, TicketFile, TicketComment, TicketTag,
+    TicketFollowUp, TicketStatusLog, TicketAssignLocation, ProjectTicket, ContactFormTicketLink,
+    Category, Project, ProjectTag, ContactFormSubmission
+)
+
+
+# Child rows that show up in ticket payloads; any insert/update/delete bumps the ticket's version
+VERSIONED_CHILDREN = (
+    TicketAssignment, TicketAssignmentLog, TicketFile, TicketComment, TicketTag,
+    TicketFollowUp, TicketStatusLog, TicketAssignLocation, ProjectTicket, ContactFormTicketLink,
+)
+
+_TOUCHED_KEY = "ticket_versions_touched"
+_LINKED_KEY = "ticket_versions_linked"
+
+
+def _linked_row(obj):
+    """(kind, id) of a shared row that ticket payloads embed (project badge, category, contact form), else None."""
+    if isinstance(obj, Project):
+        return "projects", obj.id
+    if isinstance(obj, ProjectTag):
+        return "projects", obj.project_id
+    if isinstance(obj, Category):
+        return "categories", obj.id
+    if isinstance(obj, ContactFormSubmission):
+        return "contact_forms", obj.id
+    return None
+
+
+def _collect_touched_tickets(session, flush_context):
+    touched = session.info.setdefault(_TOUCHED_KEY, set())
+    linked = session.info.setdefault(_LINKED_KEY, {"projects": set(), "categories": set(), "contact_forms": set()})
+    for obj in session.new:
+        if isinstance(obj, VERSIONED_CHILDREN):
+            touched.add(obj.ticket_id)
+    for obj in session.dirty:
+        if isinstance(obj, VERSIONED_CHILDREN) and session.is_modified(obj, include_collections=False):
+            touched.add(obj.ticket_id)
+            # moved to another ticket: the old one changed too
+            touched.update(inspect(obj).attrs.ticket_id.history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, VERSIONED_CHILDREN):
+            touched.add(obj.ticket_id)
+    # a new project / category / form has no tickets yet, but a new project tag shows on linked ones
+    for state, group in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted)):
+        for obj in group:
+            if state == "new" and not isinstance(obj, ProjectTag):
+                continue
+            if state == "dirty" and not session.is_modified(obj, include_collections=False):
+                continue
+            row = _linked_row(obj)
+            if row is not None and row[1] is not None:
+                linked[row[0]].add(row[1])
+            if state == "dirty" and isinstance(obj, ProjectTag):
+                # tag moved to another project: the old one's tickets changed too
+                linked["projects"].update(inspect(obj).attrs.project_id.history.deleted)
+    touched.discard(None)
+
+
+def _bump_before_commit(session):
+    """One UPDATE per commit for every ticket whose child rows changed, in the same transaction."""
+    session.flush()
+    ticket_ids = session.info.pop(_TOUCHED_KEY, None) or set()
+    linked = session.info.pop(_LINKED_KEY, None)
+    if linked:
+        # every ticket that embeds a changed project / category / form (as ticket_summaries resolves them)
+        if linked["projects"]:
+            ticket_ids.update(session.execute(
+                select(ProjectTicket.ticket_id).where(ProjectTicket.project_id.in_(linked["projects"]))).scalars())
+        if linked["categories"]:
+            ticket_ids.update(session.execute(
+                select(Ticket.id).where(Ticket.category_id.in_(linked["categories"]))).scalars())
+        if linked["contact_forms"]:
+            ticket_ids.update(session.execute(
+                select(ContactFormTicketLink.ticket_id)
+                .where(ContactFormTicketLink.contact_form_id.in_(linked["contact_forms"]))).scalars())
+    if not ticket_ids:
+        return
+    session.execute(
+        update(Ticket)
+        .where(Ticket.id.in_(sorted(ticket_ids)))
+        # keep updated_at: a comment isn't an edit of the ticket itself
+        .values(version=Ticket.version + 1, updated_at=Ticket.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _forget_touched(session, previous_transaction=None):
+    session.info.pop(_TOUCHED_KEY, None)
+    session.info.pop(_LINKED_KEY, None)
+
+
+def init_ticket_versions(app):
+    """
+    Keep Ticket.version moving whenever anything in a ticket's payload changes:
+    its child rows, and the project, project tags, category or contact form it embeds.
+    """
+    event.listen(db.session, "after_flush", _collect_touched_tickets)
+    event.listen(db.session, "before_commit", _bump_before_commit)
+    event.listen(db.session, "after_soft_rollback", _forget_touched)
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.model import (
+    Ticket, TicketAssignment, TicketAssignmentLog, TicketComment, TicketFollowUp,
+    TicketStatusLog, TicketNotification, Project, ProjectAssignment, UserCache
+)
+from app.utils.helper_function import (
+    _fetch_user_info, _user_fetch_pool, user_info_cache, USER_MIRROR_MAX_AGE
+)
+
+
+# ─── Config ─────────────────────────────────────────────────
+USER_SYNC_INTERVAL = int(os.getenv("USER_SYNC_INTERVAL", 0))        # seconds, 0 = no background thread
+USER_SYNC_BATCH = int(os.getenv("USER_SYNC_BATCH", 500))            # max users refreshed per run
+# Refresh rows a bit before readers stop trusting them
+USER_SYNC_REFRESH_AGE = int(os.getenv("USER_SYNC_REFRESH_AGE", USER_MIRROR_MAX_AGE // 2))
+
+# Columns that hold Auth System user ids
+_USER_ID_COLUMNS = [
+    Ticket.user_id,
+    TicketAssignment.assign_by,
+    TicketAssignment.assign_to,
+    TicketAssignmentLog.old_assign_to,
+    TicketAssignmentLog.new_assign_to,
+    TicketAssignmentLog.changed_by,
+    TicketComment.user_id,
+    TicketFollowUp.user_id,
+    TicketStatusLog.changed_by,
+    TicketNotification.sender_id,
+    TicketNotification.receiver_id,
+    Project.created_by,
+    ProjectAssignment.user_id,
+]
+
+
+def referenced_user_ids():
+    """Every distinct user id our own tables point at."""
+    ids = set()
+    for column in _USER_ID_COLUMNS:
+        for (uid,) in db.session.query(column).filter(column.isnot(None)).distinct():
+            try:
+                ids.add(int(uid))
+            except (TypeError, ValueError):
+                continue
+    return ids
+
+
+def _ids_needing_sync(limit):
+    """Referenced ids that are missing from users_cache or older than USER_SYNC_REFRESH_AGE, oldest first."""
+    cutoff = datetime.utcnow() - timedelta(seconds=USER_SYNC_REFRESH_AGE)
+    synced = dict(db.session.query(UserCache.id, UserCache.synced_at).all())
+
+    missing = [uid for uid in referenced_user_ids() if uid not in synced]
+    stale = sorted(
+        (uid for uid, synced_at in synced.items() if synced_at < cutoff),
+        key=lambda uid: synced[uid]
+    )
+    return (missing + stale)[:limit]
+
+
+def _fetch_safely(user_id):
+    try:
+        return user_id, _fetch_user_info(user_id), None
+    except Exception as e:
+        return user_id, None, e
+
+
+def sync_users(limit=USER_SYNC_BATCH, user_ids=None):
+    """
+    Incrementally refresh the users_cache mirror from the Auth System.
+
+    Only ids that are missing or stale are fetched (concurrently, on the
+    shared user-fetch pool). Users the Auth System no longer knows are
+    removed from the mirror; users that fail to fetch are left untouched
+    and retried on the next run. Must run inside an app context.
+    """
+    ids = list(user_ids) if user_ids is not None else _ids_needing_sync(limit)
+    summary = {"checked": len(ids), "upserted": 0, "deleted": 0, "failed": 0}
+    if not ids:
+        return summary
+
+    now = datetime.utcnow()
+    existing = {row.id: row for row in UserCache.query.filter(UserCache.id.in_(ids)).all()}
+
+    for uid, user, error in _user_fetch_pool.map(_fetch_safely, ids):
+        if error is not None:
+            summary["failed"] += 1
+            print(f"⚠️ users_cache sync failed for user {uid}: {error}")
+            continue
+
+        row = existing.get(uid)
+        if user is None:
+            if row is not None:
+                db.session.delete(row)
+                summary["deleted"] += 1
+            user_info_cache.invalidate(uid)
+            continue
+
+        if row is None:
+            row = UserCache(id=uid)
+            db.session.add(row)
+        row.username = user.get("username")
+        row.email = user.get("email")
+        row.phone = user.get("phone")
+        row.role = user.get("role")
+        row.synced_at = now
+        user_info_cache.set(uid, dict(user))
+        summary["upserted"] += 1
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ users_cache sync commit failed: {e}")
+        raise
+    return summary
+
+
+def invalidate_users(user_ids=None, refresh=False):
+    """
+    Drop users from the mirror and the process cache.
+    `user_ids=None` invalidates everybody. With `refresh=True` the given
+    ids are re-fetched immediately instead of waiting for the next sync.
+    """
+    if user_ids is not None:
+        user_ids = [int(uid) for uid in user_ids]
+    try:
+        query = UserCache.query
+        if user_ids is not None:
+            query = query.filter(UserCache.id.in_(user_ids))
+        removed = query.delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if user_ids is None:
+        user_info_cache.clear()
+    else:
+        for uid in user_ids:
+            user_info_cache.invalidate(uid)
+
+    result = {"removed": removed}
+    if refresh and user_ids:
+        result["sync"] = sync_users(user_ids=user_ids)
+    return result
+
+
+# ─── Background sync ────────────────────────────────────────
+_sync_thread = None
+_sync_thread_lock = threading.Lock()
+
+
+def start_user_sync_thread(app):
+    """Run sync_users() every USER_SYNC_INTERVAL seconds on a daemon thread (once per process)."""
+    global _sync_thread
+    if USER_SYNC_INTERVAL <= 0:
+        return None
+
+    with _sync_thread_lock:
+        if _sync_thread is not None and _sync_thread.is_alive():
+            return _sync_thread
+
+        def run():
+            while True:
+                with app.app_context():
+                    try:
+                        summary = sync_users()
+                        if summary["checked"]:
+                            print(f"🔄 users_cache sync: {summary}")
+                    except Exception as e:
+                        print(f"❌ users_cache sync error: {e}")
+                    finally:
+                        db.session.remove()
+                time.sleep(USER_SYNC_INTERVAL)
+
+        _sync_thread = threading.Thread(target=run, name="user-sync", daemon=True)
+        _sync_thread.start()
+        print(f"✅ users_cache sync thread started (every {USER_SYNC_INTERVAL}s)")
+        return _sync_thread
@@ -0,0 +1,142 @@
+"""
+Serialization time and wire size for a 100-ticket /tickets page.
+
+    python benchmarks/json_page_bench.py [--tickets 100] [--repeat 50]
+
+Compares the stdlib json path Flask's DefaultJSONProvider uses with the
+orjson provider in app/utils/json_provider.py (same options: sorted keys,
+non-str keys, http-date datetimes), then the size of each body raw, gzip'd
+and brotli'd at the levels app/utils/compression.py uses. Runs without the
+app or a database; the page is synthetic but shaped like serialize_tickets().
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+WORDS = ("printer scanner email outlook login password reset clinic xray sensor patient "
+         "schedule billing invoice insurance claim network wifi slow error crash update").split()
+
+
+def _text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _user(rng):
+    uid = rng.randint(1, 500)
+    return {"id": uid, "username": f"user{uid}", "email": f"user{uid}@example.com", "phone": None, "role": "staff"}
+
+
+def make_page(tickets=100, seed=7):
+    rng = random.Random(seed)
+    now = datetime(2025, 10, 1, 9, 30)
+    page = []
+    for i in range(tickets):
+        created = now - timedelta(hours=i * 3)
+        page.append({
+            "id": 10_000 - i,
+            "title": _text(rng, 6),
+            "details": _text(rng, 120),
+            "status": rng.choice(["Pending", "in_progress", "Completed"]),
+            "priority": rng.choice(["Low", "High", "Urgent"]),
+            "clinic_id": 1,
+            "location_id": rng.randint(1, 40),
+            "due_date": None,
+            "created_at": created,
+            "updated_at": created + timedelta(hours=1),
+            "completed_at": None,
+            "created_by": _user(rng),
+            "assignees": [{"assign_to": _user(rng), "assign_by": _user(rng), "assigned_at": created} for _ in range(2)],
+            "tags": [{"user": _user(rng), "created_at": created}],
+            "files": [],
+            "comments": [
+                # email-created tickets carry whole email bodies in comments
+                {"id": i * 10 + c, "user": _user(rng), "comment": _text(rng, 400), "created_at": created}
+                for c in range(3)
+            ],
+            "status_logs": [
+                {"old_status": "Pending", "new_status": "in_progress", "changed_by": 3,
+                 "changed_by_username": "user3", "changed_at": created}
+            ],
+            "category": {"id": 2, "name": "IT", "is_active": True},
+        })
+    return {"tickets": page, "pagination": {"page": 1, "per_page": tickets, "total": 5000, "pages": 50}}
+
+
+def _http_date(o):
+    if isinstance(o, datetime):
+        return format_datetime(o, usegmt=True) if o.tzinfo else o.strftime("%a, %d %b %Y %H:%M:%S GMT")
+    raise TypeError(type(o).__name__)
+
+
+def stdlib_dumps(obj):
+    # what DefaultJSONProvider.response() does in production (compact, sorted)
+    return json.dumps(obj, default=_http_date, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+
+
+def orjson_dumps(obj):
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    return orjson.dumps(obj, default=_http_date, option=option).decode()
+
+
+def orjson_iso_dumps(obj):
+    # JSON_DATETIME_FORMAT=iso: datetimes stay inside orjson
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS).decode()
+
+
+def _time(fn, obj, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(obj)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    page = make_page(args.tickets)
+    encoders = [("stdlib json", stdlib_dumps)]
+    if orjson is not None:
+        encoders.append(("orjson", orjson_dumps))
+        encoders.append(("orjson iso", orjson_iso_dumps))
+    else:
+        print("orjson not installed; only the stdlib encoder is measured")
+
+    print(f"{args.tickets}-ticket page, median of {args.repeat} runs\n")
+    print(f"{'encoder':<12} {'dumps ms':>9}")
+    for name, fn in encoders:
+        print(f"{name:<12} {_time(fn, page, args.repeat):>9.2f}")
+    body = encoders[0][1](page).encode()
+
+    print(f"\n{'encoding':<12} {'bytes':>9} {'ms':>7}")
+    print(f"{'identity':<12} {len(body):>9} {0:>7.2f}")
+    codecs = [("gzip", lambda b: gzip.compress(b, compresslevel=GZIP_LEVEL))]
+    if brotli is not None:
+        codecs.append(("br", lambda b: brotli.compress(b, quality=BROTLI_QUALITY)))
+    for name, fn in codecs:
+        print(f"{name:<12} {len(fn(body)):>9} {_time(fn, body, args.repeat):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,21 @@ class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
 
+    # Seconds a request may spend in total, including outbound calls.
+    # When it runs out, enrichment (usernames, locations) comes back null
+    # and the response carries "degraded": true. Only the read routes below
+    # get a budget; everything else (writes, mail, email ingestion) has none
+    # unless REQUEST_DEADLINE_DEFAULT is set.
+    REQUEST_DEADLINE_DEFAULT = float(os.getenv("REQUEST_DEADLINE_DEFAULT", 0))
+    REQUEST_DEADLINES = {
+        "tickets.get_tickets": 8,
+        "tickets.filter_tickets": 8,
+        "tickets.get_ticket": 8,
+        "notifications.get_notifications": 8,
+        "projects.get_projects": 8,
+        "projects.get_project_tickets": 8,
+    }
+
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv(
@@ -0,0 +1,50 @@
+"""Ticket ETags must change when anything embedded in the ticket payload changes."""
+import pytest
+
+from app import create_app, db
+from config import DevelopmentConfig
+from app.model import (
+    Category, ContactFormSubmission, ContactFormTicketLink, Project, ProjectTag, ProjectTicket, Ticket
+)
+from app.utils.etag import ticket_etag
+
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'etag.db'}"
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        category = Category(name="IT")
+        project = Project(name="Move", created_by=1)
+        form = ContactFormSubmission(clinic_id=1, form_name="Contact", name="Jane")
+        db.session.add_all([category, project, form])
+        db.session.flush()
+        linked = Ticket(title="Printer", category_id=category.id)
+        other = Ticket(title="Phones")
+        db.session.add_all([linked, other])
+        db.session.flush()
+        db.session.add_all([
+            ProjectTicket(project_id=project.id, ticket_id=linked.id),
+            ContactFormTicketLink(contact_form_id=form.id, ticket_id=linked.id),
+        ])
+        db.session.commit()
+        with app.test_request_context("/api/ticket/1"):
+            yield app
+        db.session.remove()
+
+
+@pytest.mark.parametrize("edit", [
+    lambda: setattr(db.session.get(Project, 1), "name", "Relocation"),
+    lambda: db.session.add(ProjectTag(project_id=1, tag_name="urgent")),
+    lambda: setattr(db.session.get(Category, 1), "is_active", False),
+    lambda: setattr(db.session.get(ContactFormSubmission, 1), "name", "Janet"),
+])
+def test_embedded_row_edit_changes_linked_ticket_etag(app, edit):
+    linked, other = ticket_etag(1), ticket_etag(2)
+    edit()
+    db.session.commit()
+    assert ticket_etag(1) != linked
+    assert ticket_etag(2) == other
@@ -0,0 +1,61 @@
+"""Keyset pagination over rows with and without created_at."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from config import DevelopmentConfig
+from app.model import Project, Ticket
+from app.utils.pagination import keyset_merge, keyset_paginate
+
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'pagination.db'}"
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        # ids 2, 5 and 6 have no created_at; 1, 4 and 7 share a timestamp
+        for i, days in enumerate([0, None, 2, 0, None, None, 0]):
+            ticket = Ticket(title=f"t{i}")
+            db.session.add(ticket)
+            db.session.flush()
+            ticket.created_at = START + timedelta(days=days) if days is not None else None
+        for i, days in enumerate([None, 1, 3]):
+            project = Project(name=f"p{i}", created_by=1)
+            db.session.add(project)
+            db.session.flush()
+            project.created_at = START + timedelta(days=days) if days is not None else None
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def _walk(fetch):
+    seen, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        seen.extend(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("per_page", [1, 2, 3, 10])
+def test_keyset_reaches_undated_rows(app, per_page):
+    rows = _walk(lambda cursor: keyset_paginate(Ticket.query, Ticket, cursor, per_page))
+    assert [t.id for t in rows] == [3, 7, 4, 1, 6, 5, 2]
+
+
+def test_keyset_merge_puts_undated_rows_last(app):
+    sources = {"ticket": (Ticket.query, Ticket), "project": (Project.query, Project)}
+    rows = _walk(lambda cursor: keyset_merge(sources, cursor, 2))
+    assert [(name, row.id) for name, row in rows] == [
+        ("project", 3), ("ticket", 3), ("project", 2), ("ticket", 7), ("ticket", 4), ("ticket", 1),
+        ("ticket", 6), ("ticket", 5), ("ticket", 2), ("project", 1),
+    ]
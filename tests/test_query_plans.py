@@ -0,0 +1,45 @@
+"""The hot list/detail queries must stay on an index (same check as `flask explain-hot-queries`)."""
+import pytest
+
+from app import create_app, db
+from config import DevelopmentConfig
+from app.model import (
+    Ticket, TicketAssignment, TicketComment, TicketFollowUp, TicketTag, TicketNotification, ProjectTicket
+)
+from app.utils.query_plans import _full_scans, explain_hot_queries
+
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'plans.db'}"
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        for i in range(1, 6):
+            db.session.add(Ticket(id=i, title=f"Ticket {i}", status="pending", user_id=7))
+            db.session.add_all([
+                TicketAssignment(ticket_id=i, assign_to=7, assign_by=8),
+                TicketComment(ticket_id=i, user_id=7, comment="hi"),
+                TicketFollowUp(ticket_id=i, user_id=7),
+                TicketTag(ticket_id=i, tag_name="7"),
+                TicketNotification(ticket_id=i, receiver_id=7, sender_id=8, message="m", notification_type="x"),
+                ProjectTicket(project_id=7, ticket_id=i),
+            ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def test_full_scan_detection():
+    assert _full_scans("sqlite", ["SCAN tickets"], ["tickets"]) == ["tickets"]
+    assert _full_scans("sqlite", ["SCAN tickets USING INDEX ix_tickets_created_at_id"], ["tickets"]) == []
+    assert _full_scans("postgresql", ["Seq Scan on tickets  (cost=0.00..1.05 rows=5)"], ["tickets"]) == ["tickets"]
+
+
+def test_hot_queries_use_indexes(app):
+    results = explain_hot_queries()
+    assert results
+    failures = {r["name"]: r["plan"] for r in results if r["full_scans"]}
+    assert failures == {}
@@ -0,0 +1,65 @@
+"""SQLite smoke test for full-text ticket search (FTS5) and its ilike fallback."""
+import pytest
+
+from app import create_app, db
+from config import DevelopmentConfig
+from app.model import Ticket, TicketComment, TicketSearchDocument
+from app.utils import ticket_search
+from app.utils.ticket_search import ranked_search, search_clause
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    class TestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'search.db'}"
+
+    monkeypatch.setattr(ticket_search, "SEARCH_FTS_ENABLED", True)
+    ticket_search._schema_ready.clear()
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        toner = Ticket(title="Printer toner empty", details="Front desk printer")
+        phones = Ticket(title="Phones down", details="No dial tone")
+        db.session.add_all([toner, phones])
+        db.session.flush()
+        db.session.add(TicketComment(ticket_id=phones.id, comment="<p>Replaced the <b>toner</b> too</p>"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+    ticket_search._schema_ready.clear()
+
+
+def _ids(query):
+    return sorted(t.id for t in query.all())
+
+
+def test_search_clause_uses_fts5(app):
+    assert ticket_search.fts_available()
+    assert _ids(Ticket.query.filter(search_clause("toner"))) == [1, 2]
+    assert _ids(Ticket.query.filter(search_clause("printer ton"))) == [1]
+    assert _ids(Ticket.query.filter(search_clause("nothing"))) == []
+
+
+def test_ranked_search_ranks_titles_and_highlights(app):
+    results = ranked_search("toner", Ticket.query, limit=10)
+    assert [ticket_id for ticket_id, _, _ in results] == [1, 2]
+    snippet = dict((t, s) for t, _, s in results)[2]
+    assert "<mark>toner</mark>" in snippet
+    assert "<b>" not in snippet
+
+    scoped = ranked_search("toner", Ticket.query.filter(Ticket.id == 2), limit=10)
+    assert [ticket_id for ticket_id, _, _ in scoped] == [2]
+
+
+def test_falls_back_to_ilike_when_disabled(app, monkeypatch):
+    monkeypatch.setattr(ticket_search, "SEARCH_FTS_ENABLED", False)
+    assert _ids(Ticket.query.filter(search_clause("toner"))) == [1]
+    assert [t for t, _, _ in ranked_search("dial", Ticket.query, limit=10)] == [2]
+
+
+def test_writes_are_not_indexed_when_disabled(app, monkeypatch):
+    monkeypatch.setattr(ticket_search, "SEARCH_FTS_ENABLED", False)
+    db.session.add(Ticket(title="Scanner jammed"))
+    db.session.commit()
+    assert db.session.get(TicketSearchDocument, 3) is None
+    assert db.session.get(TicketSearchDocument, 1) is not None
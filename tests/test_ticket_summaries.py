@@ -0,0 +1,48 @@
+"""Ticket summaries store user ids only; names are resolved when summaries are read."""
+import pytest
+
+from app import create_app, db
+from config import DevelopmentConfig
+from app.model import Ticket, TicketAssignment
+from app.utils import ticket_summaries
+from app.utils.ticket_summaries import check_consistency, serialize_summaries
+
+
+@pytest.fixture
+def users(monkeypatch):
+    names = {7: "alice", 8: "bob"}
+    monkeypatch.setattr(ticket_summaries, "get_users_info_by_ids",
+                        lambda ids: {uid: {"id": uid, "username": names[uid]} for uid in ids if uid in names})
+    return names
+
+
+@pytest.fixture
+def app(tmp_path, users):
+    class TestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'summaries.db'}"
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        ticket = Ticket(title="Printer", user_id=7)
+        db.session.add(ticket)
+        db.session.flush()
+        db.session.add(TicketAssignment(ticket_id=ticket.id, assign_to=8, assign_by=7))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def test_names_follow_user_renames(app, users):
+    summary = serialize_summaries([1])[0]
+    assert summary["created_by"] == {"id": 7, "username": "alice"}
+    assert summary["assignees"] == [{"id": 8, "username": "bob"}]
+
+    users[8] = "robert"
+    assert serialize_summaries([1])[0]["assignees"] == [{"id": 8, "username": "robert"}]
+    assert check_consistency()["stale"] == 0
+
+
+def test_fields_without_users_skip_the_lookup(app, monkeypatch):
+    monkeypatch.setattr(ticket_summaries, "get_users_info_by_ids", lambda ids: pytest.fail("looked up users"))
+    assert serialize_summaries([1], fields={"id", "title"}) == [{"id": 1, "title": "Printer"}]